@@ -0,0 +1,146 @@
+from enums import TokenType
+from visitor import NodeVisitor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+    value with bool elements (a comparison's result) as int64, so arithmetic
+    on it counts like Python's True + True does instead of being logical
+"""
+def numeric(value):
+    if np.asarray(value).dtype == np.bool_:
+        return np.asarray(value, dtype=np.int64)
+    return value
+
+class BatchEvaluator(NodeVisitor):
+    """
+        Runs one resolved Program over a whole batch of rows at once: every
+        variable holds a NumPy array with one element per row (or a scalar that
+        is the same for all rows) and every operator is a single array op.
+
+        Errors are per batch rather than per row: any row dividing by zero
+        raises for the whole batch. INTEGER columns use int64, so values that
+        would outgrow 64 bits wrap instead of becoming Python big ints.
+
+        IF and WHILE conditions must have the same value in every row, since
+        all rows take the same path through the program.
+    """
+    def __init__(self, frame):
+        self.frame = frame
+
+    def visit_Num(self, node):
+        return node.token.value
+
+    def visit_String(self, node):
+        return node.token.value
+
+    def visit_Var(self, node):
+        value = self.frame[node.slot]
+        if value is None:
+            raise Exception(f"Variable {node.value} not found in scope")
+        return value
+
+    def visit_UnaryOP(self, node):
+        value = self.visit(node.expr)
+        if node.op.type == TokenType.PLUS_OPERATOR:
+            return np.positive(numeric(value))
+        if node.op.type == TokenType.MINUS_OPERATOR:
+            return np.negative(numeric(value))
+        return value
+
+    def visit_BinOP(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+        if op == TokenType.EQUALS:
+            return np.equal(left, right)
+        if op == TokenType.NOT_EQUALS:
+            return np.not_equal(left, right)
+
+        left = numeric(left)
+        right = numeric(right)
+        if op == TokenType.PLUS_OPERATOR:
+            return np.add(left, right)
+        if op == TokenType.MINUS_OPERATOR:
+            return np.subtract(left, right)
+        if op == TokenType.MULTIPLY_OPERATOR:
+            return np.multiply(left, right)
+        if op == TokenType.INTEGER_DIVIDE_OPERATOR:
+            return np.floor_divide(left, right)
+        if op == TokenType.FLOAT_DIVIDE_OPERATOR:
+            return np.true_divide(np.asarray(left, dtype=float), np.asarray(right, dtype=float))
+
+    def visit_Assign(self, node):
+        self.frame[node.left.slot] = self.visit(node.right)
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def condition(self, node):
+        value = np.asarray(self.visit(node.condition))
+        if value.ndim != 0:
+            if value.size == 0:
+                return False
+            if not (value == value.flat[0]).all():
+                raise Exception("Batch execution needs IF and WHILE conditions that are the same for every row")
+            value = value.flat[0]
+        return bool(value)
+
+    def visit_If(self, node):
+        if self.condition(node):
+            self.visit(node.then_branch)
+        elif node.else_branch is not None:
+            self.visit(node.else_branch)
+
+    def visit_While(self, node):
+        while self.condition(node):
+            self.visit(node.body)
+
+    def visit_NoOP(self, node):
+        pass
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        self.visit(node.compound_statement)
+
+"""
+    Evaluates a program resolved by SymbolTableBuilder once per batch.
+
+    columns maps declared variable names to equally long 1-D arrays of input
+    values; variables without a column start unassigned. Returns a column for
+    every variable that holds a value at the end, like Interpreter.GLOBAL_SCOPE.
+"""
+def run_batch(tree, symbol_table, columns):
+    if np is None:
+        raise Exception("Batch execution requires numpy")
+
+    variables = symbol_table.variables
+    frame = [None] * len(variables)
+    rows = None
+    for name, column in columns.items():
+        symbol = symbol_table.lookup(name)
+        if symbol is None or symbol not in variables:
+            raise Exception(f"Variable '{name}' not found")
+
+        column = np.asarray(column)
+        if column.ndim != 1 or (rows is not None and len(column) != rows):
+            raise Exception(f"Column '{name}' must be 1-D with one value per row")
+        rows = len(column)
+        frame[symbol.slot] = column
+
+    if rows is None:
+        raise Exception("Batch execution needs at least one input column")
+
+    with np.errstate(divide="raise", invalid="raise"):
+        BatchEvaluator(frame).visit(tree)
+
+    return {
+        v.name: np.broadcast_to(frame[v.slot], (rows,)).copy()
+        for v in variables if frame[v.slot] is not None
+    }
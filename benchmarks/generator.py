@@ -0,0 +1,66 @@
+import random
+
+"""
+    Seeded generator for large, valid programs.
+
+    The first half of the declared variables are inputs: assigned a literal
+    once and only read afterwards. The rest are outputs, assigned either an
+    expression over the inputs or another output plus such an expression, so
+    values grow linearly with the statement count instead of exponentially.
+
+    comments and strings are the fraction of statements preceded by a
+    comment and the fraction of extra statements assigning a string literal
+    to one of the separately declared text variables.
+"""
+
+OPERATORS = ["+", "-", "*"]
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+TEXT_VARIABLES = 4
+
+def expression(rng, inputs, depth):
+    if depth <= 0 or rng.random() < 0.3:
+        if rng.random() < 0.7:
+            return rng.choice(inputs)
+        return str(rng.randint(1, 9))
+
+    left = expression(rng, inputs, depth - 1)
+    right = expression(rng, inputs, depth - 1)
+    operator = rng.choice(OPERATORS)
+    if rng.random() < 0.1:
+        return f"({left} {operator} {right}) DIV {rng.randint(1, 9)}"
+    return f"({left} {operator} {right})"
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def generate_program(statements=1000, variables=20, depth=3, seed=0, comments=0.0, strings=0.0):
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(max(variables, 2))]
+    inputs = names[:len(names) // 2]
+    outputs = names[len(names) // 2:]
+    texts = [f"t{i}" for i in range(TEXT_VARIABLES)] if strings else []
+
+    lines = [f"{name} := {rng.randint(1, 9)}" for name in names]
+    for _ in range(statements):
+        target = rng.choice(outputs)
+        value = expression(rng, inputs, depth)
+        if rng.random() < 0.5:
+            value = f"{rng.choice(outputs)} {rng.choice(['+', '-'])} {value}"
+        line = f"{target} := {value}"
+        if comments and rng.random() < comments:
+            line = f"{{ {words(rng, rng.randint(1, 8))} }}\n    {line}"
+        lines.append(line)
+        if strings and rng.random() < strings:
+            lines.append(f"{rng.choice(texts)} := '{words(rng, rng.randint(1, 4))}'")
+
+    declarations = f"    {', '.join(names)} : INTEGER;\n"
+    if texts:
+        declarations += f"    {', '.join(texts)} : INTEGER;\n"
+    return (
+        "PROGRAM generated;\n"
+        "VAR\n"
+        + declarations +
+        "BEGIN\n"
+        "    " + ";\n    ".join(lines) + "\n"
+        "END.\n"
+    )
@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import server
+from client import AsyncClient
+from benchmarks.generator import generate_program
+
+"""
+    Sends generated programs to server.py from many concurrent connections
+    and reports throughput and latency percentiles:
+
+        python -m benchmarks.loadtest --spawn --connections 32 --requests 2000
+        python -m benchmarks.loadtest --unix /tmp/interpreter.sock --by-hash
+
+    Each connection sends its requests one after another, cycling through
+    --programs distinct programs. With --by-hash every program is sent as
+    source once and by its hash afterwards. --spawn starts a server on a
+    temporary Unix socket for the run instead of using a running one.
+"""
+
+PERCENTILES = (50, 90, 99)
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+async def connection(address, sources, requests, options, hashes, latencies, errors):
+    async with await AsyncClient.connect(**address) as client:
+        for i in range(requests):
+            index = i % len(sources)
+            fields = {"engine": options.engine, "deadline": options.deadline}
+            if options.by_hash and index in hashes:
+                fields["hash"] = hashes[index]
+            else:
+                fields["source"] = sources[index]
+
+            start = time.perf_counter()
+            response = await client.run(**fields)
+            latencies.append(time.perf_counter() - start)
+            if response["ok"]:
+                hashes[index] = response["hash"]
+            else:
+                errors[response["type"]] = errors.get(response["type"], 0) + 1
+
+async def load(address, options):
+    sources = [
+        generate_program(statements=options.statements, seed=seed)
+        for seed in range(options.programs)
+    ]
+    per_connection, extra = divmod(options.requests, options.connections)
+    hashes = {}
+    latencies = []
+    errors = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        connection(address, sources, per_connection + (i < extra), options, hashes, latencies, errors)
+        for i in range(options.connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "latency": {f"p{p}": percentile(latencies, p) for p in PERCENTILES} | {"max": latencies[-1] if latencies else 0.0},
+    }
+
+def report(result):
+    latency = result["latency"]
+    lines = [
+        f"requests:   {result['requests']:10d}  in {result['seconds']:.2f} s",
+        f"throughput: {result['requests_per_sec']:10.1f} requests/s",
+        *(f"{name + ':':11} {seconds * 1000:10.2f} ms" for name, seconds in latency.items()),
+    ]
+    for kind, count in sorted(result["errors"].items()):
+        lines.append(f"errors:     {count:10d}  {kind}")
+    return "\n".join(lines)
+
+def spawn(path, options):
+    command = [sys.executable, server.__file__, "--unix", path]
+    if options.max_concurrent:
+        command += ["--max-concurrent", str(options.max_concurrent)]
+    process = subprocess.Popen(command, stderr=subprocess.DEVNULL)
+    for _ in range(200):
+        if os.path.exists(path):
+            return process
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    process.kill()
+    raise Exception("Server did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the interpreter server")
+    parser.add_argument("--unix", help="Unix socket of a running server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="passed to a spawned server")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="total requests over all connections")
+    parser.add_argument("--programs", type=int, default=8, help="distinct programs to cycle through")
+    parser.add_argument("--statements", type=int, default=200)
+    parser.add_argument("--by-hash", action="store_true", help="resend programs by hash")
+    parser.add_argument("--engine", choices=server.ENGINES, default="tree")
+    parser.add_argument("--deadline", type=float, default=None)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    options = parser.parse_args()
+
+    process = None
+    if options.spawn:
+        directory = tempfile.mkdtemp()
+        options.unix = os.path.join(directory, "interpreter.sock")
+        process = spawn(options.unix, options)
+    address = {"path": options.unix} if options.unix else {"host": options.host, "port": options.port}
+
+    try:
+        result = asyncio.run(load(address, options))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(report(result))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import gc
+import tracemalloc
+
+from lexer import Lexer
+from parser import Parser
+from ops import AST
+from benchmarks.generator import generate_program
+
+"""
+    Reports the resident cost of an AST in bytes per node.
+
+    "before" rebuilds the tree with the layout the nodes had before __slots__:
+    plain classes with a __dict__ holding the attributes in LEGACY_FIELDS,
+    the operator token stored twice under token and op, the leaf value next
+    to its token, and a fresh dict-based Token per operator occurrence.
+    "after" rebuilds it with the current ops classes, including the slots
+    later passes added. Leaf tokens are shared by both copies and not
+    counted.
+"""
+
+class LegacyToken:
+    def __init__(self, type, value):
+        self.type = type
+        self.value = value
+
+"""
+    The attributes each node set in its __init__ before __slots__, pinned so
+    slots added since do not leak into the "before" layout. If and While
+    came later and are given the same plain-class treatment.
+"""
+LEGACY_FIELDS = {
+    "UnaryOP": ("op", "expr"),
+    "BinOP": ("left", "right", "op"),
+    "NoOP": (),
+    "Var": ("token", "value"),
+    "Compound": ("children",),
+    "If": ("condition", "then_branch", "else_branch"),
+    "While": ("condition", "body"),
+    "Assign": ("left", "right", "op"),
+    "Num": ("token", "value"),
+    "String": ("token", "value"),
+    "Block": ("declarations", "compound_statement"),
+    "VarDecl": ("var_node", "type_node"),
+    "Program": ("name", "block"),
+    "Type": ("token", "value"),
+}
+
+LEGACY_CLASSES = {}
+
+def legacy_class(cls):
+    if cls not in LEGACY_CLASSES:
+        LEGACY_CLASSES[cls] = type("Legacy" + cls.__name__, (object,), {})
+    return LEGACY_CLASSES[cls]
+
+def fields(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(getattr(klass, '__slots__', ()))
+    return names
+
+def copy_tree(node, legacy):
+    if isinstance(node, list):
+        return [copy_tree(n, legacy) for n in node]
+    if not isinstance(node, AST):
+        return node
+
+    cls = type(node)
+    target = legacy_class(cls) if legacy else cls
+    clone = target.__new__(target)
+    for name in LEGACY_FIELDS[cls.__name__] if legacy else fields(cls):
+        value = getattr(node, name)
+        if legacy and name == 'op':
+            value = LegacyToken(value.type, value.value)
+            clone.token = value
+        setattr(clone, name, copy_tree(value, legacy))
+    return clone
+
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(n) for n in node)
+    if not isinstance(node, AST):
+        return 0
+    return 1 + sum(count_nodes(getattr(node, name)) for name in fields(type(node)))
+
+def measure(tree, legacy):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copy = copy_tree(tree, legacy)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del copy
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description="AST memory per node")
+    parser.add_argument("--statements", type=int, default=20000)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    source = generate_program(args.statements, args.variables, args.depth, args.seed)
+    tree = Parser(Lexer(source)).parse()
+    nodes = count_nodes(tree)
+
+    before = measure(tree, legacy=True)
+    after = measure(tree, legacy=False)
+    print(f"nodes:  {nodes}")
+    print(f"before: {before / nodes:8.1f} bytes/node ({before} bytes)")
+    print(f"after:  {after / nodes:8.1f} bytes/node ({after} bytes)")
+    print(f"saved:  {100 * (1 - after / before):8.1f} %")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from enums import TokenType
+from lexer import Lexer
+from parser import Parser
+from incremental import TokenList
+from interpreter import Interpreter, SymbolTableBuilder, __version__
+from benchmarks.generator import generate_program
+from benchmarks.memory import count_nodes
+
+"""
+    Times each stage of the pipeline on a generated program and optionally
+    compares the result with a saved baseline.
+
+    Every stage runs on the output of the previous one, so the times are
+    separate: parsing reads an already lexed token list, the symbol table is
+    built on a parsed tree, and so on. Each stage reports the best of
+    --repeat runs. Peak memory is measured on a separate end-to-end run,
+    since tracemalloc slows everything it traces.
+
+    With --baseline the run fails (exit status 1) when any stage takes, or
+    peak memory grows, more than --threshold over the baseline value.
+"""
+
+STAGES = ("lex", "parse", "symtable", "interpret")
+
+def lex(source):
+    lexer = Lexer(source)
+    tokens = [lexer.current_token]
+    while tokens[-1].type != TokenType.EOF:
+        tokens.append(lexer.get_next_token())
+    return tokens
+
+def parse(tokens):
+    return Parser(TokenList(tokens)).parse()
+
+def build_symbol_table(tree):
+    builder = SymbolTableBuilder()
+    builder.visit(tree)
+    return builder.symbol_table
+
+def interpret(tree, symbol_table, engine):
+    Interpreter(None, engine=engine).execute(tree, symbol_table)
+
+def best_time(repeat, function, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def peak_memory(source, engine):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tree = parse(lex(source))
+        interpret(tree, build_symbol_table(tree), engine)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run(params, repeat=5, engine="tree"):
+    source = generate_program(**params)
+
+    lex_time, tokens = best_time(repeat, lex, source)
+    parse_time, tree = best_time(repeat, parse, tokens)
+    symtable_time, symbol_table = best_time(repeat, build_symbol_table, tree)
+    interpret_time, _ = best_time(repeat, interpret, tree, symbol_table, engine)
+    nodes = count_nodes(tree)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "engine": engine,
+        "params": params,
+        "source_bytes": len(source),
+        "stages": {
+            "lex": {"seconds": lex_time, "tokens": len(tokens), "tokens_per_sec": len(tokens) / lex_time},
+            "parse": {"seconds": parse_time, "nodes": nodes, "nodes_per_sec": nodes / parse_time},
+            "symtable": {"seconds": symtable_time, "variables": len(symbol_table.variables)},
+            "interpret": {"seconds": interpret_time, "statements": params["statements"]},
+        },
+        "peak_memory": peak_memory(source, engine),
+    }
+
+"""
+    Returns a list of (metric, baseline, current) for every metric that got
+    worse than baseline by more than threshold (a fraction)
+"""
+def regressions(baseline, current, threshold):
+    metrics = [(stage, baseline["stages"][stage]["seconds"], current["stages"][stage]["seconds"]) for stage in STAGES]
+    metrics.append(("peak_memory", baseline["peak_memory"], current["peak_memory"]))
+    return [(name, old, new) for name, old, new in metrics if new > old * (1 + threshold)]
+
+def report(result, baseline=None):
+    stages = result["stages"]
+    lines = [
+        f"lex:        {stages['lex']['seconds'] * 1000:10.2f} ms  {stages['lex']['tokens_per_sec']:12.0f} tokens/s",
+        f"parse:      {stages['parse']['seconds'] * 1000:10.2f} ms  {stages['parse']['nodes_per_sec']:12.0f} nodes/s",
+        f"symtable:   {stages['symtable']['seconds'] * 1000:10.2f} ms{'':21}",
+        f"interpret:  {stages['interpret']['seconds'] * 1000:10.2f} ms{'':21}",
+        f"peak:       {result['peak_memory'] / 1024:10.0f} KiB{'':20}",
+    ]
+    if baseline:
+        olds = [baseline["stages"][stage]["seconds"] for stage in STAGES] + [baseline["peak_memory"]]
+        news = [stages[stage]["seconds"] for stage in STAGES] + [result["peak_memory"]]
+        lines = [f"{line}  {100 * (new / old - 1):+7.1f} %" for line, old, new in zip(lines, olds, news)]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lexer, parser, symbol table and interpreter")
+    parser.add_argument("--statements", type=int, default=5000)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--comments", type=float, default=0.1, help="fraction of statements preceded by a comment")
+    parser.add_argument("--strings", type=float, default=0.1, help="fraction of extra string assignments")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", choices=Interpreter.ENGINES, default="tree")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction")
+    args = parser.parse_args()
+    if args.engine == "typed" and args.strings > 0:
+        # the generator declares its text variables INTEGER, which the type checker rejects
+        parser.error("--engine typed needs --strings 0")
+
+    params = {
+        "statements": args.statements,
+        "variables": args.variables,
+        "depth": args.depth,
+        "seed": args.seed,
+        "comments": args.comments,
+        "strings": args.strings,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["params"] != params or baseline["engine"] != args.engine:
+            parser.error(f"{args.baseline} was recorded with different parameters")
+
+    result = run(params, args.repeat, args.engine)
+
+    print(report(result, baseline))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if baseline:
+        failed = regressions(baseline, result, args.threshold)
+        for name, old, new in failed:
+            print(f"regression: {name} {old:.6g} -> {new:.6g} ({100 * (new / old - 1):+.1f} %)", file=sys.stderr)
+        if failed:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
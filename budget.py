@@ -0,0 +1,125 @@
+import math
+import time
+
+from ops import Assign, BinOP, UnaryOP, If, While
+
+class BudgetStats:
+    """
+        What a run had used when it finished or was stopped. int_bits is
+        the largest integer stored, tracked only under a max_int_bits limit.
+    """
+    def __init__(self):
+        self.statements = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.int_bits = 0
+
+    def as_dict(self):
+        return {
+            "statements": self.statements,
+            "nodes": self.nodes,
+            "seconds": self.seconds,
+            "int_bits": self.int_bits,
+        }
+
+    def __str__(self):
+        return (
+            f"statements={self.statements} nodes={self.nodes} "
+            f"seconds={self.seconds:.6f} int_bits={self.int_bits}"
+        )
+
+    __repr__ = __str__
+
+class BudgetExceeded(Exception):
+    """
+        Raised when a run goes over one of its Budget's limits. limit names
+        it ("statements", "nodes", "deadline" or "int_bits") and stats holds
+        the BudgetStats at that point, counting the statement that went over.
+    """
+    def __init__(self, limit, message, stats):
+        super().__init__(message)
+        self.limit = limit
+        self.stats = stats
+
+"""
+    Nodes evaluated by running statement once; every node of an expression
+    is evaluated exactly once since nothing short-circuits. For an If or
+    While that is its test, since Interpreter.steps charges the statements
+    in its branches or body separately.
+"""
+def statement_nodes(node):
+    if type(node) == Assign:
+        return 2 + statement_nodes(node.right)
+    if type(node) == If or type(node) == While:
+        return 1 + statement_nodes(node.condition)
+    if type(node) == BinOP:
+        return 1 + statement_nodes(node.left) + statement_nodes(node.right)
+    if type(node) == UnaryOP:
+        return 1 + statement_nodes(node.expr)
+    return 1
+
+class Budget:
+    """
+        Resource limits for one run; None leaves a limit off.
+
+        max_statements and max_nodes bound the statements executed and the
+        nodes they evaluate, deadline the wall-clock seconds since start(),
+        and max_int_bits the size of any integer a statement stores.
+
+        The checks run once per statement, after it has executed, and once
+        per IF or WHILE test, so every loop iteration is checked, in
+        charge(), which costs a clock read and a dict lookup rather than
+        anything per node. A single statement can therefore overshoot a
+        limit: its integer intermediates are not checked, only the value it
+        stores, and it is not interrupted at the deadline.
+    """
+    def __init__(self, max_statements=None, max_nodes=None, deadline=None, max_int_bits=None):
+        self.max_statements = max_statements
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.max_int_bits = max_int_bits
+        self.start()
+
+    def start(self):
+        self.stats = BudgetStats()
+        self.sizes = {}
+        self.started = time.perf_counter()
+        # unset limits become infinite so charge() compares unconditionally
+        self.statement_limit = math.inf if self.max_statements is None else self.max_statements
+        self.node_limit = math.inf if self.max_nodes is None else self.max_nodes
+        self.ends = math.inf if self.deadline is None else self.started + self.deadline
+
+    def charge(self, statement, frame):
+        stats = self.stats
+        stats.statements += 1
+        size = self.sizes.get(statement)
+        if size is None:
+            size = self.sizes[statement] = statement_nodes(statement)
+        stats.nodes += size
+
+        if stats.statements > self.statement_limit:
+            self.exceeded("statements", f"More than {self.max_statements} statements executed")
+        if stats.nodes > self.node_limit:
+            self.exceeded("nodes", f"More than {self.max_nodes} nodes evaluated")
+        if time.perf_counter() > self.ends:
+            self.exceeded("deadline", f"Deadline of {self.deadline}s exceeded")
+
+        if self.max_int_bits is not None and type(statement) == Assign:
+            value = frame[statement.left.slot]
+            if type(value) == int:
+                bits = value.bit_length()
+                if bits > stats.int_bits:
+                    stats.int_bits = bits
+                    if bits > self.max_int_bits:
+                        self.exceeded(
+                            "int_bits",
+                            f"{statement.left.value} holds a {bits} bit integer, over the limit of {self.max_int_bits}",
+                        )
+
+    def exceeded(self, limit, message):
+        self.stats.seconds = time.perf_counter() - self.started
+        raise BudgetExceeded(limit, message, self.stats)
+
+    def finish(self):
+        self.stats.seconds = time.perf_counter() - self.started
+        return self.stats
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import re
+import tempfile
+import zlib
+
+import enums
+import interpreter
+import lexer
+import names
+import ops
+import optimizer
+import parser
+import regex_lexer
+import serializer
+import symbol
+from interpreter import __version__, compile_source
+from serializer import dumps, loads
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+SUFFIX = ".program"
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def __str__(self):
+        return (
+            f"hits={self.hits} misses={self.misses} writes={self.writes} "
+            f"evictions={self.evictions} errors={self.errors}"
+        )
+
+    __repr__ = __str__
+
+"""
+    The modules whose code decides what compile_source returns and how it is
+    stored: lexing, parsing, folding and dead-store elimination, resolution
+    and the serialized format
+"""
+COMPILER_MODULES = (enums, ops, names, lexer, regex_lexer, parser, optimizer, symbol, interpreter, serializer)
+
+"""
+    Hash of the interpreter version and the source of COMPILER_MODULES, so
+    any change to how programs compile makes earlier cache entries miss
+    without anyone having to bump a version
+"""
+def compiler_fingerprint():
+    digest = hashlib.sha256(__version__.encode())
+    for module in COMPILER_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+COMPILER_FINGERPRINT = compiler_fingerprint()
+
+"""
+    Identifies a compiled program: the compiler fingerprint, whether it was
+    optimized (and type checked first, for the typed engine) and the source
+"""
+def program_key(source, optimize, engine="tree"):
+    digest = hashlib.sha256()
+    digest.update(COMPILER_FINGERPRINT.encode())
+    digest.update(b"\0optimize" if optimize else b"\0")
+    if optimize and engine == "typed":
+        digest.update(b"\0typed")
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+"""
+    Whether key has the shape program_key gives, 64 lowercase hex digits;
+    anything else could name a path outside the cache directory
+"""
+def is_program_key(key):
+    return type(key) == str and KEY_PATTERN.fullmatch(key) is not None
+
+class ProgramCache:
+    """
+        On-disk cache of compiled programs: the parsed, optionally folded and
+        checked (tree, symbol_table) pair that Interpreter.execute runs.
+
+        Entries are keyed by a hash of the compiler fingerprint and the source,
+        stored in serializer's compact form, compressed and written atomically, and evicted least
+        recently used first (by mtime, refreshed on every hit) once the
+        directory grows past max_bytes.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, optimize=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.optimize = optimize
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, engine="tree"):
+        return program_key(source, self.optimize, engine)
+
+    def path(self, key):
+        if not is_program_key(key):
+            raise Exception(f"Invalid program key {key!r}")
+        return os.path.join(self.directory, key + SUFFIX)
+
+    """
+        Returns the cached (tree, symbol_table) for source, compiling and
+        storing it on a miss. For the typed engine, compiling type checks the
+        source before optimizing it, as compile_source does.
+    """
+    def load(self, source, engine="tree"):
+        key = self.key(source, engine)
+        program = self.get(key)
+        if program is None:
+            program = compile_source(source, optimize=self.optimize, engine=engine)
+            self.put(key, program)
+        return program
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+
+        try:
+            program = loads(zlib.decompress(data))
+        except Exception:
+            # truncated or written by an incompatible build, treat as a miss
+            self.stats.errors += 1
+            self.stats.misses += 1
+            self.remove(path)
+            return None
+
+        self.stats.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    def put(self, key, program):
+        data = zlib.compress(dumps(program))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            self.remove(tmp)
+            raise
+
+        self.stats.writes += 1
+        self.evict()
+
+    def entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self.remove(path):
+                self.stats.evictions += 1
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
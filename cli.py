@@ -0,0 +1,189 @@
+import argparse
+import glob
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Queue
+from queue import Empty
+
+from interpreter import Interpreter, check_types, compile_source
+from optimizer import DeadStoreEliminator
+from cache import ProgramCache
+from budget import Budget, BudgetExceeded
+
+"""
+    Runs many program files across a process pool and streams one JSON
+    object per file to stdout, in completion order:
+
+        python cli.py programs/ 'more/**/*.pas' --workers 64 --chunksize 8 --timeout 5
+
+    Workers put each file's result on a queue as soon as it is done, so a
+    slow file does not hold back the rest of its chunk.
+"""
+
+POLL_INTERVAL = 0.05
+# how long to keep waiting for results a failed chunk put before failing
+DRAIN_TIMEOUT = 1.0
+
+# the queue results go back on, set in each worker by start_worker
+results = None
+
+class ProgramTimeout(Exception):
+    pass
+
+def raise_timeout(signum, frame):
+    raise ProgramTimeout("Timed out")
+
+def collect_files(paths, pattern):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True)))
+        else:
+            matches = sorted(glob.glob(path, recursive=True))
+            files.extend(matches if matches else [path])
+    return files
+
+def run_file(path, options, cache):
+    started = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        if cache:
+            tree, symbol_table = cache.load(source, options.engine)
+            if options.outputs is not None:
+                if options.engine == "typed":
+                    check_types(tree, symbol_table)
+                DeadStoreEliminator(options.outputs).eliminate(tree)
+        else:
+            tree, symbol_table = compile_source(source, optimize=options.optimize, outputs=options.outputs, resolved=False, engine=options.engine)
+
+        budget = None
+        if (options.max_statements, options.max_nodes, options.max_int_bits) != (None, None, None):
+            budget = Budget(options.max_statements, options.max_nodes, max_int_bits=options.max_int_bits)
+        interpreter = Interpreter(None, engine=options.engine, outputs=options.outputs, budget=budget)
+        interpreter.execute(tree, symbol_table)
+        return {
+            "file": path,
+            "ok": True,
+            "bindings": interpreter.GLOBAL_SCOPE,
+            "seconds": time.perf_counter() - started,
+        }
+    except BudgetExceeded as e:
+        return {
+            "file": path,
+            "ok": False,
+            "error": str(e),
+            "type": type(e).__name__,
+            "limit": e.limit,
+            "stats": e.stats.as_dict(),
+            "seconds": time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {
+            "file": path,
+            "ok": False,
+            "error": str(e),
+            "type": type(e).__name__,
+            "seconds": time.perf_counter() - started,
+        }
+
+def start_worker(queue):
+    global results
+    results = queue
+
+"""
+    Worker entry point: runs one chunk of (index, path) pairs, each under its
+    own timeout, putting (index, result) on the results queue per file
+"""
+def run_chunk(chunk, options):
+    cache = ProgramCache(options.cache_dir, optimize=options.optimize) if options.cache_dir else None
+    timer = options.timeout and hasattr(signal, "setitimer")
+    if timer:
+        signal.signal(signal.SIGALRM, raise_timeout)
+
+    for index, path in chunk:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, options.timeout)
+        try:
+            result = run_file(path, options, cache)
+        finally:
+            if timer:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        results.put((index, result))
+
+def chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def emit(result, out):
+    out.write(json.dumps(result, default=repr) + "\n")
+    out.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run program files in parallel")
+    parser.add_argument("paths", nargs="+", help="program files, directories or glob patterns")
+    parser.add_argument("--pattern", default="*.pas", help="file pattern used inside directories")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunksize", type=int, default=1, help="files per worker task")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per file")
+    parser.add_argument("--engine", choices=Interpreter.ENGINES, default="tree")
+    parser.add_argument("--max-statements", type=int, default=None, help="statements a file may execute")
+    parser.add_argument("--max-nodes", type=int, default=None, help="nodes a file may evaluate")
+    parser.add_argument("--max-int-bits", type=int, default=None, help="largest integer a file may store, in bits")
+    parser.add_argument("--optimize", action="store_true", help="fold constants and drop dead stores before running")
+    parser.add_argument("--outputs", type=lambda names: names.split(","), default=None,
+                        help="comma separated variables to report; other work is skipped where possible")
+    parser.add_argument("--cache-dir", default=None, help="compiled program cache directory")
+    options = parser.parse_args(argv)
+    budgeted = (options.max_statements, options.max_nodes, options.max_int_bits) != (None, None, None)
+    if budgeted and options.engine not in ("tree", "typed"):
+        parser.error("--max-statements, --max-nodes and --max-int-bits need --engine tree or typed")
+
+    files = list(enumerate(collect_files(options.paths, options.pattern)))
+    failed = 0
+    reported = set()
+
+    def report(index, result):
+        nonlocal failed
+        if index in reported:
+            return
+        reported.add(index)
+        failed += not result["ok"]
+        emit(result, sys.stdout)
+
+    queue = Queue()
+    with ProcessPoolExecutor(max_workers=options.workers, initializer=start_worker, initargs=(queue,)) as pool:
+        futures = {
+            pool.submit(run_chunk, chunk, options): chunk
+            for chunk in chunks(files, max(options.chunksize, 1))
+        }
+        while len(reported) < len(files):
+            try:
+                report(*queue.get(timeout=POLL_INTERVAL))
+                continue
+            except Empty:
+                pass
+
+            for future in [future for future in futures if future.done()]:
+                chunk = futures.pop(future)
+                error = future.exception()
+                if error is None:
+                    continue
+                # results the chunk put before failing may still be on their way
+                try:
+                    while True:
+                        report(*queue.get(timeout=DRAIN_TIMEOUT))
+                except Empty:
+                    pass
+                # the worker itself died, report every file it had not finished
+                for index, path in chunk:
+                    report(index, {"file": path, "ok": False, "error": str(error), "type": type(error).__name__})
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
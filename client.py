@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import json
+import socket
+
+"""
+    Clients for server.py. Both send one request per call and return the
+    response object as a dict; check response["ok"] before reading
+    "bindings". Pass path for a Unix socket, or host and port for TCP.
+
+        with Client(path="/tmp/interpreter.sock") as client:
+            first = client.run(source=source)
+            again = client.run(hash=first["hash"], outputs=["a"])
+"""
+
+def request_fields(source, hash, engine, outputs, deadline):
+    request = {"engine": engine}
+    if source is not None:
+        request["source"] = source
+    if hash is not None:
+        request["hash"] = hash
+    if outputs is not None:
+        request["outputs"] = list(outputs)
+    if deadline is not None:
+        request["deadline"] = deadline
+    return request
+
+class Client:
+    """
+        Blocking client; requests go one at a time over a single connection
+    """
+    def __init__(self, path=None, host="127.0.0.1", port=7000, timeout=None):
+        if path:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.socket.makefile("rwb")
+
+    def run(self, source=None, hash=None, engine="tree", outputs=None, deadline=None):
+        return self.request(request_fields(source, hash, engine, outputs, deadline))
+
+    def request(self, request):
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncClient:
+    """
+        asyncio client; any number of requests may be in flight on one
+        connection, matched to their responses by id
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}
+        self.receiver = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=7000, limit=64 * 1024 * 1024):
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path, limit=limit)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=limit)
+        return cls(reader, writer)
+
+    async def run(self, source=None, hash=None, engine="tree", outputs=None, deadline=None):
+        return await self.request(request_fields(source, hash, engine, outputs, deadline))
+
+    async def request(self, request):
+        id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[id] = future
+        self.writer.write(json.dumps({**request, "id": id}).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def receive(self):
+        error = ConnectionError("Server closed the connection")
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            error = e
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self.receiver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
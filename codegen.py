@@ -0,0 +1,162 @@
+import math
+
+from enums import TokenType
+from visitor import NodeVisitor
+
+"""
+    Python precedence levels used to decide where generated code needs
+    parentheses. == and != share the additive level in this language but not
+    in Python, and Python would chain a == b == c, so operands are wrapped
+    whenever their level is not strictly tighter than the operator's.
+"""
+COMPARISON, ADDITIVE, MULTIPLICATIVE, UNARY, ATOM = range(1, 6)
+
+BINARY_OPERATORS = {
+    TokenType.PLUS_OPERATOR: ("+", ADDITIVE),
+    TokenType.MINUS_OPERATOR: ("-", ADDITIVE),
+    TokenType.MULTIPLY_OPERATOR: ("*", MULTIPLICATIVE),
+    TokenType.INTEGER_DIVIDE_OPERATOR: ("//", MULTIPLICATIVE),
+    TokenType.EQUALS: ("==", COMPARISON),
+    TokenType.NOT_EQUALS: ("!=", COMPARISON),
+}
+
+def parenthesize(expression, minimum):
+    code, code_level = expression
+    if code_level < minimum:
+        return f"({code})"
+    return code
+
+class PythonCodeGenerator(NodeVisitor):
+    """
+        Translates a Program resolved by SymbolTableBuilder into the source of
+        a Python function. Each declared variable becomes the local v_<slot>;
+        the function returns the final frame as a list.
+
+        Reads that may happen before the variable is assigned are wrapped in a
+        check that raises the tree walker's "not found in scope" error; all
+        other reads are plain local loads. A variable counts as assigned after
+        an IF only when both branches assign it, and after a WHILE only when
+        it was before the loop.
+    """
+    def __init__(self):
+        self.lines = []
+        self.assigned = set()
+        self.indent = "    "
+
+    def line(self, code):
+        self.lines.append(self.indent + code)
+
+    """
+        Emits statement as an indented block, which must not be empty
+    """
+    def block(self, statement):
+        self.indent += "    "
+        length = len(self.lines)
+        self.visit(statement)
+        if len(self.lines) == length:
+            self.line("pass")
+        self.indent = self.indent[:-4]
+
+    def generate(self, tree, symbol_table):
+        slots = [f"v_{v.slot}" for v in symbol_table.variables]
+        self.lines = ["def __program__():"]
+        if slots:
+            self.lines.append(f"    {' = '.join(slots)} = None")
+        self.visit(tree)
+        self.lines.append(f"    return [{', '.join(slots)}]")
+        return "\n".join(self.lines) + "\n"
+
+    """
+        Expression visitors return (code, precedence level)
+    """
+    def visit_Num(self, node):
+        value = node.value
+        if type(value) == float and not math.isfinite(value):
+            return f"float({str(value)!r})", ATOM
+        if value < 0:
+            return repr(value), UNARY
+        return repr(value), ATOM
+
+    def visit_String(self, node):
+        return repr(node.value), ATOM
+
+    def visit_Var(self, node):
+        if node.slot in self.assigned:
+            return f"v_{node.slot}", ATOM
+        return f"(v_{node.slot} if v_{node.slot} is not None else __missing__({node.slot}))", ATOM
+
+    def visit_UnaryOP(self, node):
+        operand = self.visit(node.expr)
+        if node.op.type == TokenType.PLUS_OPERATOR:
+            return "+" + parenthesize(operand, UNARY), UNARY
+        if node.op.type == TokenType.MINUS_OPERATOR:
+            return "-" + parenthesize(operand, UNARY), UNARY
+        return operand
+
+    def visit_BinOP(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if node.op.type == TokenType.FLOAT_DIVIDE_OPERATOR:
+            return f"float({left[0]}) / float({right[0]})", MULTIPLICATIVE
+
+        symbol, level = BINARY_OPERATORS[node.op.type]
+        left_minimum = level + 1 if level == COMPARISON else level
+        code = f"{parenthesize(left, left_minimum)} {symbol} {parenthesize(right, level + 1)}"
+        return code, level
+
+    def visit_Assign(self, node):
+        code, _ = self.visit(node.right)
+        self.line(f"v_{node.left.slot} = {code}")
+        self.assigned.add(node.left.slot)
+
+    def visit_If(self, node):
+        code, _ = self.visit(node.condition)
+        self.line(f"if {code}:")
+        before = set(self.assigned)
+        self.block(node.then_branch)
+        if node.else_branch is None:
+            self.assigned = before
+            return
+
+        after_then, self.assigned = self.assigned, before
+        self.line("else:")
+        self.block(node.else_branch)
+        self.assigned &= after_then
+
+    def visit_While(self, node):
+        code, _ = self.visit(node.condition)
+        self.line(f"while {code}:")
+        before = set(self.assigned)
+        self.block(node.body)
+        self.assigned = before
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOP(self, node):
+        pass
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        self.visit(node.compound_statement)
+
+class PythonProgram:
+    """
+        A program compiled to a Python code object. run() executes it and
+        returns the final frame, slot for slot like Interpreter.frame.
+    """
+    def __init__(self, tree, symbol_table):
+        self.names = [v.name for v in symbol_table.variables]
+        self.source = PythonCodeGenerator().generate(tree, symbol_table)
+        namespace = {"__missing__": self.missing}
+        exec(compile(self.source, f"<program {tree.name}>", "exec"), namespace)
+        self.function = namespace["__program__"]
+
+    def missing(self, slot):
+        raise Exception(f"Variable {self.names[slot]} not found in scope")
+
+    def run(self):
+        return self.function()
@@ -0,0 +1,232 @@
+from enums import TokenType, OpCode
+from visitor import NodeVisitor
+from optimizer import loop_invariants
+from symbol import SymbolTable
+from ops import Num, String
+from vm import (
+    LOAD_CONST, LOAD_NAME, STORE_NAME, UNARY_PLUS, UNARY_MINUS, UNARY_FLOAT,
+    BINARY_ADD, BINARY_SUBTRACT, BINARY_MULTIPLY, BINARY_FLOOR_DIVIDE, BINARY_TRUE_DIVIDE,
+    COMPARE_EQUALS, COMPARE_NOT_EQUALS, JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE,
+    LOAD_INVARIANT, STORE_INVARIANT,
+)
+
+BINARY_OPCODES = {
+    TokenType.PLUS_OPERATOR: BINARY_ADD,
+    TokenType.MINUS_OPERATOR: BINARY_SUBTRACT,
+    TokenType.MULTIPLY_OPERATOR: BINARY_MULTIPLY,
+    TokenType.INTEGER_DIVIDE_OPERATOR: BINARY_FLOOR_DIVIDE,
+    TokenType.FLOAT_DIVIDE_OPERATOR: BINARY_TRUE_DIVIDE,
+    TokenType.EQUALS: COMPARE_EQUALS,
+    TokenType.NOT_EQUALS: COMPARE_NOT_EQUALS,
+}
+
+class Chunk:
+    """
+        Flat bytecode for one program.
+
+        code is a list of (opcode, argument) pairs laid out as consecutive ints,
+        constants is the constant pool and names maps every variable slot to its name,
+        followed by the temporaries caching loop invariants.
+    """
+    def __init__(self, names):
+        self.code = []
+        self.constants = []
+        self.names = names
+
+    def __str__(self):
+        lines = []
+        for pc in range(0, len(self.code), 2):
+            op, arg = OpCode(self.code[pc]), self.code[pc + 1]
+            if op == OpCode.LOAD_CONST:
+                lines.append(f"{pc:4} {op.name} {arg} ({self.constants[arg]!r})")
+            elif op in (OpCode.LOAD_NAME, OpCode.STORE_NAME):
+                lines.append(f"{pc:4} {op.name} {arg} ({self.names[arg]})")
+            elif op == OpCode.STORE_INVARIANT:
+                lines.append(f"{pc:4} {op.name} {arg} ({self.names[arg]})")
+            elif op in (OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.JUMP_IF_TRUE, OpCode.LOAD_INVARIANT):
+                lines.append(f"{pc:4} {op.name} {arg}")
+            else:
+                lines.append(f"{pc:4} {op.name}")
+        return "\n".join(lines)
+
+    __repr__ = __str__
+
+class Compiler(NodeVisitor):
+    """
+        Lowers a Program tree, already resolved by SymbolTableBuilder, into a
+        Chunk that the VM can run. Variables are addressed by their slot.
+
+        IF and WHILE become conditional jumps. A loop tests its condition once
+        on entry and again at the bottom of the body, so an iteration costs a
+        single jump. Operator expressions that optimizer.loop_invariants finds
+        invariant are cached in a temporary slot, cleared on every entry to
+        the loop: the first evaluation computes and stores the value where
+        the program would have, so errors surface exactly as before, and
+        later iterations load it with one instruction.
+    """
+    def __init__(self):
+        self.chunk = None
+        self.symbol_table = None
+        self.constant_index = {}
+        self.hoisted = {}
+
+    def compile(self, tree, symbol_table):
+        self.symbol_table = symbol_table
+        self.chunk = Chunk([v.name for v in symbol_table.variables])
+        self.hoisted = {}
+        self.visit(tree)
+        return self.chunk
+
+    """
+        Appends an instruction and returns its position, for patch()
+    """
+    def emit(self, op, arg=0):
+        position = len(self.chunk.code)
+        self.chunk.code += (op, arg)
+        return position
+
+    def patch(self, position, target):
+        self.chunk.code[position + 1] = target
+
+    def constant(self, value):
+        # True == 1 == 1.0 hash alike, so the type is part of the key
+        key = (type(value), value)
+        index = self.constant_index.get(key)
+        if index is None:
+            index = len(self.chunk.constants)
+            self.chunk.constants.append(value)
+            self.constant_index[key] = index
+        return index
+
+    """
+        Gives each expression not cached yet a temporary slot and clears the
+        slots of all of them, at the entry to their loop
+    """
+    def cache(self, expressions):
+        for expression in expressions:
+            slot = self.hoisted.get(id(expression))
+            if slot is None:
+                slot = self.hoisted[id(expression)] = len(self.chunk.names)
+                self.chunk.names.append(f"<invariant {slot}>")
+            self.emit(LOAD_CONST, self.constant(None))
+            self.emit(STORE_NAME, slot)
+
+    """
+        Emits node wrapped in its cache when it has one, returning whether
+        it did
+    """
+    def cached(self, node):
+        slot = self.hoisted.pop(id(node), None)
+        if slot is None:
+            return False
+        load = self.emit(LOAD_INVARIANT)
+        self.visit(node)
+        self.emit(STORE_INVARIANT, slot)
+        self.patch(load, len(self.chunk.code))
+        self.hoisted[id(node)] = slot
+        return True
+
+    def visit_UnaryOP(self, node):
+        if self.cached(node):
+            return
+        self.visit(node.expr)
+        if node.op.type == TokenType.PLUS_OPERATOR:
+            self.emit(UNARY_PLUS)
+        elif node.op.type == TokenType.MINUS_OPERATOR:
+            self.emit(UNARY_MINUS)
+
+    def visit_BinOP(self, node):
+        if self.cached(node):
+            return
+        self.visit(node.left)
+        if node.op.type == TokenType.FLOAT_DIVIDE_OPERATOR and type(node.right) not in (Num, String):
+            # like the tree walker, fail converting the left operand before evaluating the right one
+            self.emit(UNARY_FLOAT)
+        self.visit(node.right)
+        self.emit(BINARY_OPCODES[node.op.type])
+
+    def visit_Num(self, node):
+        self.emit(LOAD_CONST, self.constant(node.value))
+
+    def visit_String(self, node):
+        self.emit(LOAD_CONST, self.constant(node.value))
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_If(self, node):
+        self.visit(node.condition)
+        skip_then = self.emit(JUMP_IF_FALSE)
+        self.visit(node.then_branch)
+        if node.else_branch is None:
+            self.patch(skip_then, len(self.chunk.code))
+            return
+
+        skip_else = self.emit(JUMP)
+        self.patch(skip_then, len(self.chunk.code))
+        self.visit(node.else_branch)
+        self.patch(skip_else, len(self.chunk.code))
+
+    def visit_While(self, node):
+        self.cache(loop_invariants(node))
+        self.visit(node.condition)
+        exit = self.emit(JUMP_IF_FALSE)
+
+        start = len(self.chunk.code)
+        self.visit(node.body)
+        self.visit(node.condition)
+        self.emit(JUMP_IF_TRUE, start)
+        self.patch(exit, len(self.chunk.code))
+
+    def visit_NoOP(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        self.visit(node.right)
+        self.emit(STORE_NAME, node.left.slot)
+
+    def visit_Var(self, node):
+        self.emit(LOAD_NAME, node.slot)
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        for d in node.declarations:
+            self.visit(d)
+
+        self.visit(node.compound_statement)
+
+    def visit_VarDecl(self, node):
+        pass
+
+    def visit_Type(self, node):
+        pass
+
+class ResolvingCompiler(Compiler):
+    """
+        A Compiler for a tree SymbolTableBuilder has not resolved. It builds
+        symbol_table itself, declaring variables and resolving each Var as
+        it emits the code reading or storing it, so the program is walked
+        once instead of twice. Undeclared variables raise the builder's
+        errors, in the same order.
+    """
+    def compile(self, tree, symbol_table=None):
+        return super().compile(tree, SymbolTable())
+
+    def visit_Block(self, node):
+        for declaration in node.declarations:
+            self.symbol_table.declare(declaration)
+        self.chunk.names = [v.name for v in self.symbol_table.variables]
+
+        self.visit(node.compound_statement)
+
+    def visit_Assign(self, node):
+        self.symbol_table.resolve(node.left)
+        self.visit(node.right)
+        self.emit(STORE_NAME, node.left.slot)
+
+    def visit_Var(self, node):
+        self.symbol_table.resolve(node)
+        self.emit(LOAD_NAME, node.slot)
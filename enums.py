@@ -29,3 +29,33 @@ class TokenType(Enum):
     PROGRAM = 23
     COMMA = 24
     COLON = 25
+    THEN = 26
+    WHILE = 27
+    DO = 28
+
+    # members are singletons, so identity hashing is correct and avoids the
+    # Python-level Enum.__hash__ on every dict or set lookup keyed by type
+    __hash__ = object.__hash__
+
+class OpCode(Enum):
+    LOAD_CONST = 1
+    LOAD_NAME = 2
+    STORE_NAME = 3
+
+    UNARY_PLUS = 4
+    UNARY_MINUS = 5
+
+    BINARY_ADD = 6
+    BINARY_SUBTRACT = 7
+    BINARY_MULTIPLY = 8
+    BINARY_FLOOR_DIVIDE = 9
+    BINARY_TRUE_DIVIDE = 10
+    COMPARE_EQUALS = 11
+    COMPARE_NOT_EQUALS = 12
+
+    JUMP = 13
+    JUMP_IF_FALSE = 14
+    JUMP_IF_TRUE = 15
+    LOAD_INVARIANT = 16
+    STORE_INVARIANT = 17
+    UNARY_FLOAT = 18
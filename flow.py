@@ -0,0 +1,61 @@
+from ops import Compound, NoOP, If, While
+
+"""
+    Statements lowered to a flat instruction list, so control flow runs as a
+    loop over a program counter instead of recursive visits:
+
+        IF c THEN a ELSE b      JumpUnless(c, else); a; Jump(end); else: b; end:
+        WHILE c DO a            head: JumpUnless(c, end); a; Jump(head); end:
+
+    Any other instruction is a statement node (an Assign) to visit. Compound
+    statements are spliced in and empty statements dropped.
+"""
+
+class Jump:
+    __slots__ = ('target',)
+
+    def __init__(self, target=None):
+        self.target = target
+
+class JumpUnless:
+    """
+        Evaluates condition and falls through when it is true, otherwise
+        jumps to target. node is the If or While it was lowered from.
+    """
+    __slots__ = ('node', 'condition', 'target')
+
+    def __init__(self, node, target=None):
+        self.node = node
+        self.condition = node.condition
+        self.target = target
+
+def flatten(statement, code=None):
+    if code is None:
+        code = []
+
+    kind = type(statement)
+    if kind == Compound:
+        for child in statement.children:
+            flatten(child, code)
+    elif kind == If:
+        test = JumpUnless(statement)
+        code.append(test)
+        flatten(statement.then_branch, code)
+        if statement.else_branch is None:
+            test.target = len(code)
+        else:
+            skip = Jump()
+            code.append(skip)
+            test.target = len(code)
+            flatten(statement.else_branch, code)
+            skip.target = len(code)
+    elif kind == While:
+        head = len(code)
+        test = JumpUnless(statement)
+        code.append(test)
+        flatten(statement.body, code)
+        code.append(Jump(head))
+        test.target = len(code)
+    elif kind != NoOP:
+        code.append(statement)
+    return code
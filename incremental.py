@@ -0,0 +1,229 @@
+from bisect import bisect_left
+
+from enums import TokenType
+from parser import Parser
+from regex_lexer import RegexLexer
+from ops import Compound, child_statements
+
+class TokenList:
+    """
+        Lexer interface over an already lexed token list, so Parser can start
+        at any token index. The list always ends with the EOF token.
+    """
+    def __init__(self, tokens, index=0):
+        self.tokens = tokens
+        self.index = index
+        self.current_token = tokens[index]
+
+    def get_next_token(self):
+        if self.index < len(self.tokens) - 1:
+            self.index += 1
+        return self.tokens[self.index]
+
+class SpanParser(Parser):
+    """
+        Parser that records, for every statement it builds, the half-open range
+        of token indices the statement consumed
+    """
+    def __init__(self, lexer, spans):
+        super().__init__(lexer)
+        self.spans = spans
+
+    def statement(self):
+        start = self.lexer.index
+        node = super().statement()
+        self.spans[id(node)] = (start, self.lexer.index)
+        return node
+
+    def compound_statement(self):
+        start = self.lexer.index
+        node = super().compound_statement()
+        self.spans[id(node)] = (start, self.lexer.index)
+        return node
+
+def lex(text, pos=0):
+    lexer = RegexLexer(text, pos)
+    tokens, starts, ends = [], [], []
+    while True:
+        token = lexer.current_token
+        tokens.append(token)
+        starts.append(lexer.start)
+        ends.append(lexer.pos)
+        if token.type == TokenType.EOF:
+            return tokens, starts, ends
+        lexer.current_token = lexer.get_next_token()
+
+class IncrementalParser:
+    """
+        Keeps the tokens (with source offsets) and the parse tree of a program
+        and updates both for a text edit.
+
+        edit() re-lexes from the last token boundary before the edit until the
+        new token stream lines up with the old one again, then re-parses only
+        the innermost statement of the enclosing Compound whose tokens contain
+        every changed token. A statement is only reused in place when its
+        re-parse consumes exactly its new token range, which is when a full
+        parse would have built the same node; otherwise the enclosing
+        Compound is tried, and finally the whole program.
+
+        last_edit describes what the most recent edit() did. If an edit leaves
+        the text unparsable, edit() raises and tree stays None; the next
+        edit then re-lexes and re-parses everything.
+    """
+    def __init__(self, text):
+        self.spans = {}
+        self.last_edit = None
+        self.reset(text)
+
+    def reset(self, text):
+        self.text = text
+        self.tree = None
+        self.tokens, self.starts, self.ends = lex(text)
+        self.tree = self.parse_all()
+        return self.tree
+
+    def parse_all(self):
+        self.spans.clear()
+        return SpanParser(TokenList(self.tokens), self.spans).parse()
+
+    def edit(self, offset, deleted, inserted):
+        text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        delta = len(inserted) - deleted
+        if self.tree is None:
+            self.last_edit = {"relexed": None, "removed": None, "reparsed": "program"}
+            return self.reset(text)
+
+        # tokens ending before the edit only looked one character past their end, so they stay
+        first = bisect_left(self.ends, offset)
+        restart = self.ends[first - 1] if first > 0 else 0
+
+        try:
+            tokens, starts, ends, last = self.relex(text, restart, offset + deleted, delta)
+        except Exception:
+            self.text = text
+            self.tree = None
+            raise
+
+        shift = len(tokens) - (last - first)
+        self.text = text
+        self.tokens[first:last] = tokens
+        self.starts[first:last] = starts
+        self.ends[first:last] = ends
+        tail = first + len(tokens)
+        self.starts[tail:] = [s + delta for s in self.starts[tail:]]
+        self.ends[tail:] = [e + delta for e in self.ends[tail:]]
+
+        self.last_edit = {"relexed": len(tokens), "removed": last - first, "reparsed": None}
+        if not tokens and last == first:
+            self.last_edit["reparsed"] = "none"
+            return self.tree
+
+        try:
+            path = self.enclosing_statements(first, last)
+            self.shift_spans(last, shift, path)
+            self.tree = self.reparse(path)
+        except Exception:
+            # the text no longer parses; start from scratch on the next edit
+            self.tree = None
+            raise
+        return self.tree
+
+    """
+        Lexes text from restart until a token starts where an old token at or
+        after changed_end would now start, returning the new tokens and
+        the index of the first old token that is kept
+    """
+    def relex(self, text, restart, changed_end, delta):
+        lexer = RegexLexer(text, restart)
+        tokens, starts, ends = [], [], []
+        last = bisect_left(self.starts, changed_end)
+        while True:
+            token = lexer.current_token
+            start = lexer.start
+            # same offset in the unchanged tail means the rest of the stream is the same too
+            while last < len(self.starts) and self.starts[last] + delta < start:
+                last += 1
+            if last < len(self.starts) and self.starts[last] + delta == start:
+                break
+            tokens.append(token)
+            starts.append(start)
+            ends.append(lexer.pos)
+            if token.type == TokenType.EOF:
+                last = len(self.tokens)
+                break
+            lexer.current_token = lexer.get_next_token()
+        return tokens, starts, ends, last
+
+    """
+        Moves old token indices at or after last by shift. Statements that
+        contain the change keep their start, since the new tokens are theirs.
+    """
+    def shift_spans(self, last, shift, path):
+        if shift == 0:
+            return
+        enclosing = {id(node) for node in path}
+        for key, (start, end) in self.spans.items():
+            if key in enclosing:
+                self.spans[key] = (start, end + shift)
+            else:
+                self.spans[key] = (
+                    start + shift if start >= last else start,
+                    end + shift if end >= last else end,
+                )
+
+    """
+        Returns the chain of statements, outermost first, whose token ranges
+        contain every old token index in [first, last)
+    """
+    def enclosing_statements(self, first, last):
+        path = []
+        node = self.tree.block.compound_statement
+        # the declarations loop decides where the body starts by looking at its BEGIN
+        if self.spans[id(node)][0] == first:
+            return path
+
+        while node is not None and self.contains(node, first, last):
+            path.append(node)
+            if type(node) != Compound:
+                break
+            node = next((child for child in node.children if self.contains(child, first, last)), None)
+        return path
+
+    def contains(self, node, first, last):
+        start, end = self.spans[id(node)]
+        return start <= first and last <= end and start < end
+
+    """
+        Re-parses the innermost statement of path that still parses to the
+        same extent, falling back to the whole program
+    """
+    def reparse(self, path):
+        root = self.tree.block.compound_statement
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            start, end = self.spans[id(node)]
+            spans = {}
+            parser = SpanParser(TokenList(self.tokens, start), spans)
+            new = parser.compound_statement() if node is root else parser.statement()
+            if parser.lexer.index != end:
+                continue
+
+            for key in self.statement_ids(node):
+                del self.spans[key]
+            self.spans.update(spans)
+            if node is root:
+                self.tree.block.compound_statement = new
+            else:
+                parent = path[depth - 1]
+                parent.children[parent.children.index(node)] = new
+            self.last_edit["reparsed"] = type(node).__name__
+            return self.tree
+
+        self.last_edit["reparsed"] = "program"
+        return self.parse_all()
+
+    def statement_ids(self, node):
+        ids = [id(node)]
+        for child in child_statements(node):
+            ids.extend(self.statement_ids(child))
+        return ids
@@ -1,18 +1,26 @@
 from enums import TokenType
-from symbol import SymbolTable, VarSymbol
-
-class NodeVisitor:
-    def visit(self, node):
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        raise Exception('No visit_{} method'.format(type(node).__name__))
+from symbol import SymbolTable
+from visitor import NodeVisitor
+from compiler import Compiler, ResolvingCompiler
+from vm import VM
+from optimizer import ConstantFolder, DeadStoreEliminator
+from codegen import PythonProgram
+from typecheck import TypeChecker, ResolvingTypeChecker, TypedEvaluator
+from parser import Parser
+from regex_lexer import RegexLexer
+from flow import flatten, Jump, JumpUnless
+from typed_env import TypedFrame, OVERFLOW_POLICIES
+
+__version__ = "0.2.0"
 
 class SymbolTableBuilder(NodeVisitor):
-    def __init__(self) -> None:
-        self.symbol_table = SymbolTable()
+    """
+        Declares a program's variables in symbol_table, a new one unless
+        given, and resolves every Var against it. Statements visited on their
+        own are resolved against the variables already declared.
+    """
+    def __init__(self, symbol_table=None) -> None:
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
 
     def visit_UnaryOP(self, node):
         self.visit(node.expr)
@@ -34,13 +42,17 @@ class SymbolTableBuilder(NodeVisitor):
         for child in node.children:
             self.visit(child)
 
-    def visit_NoOP(self, node):
-        pass
+    def visit_If(self, node):
+        self.visit(node.condition)
+        self.visit(node.then_branch)
+        if node.else_branch is not None:
+            self.visit(node.else_branch)
 
-    def visit_Assign(self, node):
-        pass
+    def visit_While(self, node):
+        self.visit(node.condition)
+        self.visit(node.body)
 
-    def visit_Var(self, node):
+    def visit_NoOP(self, node):
         pass
 
     def visit_Program(self, node):
@@ -53,34 +65,80 @@ class SymbolTableBuilder(NodeVisitor):
         self.visit(node.compound_statement)
 
     def visit_VarDecl(self, node):
-        typename = node.type_node.value
-        varname = node.var_node.value
-        typesymbol = self.symbol_table.lookup(typename)
-        varsymbol = VarSymbol(varname, typesymbol)
-        self.symbol_table.define(varsymbol)
+        self.symbol_table.declare(node)
 
     def visit_Assign(self, node):
-        varname = node.left.value
-        varsymbol = self.symbol_table.lookup(varname)
-        if not varsymbol:
-            raise Exception(f"Variable '{varname}' not found")
-
+        self.symbol_table.resolve(node.left)
         self.visit(node.right)
 
     def visit_Var(self, node):
-        varname = node.value
-        varsymbol = self.symbol_table.lookup(varname)
-        if not varsymbol:
-            raise Exception(f"Variable '{varname}' not found")
+        self.symbol_table.resolve(node)
 
     def visit_Type(self, node):
         pass
 
 class Interpreter(NodeVisitor):
-    GLOBAL_SCOPE = {}
+    ENGINES = ("tree", "vm", "python", "typed")
+
+    """
+        engine selects how the parsed program is executed:
+            tree: visit the AST, with statements flattened to jump code
+                (flow.flatten) so loops do not re-visit their bodies
+            vm: compile to bytecode, caching loop-invariant expressions
+                across iterations, and run it on the stack VM
+            python: generate Python source and run it as a compiled function
+            typed: check the program against its declared types, then visit
+                it with operations specialized to those types
+
+        optimize runs ConstantFolder over the tree first; the number of nodes
+        it removed is left in self.folder.removed
+
+        outputs names the variables the caller wants back. Stores no output
+        depends on are removed before running (self.eliminator reports them)
+        and GLOBAL_SCOPE only holds the outputs. optimize without outputs
+        still removes stores that are overwritten before being read.
+
+        profiler, a profiler.Profiler, is attached for the duration of each
+        run and collects per-node and per-statement timings (tree engine only)
+
+        budget, a budget.Budget, is restarted for each run and charged after
+        every statement; going over it raises budget.BudgetExceeded (tree and
+        typed engines only, and not together with a profiler)
+
+        Variables live in self.frame, a list indexed by the slots the program
+        was resolved to (None while unassigned). GLOBAL_SCOPE holds
+        the assigned variables by name once a run finishes.
+
+        storage="arrays" makes self.frame a typed_env.TypedFrame instead,
+        which keeps INTEGER and REAL values unboxed in arrays and applies
+        overflow to integers beyond 64 bits (tree and typed engines only)
+    """
+    def __init__(self, parser, engine="tree", optimize=False, profiler=None, outputs=None, budget=None,
+                 storage="list", overflow="box"):
+        if engine not in self.ENGINES:
+            raise Exception(f"Unknown engine '{engine}'")
+        if profiler is not None and engine != "tree":
+            raise Exception("Profiling needs the tree engine")
+        if budget is not None and (engine not in ("tree", "typed") or profiler is not None):
+            raise Exception("Budgets need the tree or typed engine and no profiler")
+        if storage not in ("list", "arrays"):
+            raise Exception(f"Unknown storage '{storage}'")
+        if storage == "arrays" and engine not in ("tree", "typed"):
+            raise Exception("Array storage needs the tree or typed engine")
+        if overflow not in OVERFLOW_POLICIES:
+            raise Exception(f"Unknown overflow policy '{overflow}'")
 
-    def __init__(self, parser):
         self.parser = parser
+        self.engine = engine
+        self.folder = ConstantFolder() if optimize else None
+        self.outputs = outputs
+        self.eliminator = DeadStoreEliminator(outputs) if optimize or outputs is not None else None
+        self.profiler = profiler
+        self.budget = budget
+        self.storage = storage
+        self.overflow = overflow
+        self.frame = []
+        self.GLOBAL_SCOPE = {}
 
     def visit_UnaryOP(self, node):
         if node.op.type == TokenType.PLUS_OPERATOR:
@@ -111,10 +169,10 @@ class Interpreter(NodeVisitor):
             return float(self.visit(node.left)) / float(self.visit(node.right))
 
     def visit_Num(self, node):
-        return node.value
+        return node.token.value
 
     def visit_String(self, node):
-        return node.value
+        return node.token.value
 
     def visit_Equals(self, node):
         return node.value
@@ -123,19 +181,31 @@ class Interpreter(NodeVisitor):
         for child in node.children:
             self.visit(child)
 
+    """
+        If and While are only visited when profiling; other runs execute the
+        flattened statements in run_code
+    """
+    def visit_If(self, node):
+        if self.visit(node.condition):
+            self.visit(node.then_branch)
+        elif node.else_branch is not None:
+            self.visit(node.else_branch)
+
+    def visit_While(self, node):
+        while self.visit(node.condition):
+            self.visit(node.body)
+
     def visit_NoOP(self, node):
         pass
 
     def visit_Assign(self, node):
-        v = node.left.value
-        self.GLOBAL_SCOPE[v] = self.visit(node.right)
+        self.frame[node.left.slot] = self.visit(node.right)
 
     def visit_Var(self, node):
-        name = node.value.lower()
-        if self.GLOBAL_SCOPE.get(name, None):
-            return self.GLOBAL_SCOPE[name]
-        else:
-            raise Exception(f"Variable {name} not found in scope")
+        value = self.frame[node.slot]
+        if value is None:
+            raise Exception(f"Variable {node.value} not found in scope")
+        return value
 
     def visit_Program(self, node):
         self.visit(node.block)
@@ -156,6 +226,183 @@ class Interpreter(NodeVisitor):
         tree = self.parser.parse()
         if tree is None:
             return ''
-        
-        ok = self.visit(tree)
-        return ok
+
+        if self.engine == "typed" and (self.folder or self.eliminator):
+            # folding and dropping stores must not change which programs type check
+            check_types(tree)
+        if self.folder:
+            tree = self.folder.fold(tree)
+        if self.eliminator:
+            self.eliminator.eliminate(tree)
+
+        return self.execute(tree)
+
+    """
+        Runs tree in a fresh frame. symbol_table is the one SymbolTableBuilder
+        resolved tree against; without it tree is resolved here, by the
+        compiler or type checker itself on the vm and typed engines.
+    """
+    def execute(self, tree, symbol_table=None):
+        if self.budget is not None:
+            return self.execute_within_budget(tree, symbol_table)
+
+        variables = []
+        self.frame = []
+        try:
+            if self.engine == "vm":
+                compiler = Compiler() if symbol_table is not None else ResolvingCompiler()
+                chunk = compiler.compile(tree, symbol_table)
+                variables = compiler.symbol_table.variables
+                self.frame = [None] * len(variables)
+                return VM(self.frame).run(chunk)
+
+            if self.engine == "typed":
+                symbol_table = check_types(tree, symbol_table)
+                variables = symbol_table.variables
+                self.frame = self.new_frame(symbol_table)
+                return self.run_code(TypedEvaluator(self.frame), flatten(tree.block.compound_statement))
+
+            if symbol_table is None:
+                symbol_table = resolve(tree)
+            variables = symbol_table.variables
+            self.frame = self.new_frame(symbol_table)
+            if self.engine == "python":
+                self.frame[:] = PythonProgram(tree, symbol_table).run()
+                return None
+
+            if self.profiler is not None:
+                self.profiler.attach(self, tree)
+                return self.visit(tree)
+            return self.run_code(self, flatten(tree.block.compound_statement))
+        finally:
+            if self.profiler is not None:
+                self.profiler.detach(self)
+            self.GLOBAL_SCOPE = self.bindings(variables)
+
+    def new_frame(self, symbol_table):
+        if self.storage == "arrays":
+            return TypedFrame(symbol_table, self.overflow)
+        return [None] * len(symbol_table.variables)
+
+    def execute_within_budget(self, tree, symbol_table):
+        budget = self.budget
+        budget.start()
+        charge = budget.charge
+        for statement in self.steps(tree, symbol_table):
+            charge(statement, self.frame)
+        budget.finish()
+
+    """
+        Runs code from flow.flatten, visiting each statement and condition
+        with visitor
+    """
+    def run_code(self, visitor, code):
+        visit = visitor.visit
+        pc = 0
+        end = len(code)
+        while pc < end:
+            instruction = code[pc]
+            kind = type(instruction)
+            if kind == JumpUnless:
+                pc = pc + 1 if visit(instruction.condition) else instruction.target
+            elif kind == Jump:
+                pc = instruction.target
+            else:
+                visit(instruction)
+                pc += 1
+
+    """
+        Like execute, but a generator that runs one step at a time: a step
+        is an assignment, yielded once it has run, or the test of an IF or
+        WHILE, which yields that If or While node. Every loop iteration is
+        at least one step. The caller can do other work between steps or
+        stop by closing the generator; GLOBAL_SCOPE is set either way. Only
+        the tree and typed engines evaluate statement by statement.
+    """
+    def steps(self, tree, symbol_table=None):
+        if self.engine not in ("tree", "typed"):
+            raise Exception(f"The {self.engine} engine cannot run step by step")
+
+        if self.engine == "typed":
+            symbol_table = check_types(tree, symbol_table)
+        elif symbol_table is None:
+            symbol_table = resolve(tree)
+        variables = symbol_table.variables
+        self.frame = self.new_frame(symbol_table)
+        visitor = self if self.engine == "tree" else TypedEvaluator(self.frame)
+
+        code = flatten(tree.block.compound_statement)
+        visit = visitor.visit
+        try:
+            pc = 0
+            end = len(code)
+            while pc < end:
+                instruction = code[pc]
+                kind = type(instruction)
+                if kind == JumpUnless:
+                    pc = pc + 1 if visit(instruction.condition) else instruction.target
+                    yield instruction.node
+                elif kind == Jump:
+                    pc = instruction.target
+                else:
+                    visit(instruction)
+                    pc += 1
+                    yield instruction
+        finally:
+            self.GLOBAL_SCOPE = self.bindings(variables)
+
+    def bindings(self, variables):
+        frame = self.frame
+        return {
+            v.name: frame[v.slot] for v in variables
+            if frame[v.slot] is not None and (self.outputs is None or v.name in self.outputs)
+        }
+
+def resolve(tree):
+    builder = SymbolTableBuilder()
+    builder.visit(tree)
+    return builder.symbol_table
+
+"""
+    Type checks tree for the typed engine, resolving it in the same walk
+    when symbol_table is None, and returns its symbol table. A type error
+    found before the walk reached an undeclared variable is reported after
+    it, as when the tree was resolved first.
+"""
+def check_types(tree, symbol_table=None):
+    if symbol_table is not None:
+        TypeChecker(symbol_table).check(tree)
+        return symbol_table
+
+    checker = ResolvingTypeChecker()
+    try:
+        checker.check(tree)
+    except Exception:
+        resolve(tree)
+        raise
+    return checker.symbol_table
+
+"""
+    Lexes, parses, optionally optimizes and checks source, returning the
+    resolved tree and its symbol table ready for Interpreter.execute.
+    optimize and outputs mean what they do for Interpreter.
+
+    resolved=False skips resolution and returns None for the symbol table,
+    leaving it to Interpreter.execute, which on the vm and typed engines
+    resolves in the walk it makes anyway. Only a resolved program can be
+    serialized or cached.
+
+    engine="typed" type checks the program as written before optimizing it,
+    since folding and dropping stores can turn a program the typed engine
+    rejects into one it accepts.
+"""
+def compile_source(source, optimize=False, outputs=None, resolved=True, engine="tree"):
+    tree = Parser(RegexLexer(source)).parse()
+    if engine == "typed" and (optimize or outputs is not None):
+        check_types(tree)
+    if optimize:
+        tree = ConstantFolder().fold(tree)
+    if optimize or outputs is not None:
+        DeadStoreEliminator(outputs).eliminate(tree)
+
+    return tree, resolve(tree) if resolved else None
@@ -1,5 +1,47 @@
 from enums import TokenType
 from parser import Token
+from names import NameTable
+
+RESERVED_KEYWORDS = {
+    "begin": Token(TokenType.BEGIN, "BEGIN"),
+    "end": Token(TokenType.END, "END"),
+    "var": Token(TokenType.VAR, "VAR"),
+    "program": Token(TokenType.PROGRAM, "PROGRAM"),
+    "integer": Token(TokenType.INTEGER, "INTEGER"),
+    "real": Token(TokenType.REAL, "REAL"),
+    "div": Token(TokenType.INTEGER_DIVIDE_OPERATOR, "INTEGER_DIV"),
+    "if": Token(TokenType.IF, "IF"),
+    "then": Token(TokenType.THEN, "THEN"),
+    "else": Token(TokenType.ELSE, "ELSE"),
+    "while": Token(TokenType.WHILE, "WHILE"),
+    "do": Token(TokenType.DO, "DO"),
+}
+
+"""
+    The identifier intern table every lexer shares; SymbolTable keys
+    variables by the ids it hands out.
+"""
+NAMES = NameTable(RESERVED_KEYWORDS)
+
+"""
+    Operator tokens carry no per-occurrence data, so every lexer hands out
+    these shared instances instead of allocating a Token each time.
+"""
+OPERATOR_TOKENS = {
+    "+": Token(TokenType.PLUS_OPERATOR, "+"),
+    "-": Token(TokenType.MINUS_OPERATOR, "-"),
+    "*": Token(TokenType.MULTIPLY_OPERATOR, "*"),
+    "/": Token(TokenType.FLOAT_DIVIDE_OPERATOR, "/"),
+    "(": Token(TokenType.LPAREN, "("),
+    ")": Token(TokenType.RPAREN, ")"),
+    ";": Token(TokenType.SEMI, ";"),
+    ".": Token(TokenType.DOT, "."),
+    ",": Token(TokenType.COMMA, ","),
+    ":": Token(TokenType.COLON, ":"),
+    ":=": Token(TokenType.ASSIGN, ":="),
+    "==": Token(TokenType.EQUALS, "=="),
+    "!=": Token(TokenType.NOT_EQUALS, "!="),
+}
 
 class Lexer:
     def __init__(self, text):
@@ -8,15 +50,7 @@ class Lexer:
         self.current_character = self.text[0]
         self.current_token = None
 
-        self.RESERVED_KEYWORDS = {
-            "begin": Token(TokenType.BEGIN, "BEGIN"),
-            "end": Token(TokenType.END, "END"),
-            "var": Token(TokenType.VAR, "VAR"),
-            "program": Token(TokenType.PROGRAM, "PROGRAM"),
-            "integer": Token(TokenType.INTEGER, "INTEGER"),
-            "real": Token(TokenType.REAL, "REAL"),
-            "div": Token(TokenType.INTEGER_DIVIDE_OPERATOR, "INTEGER_DIV"),
-        }
+        self.RESERVED_KEYWORDS = RESERVED_KEYWORDS
         self.current_token = self.get_next_token()
 
     def error(self):
@@ -26,13 +60,14 @@ class Lexer:
         Marks the token as identifier (variable name)
     """
     def _id(self):
-        result = ""
-        while self.current_character is not None and (self.current_character.isalnum() or self.current_character == '_'):
-            result += self.current_character
-            self.advance()
+        text = self.text
+        start = end = self.pos
+        while end < len(text) and (text[end].isalnum() or text[end] == '_'):
+            end += 1
 
-        token = self.RESERVED_KEYWORDS.get(result.lower(), Token(TokenType.ID, result))
-        return token
+        self.pos = end - 1
+        self.advance()
+        return NAMES.token(text[start:end])
 
     """
         Moves the pos marker to next position (pos+1) if possible
@@ -119,42 +154,42 @@ class Lexer:
                 return token
 
             if self.current_character == '+':
-                token = Token(TokenType.PLUS_OPERATOR, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == '-':
-                token = Token(TokenType.MINUS_OPERATOR, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == '*':
-                token = Token(TokenType.MULTIPLY_OPERATOR, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == '(':
-                token = Token(TokenType.LPAREN, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == ')':
-                token = Token(TokenType.RPAREN, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == ';':
-                token = Token(TokenType.SEMI, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == '.':
-                token = Token(TokenType.DOT, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == ',':
-                token = Token(TokenType.COMMA, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
             
@@ -163,18 +198,18 @@ class Lexer:
                 return token
 
             if self.current_character == "/":
-                token = Token(TokenType.FLOAT_DIVIDE_OPERATOR, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
             if self.current_character == ':' and self.peek() == '=':
-                token = Token(TokenType.ASSIGN, ":=")
+                token = OPERATOR_TOKENS[":="]
                 self.advance()
                 self.advance()
                 return token
 
             if self.current_character == ":":
-                token = Token(TokenType.COLON, text[self.pos])
+                token = OPERATOR_TOKENS[self.current_character]
                 self.advance()
                 return token
 
@@ -182,13 +217,13 @@ class Lexer:
                 return self._id()
 
             if self.current_character == '=' and self.peek() == '=':
-                token = Token(TokenType.EQUALS, "==")
+                token = OPERATOR_TOKENS["=="]
                 self.advance()
                 self.advance()
                 return token
 
             if self.current_character == '!' and self.peek() == '=':
-                token = Token(TokenType.NOT_EQUALS, "!=")
+                token = OPERATOR_TOKENS["!="]
                 self.advance()
                 self.advance()
                 return token
@@ -0,0 +1,82 @@
+import threading
+
+from enums import TokenType
+from parser import Token
+
+class NameToken(Token):
+    """
+        ID token that also carries the identifier's interned id
+    """
+    __slots__ = ('id',)
+
+    def __init__(self, value, id):
+        super().__init__(TokenType.ID, value)
+        self.id = id
+
+DEFAULT_CAPACITY = 1 << 16
+
+class NameTable:
+    """
+        Interns identifiers to small integer ids.
+
+        token(text) returns the keyword token for a reserved word (compared
+        case-insensitively) and otherwise one shared NameToken per distinct
+        spelling, so each spelling is lowercased and hashed into the table
+        once rather than on every occurrence. Identifiers themselves stay
+        case-sensitive. Lookups take no lock; adding a new name does, so
+        threads may lex and decode concurrently.
+
+        The table holds at most capacity names. Adding one more forgets all
+        of them and starts over, so a long-running process fed arbitrary
+        sources (the server) stays bounded; ids are never reused, so a name
+        interned again gets a new id and a stale one cannot match another
+        name. A token or id from before such a reset stays valid for the
+        program that holds it; SymbolTable falls back to the name when its
+        ids disagree with a Var's.
+    """
+    def __init__(self, keywords, capacity=DEFAULT_CAPACITY):
+        self.keywords = keywords
+        self.capacity = capacity
+        self.tokens = {}
+        self.ids = {}
+        self.names = {}
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def token(self, text):
+        token = self.tokens.get(text)
+        if token is None:
+            with self.lock:
+                token = self.tokens.get(text)
+                if token is None:
+                    token = self.keywords.get(text.lower())
+                    if token is None:
+                        token = NameToken(text, self.add(text))
+                    self.tokens[text] = token
+        return token
+
+    def id(self, name):
+        id = self.ids.get(name)
+        if id is None:
+            with self.lock:
+                id = self.add(name)
+        return id
+
+    # callers hold the lock
+    def add(self, name):
+        id = self.ids.get(name)
+        if id is None:
+            if len(self.tokens) >= self.capacity or len(self.ids) >= self.capacity:
+                self.tokens = {}
+                self.ids = {}
+                self.names = {}
+            id = self.ids[name] = self.next_id
+            self.names[id] = name
+            self.next_id += 1
+        return id
+
+    def name(self, id):
+        return self.names[id]
+
+    def __len__(self):
+        return len(self.names)
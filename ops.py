@@ -1,16 +1,32 @@
 class AST(object):
-    pass
+    __slots__ = ()
 
 class UnaryOP(AST):
+    __slots__ = ('op', 'expr', 'expr_type', 'operation')
+
     def __init__(self, op, expr):
-        self.token = self.op = op
+        self.op = op
         self.expr = expr
+        self.expr_type = None
+        self.operation = None
+
+    @property
+    def token(self):
+        return self.op
 
 class BinOP(AST):
+    __slots__ = ('left', 'right', 'op', 'expr_type', 'operation')
+
     def __init__(self, left, right, op):
         self.left = left
         self.right = right
-        self.token = self.op = op
+        self.op = op
+        self.expr_type = None
+        self.operation = None
+
+    @property
+    def token(self):
+        return self.op
 
     def p(self):
         if type(self) == BinOP:
@@ -30,50 +46,119 @@ class BinOP(AST):
             return
 
 class NoOP(AST):
-    pass
+    __slots__ = ()
 
 class Var(AST):
+    __slots__ = ('token', 'slot', 'expr_type')
+
     def __init__(self, token):
         self.token = token
-        self.value = self.token.value
+        self.slot = None
+        self.expr_type = None
+
+    @property
+    def value(self):
+        return self.token.value
+
+    @property
+    def name_id(self):
+        return self.token.id
 
 class Compound(AST):
+    __slots__ = ('children',)
+
     def __init__(self):
         self.children = []
 
+class If(AST):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+
+    def __init__(self, condition, then_branch, else_branch=None):
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+class While(AST):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
 class Assign(AST):
+    __slots__ = ('left', 'right', 'op')
+
     def __init__(self, left, op, right):
         self.left = left
         self.right = right
-        self.token = self.op = op
+        self.op = op
+
+    @property
+    def token(self):
+        return self.op
 
 class Num(AST):
+    __slots__ = ('token', 'expr_type')
+
     def __init__(self, token):
         self.token = token
-        self.value = self.token.value
+        self.expr_type = None
+
+    @property
+    def value(self):
+        return self.token.value
 
 class String(AST):
+    __slots__ = ('token', 'expr_type')
+
     def __init__(self, token):
         self.token = token
-        self.value = self.token.value
+        self.expr_type = None
+
+    @property
+    def value(self):
+        return self.token.value
 
 class Block(AST):
+    __slots__ = ('declarations', 'compound_statement')
+
     def __init__(self, declarations, compound_statement):
         self.declarations = declarations
         self.compound_statement = compound_statement
 
 class VarDecl(AST):
+    __slots__ = ('var_node', 'type_node')
+
     def __init__(self, var_node, type_node):
         self.var_node = var_node
         self.type_node = type_node
 
 class Program(AST):
+    __slots__ = ('name', 'block')
+
     def __init__(self, name, block):
         self.name = name
         self.block = block
 
 class Type(AST):
+    __slots__ = ('token',)
+
     def __init__(self, token):
         self.token = token
-        self.value = self.token.value
 
+    @property
+    def value(self):
+        return self.token.value
+
+
+"""
+    The statements directly nested in a statement node, in source order
+"""
+def child_statements(node):
+    if type(node) == Compound:
+        return node.children
+    if type(node) == If:
+        return [node.then_branch] if node.else_branch is None else [node.then_branch, node.else_branch]
+    if type(node) == While:
+        return [node.body]
+    return []
@@ -0,0 +1,445 @@
+import operator
+
+from enums import TokenType
+from parser import Token
+from ops import BinOP, UnaryOP, Num, String, Var, Assign, Compound, NoOP, If, While, child_statements
+from lexer import OPERATOR_TOKENS
+from visitor import NodeVisitor
+
+"""
+    Mirrors Interpreter.visit_BinOP so folded values are exactly what the
+    tree walker would have computed at run time.
+"""
+BINARY_OPERATIONS = {
+    TokenType.PLUS_OPERATOR: operator.add,
+    TokenType.MINUS_OPERATOR: operator.sub,
+    TokenType.MULTIPLY_OPERATOR: operator.mul,
+    TokenType.INTEGER_DIVIDE_OPERATOR: operator.floordiv,
+    TokenType.FLOAT_DIVIDE_OPERATOR: lambda left, right: float(left) / float(right),
+    TokenType.EQUALS: operator.eq,
+    TokenType.NOT_EQUALS: operator.ne,
+}
+
+ARITHMETIC_OPERATORS = (
+    TokenType.PLUS_OPERATOR,
+    TokenType.MINUS_OPERATOR,
+    TokenType.MULTIPLY_OPERATOR,
+    TokenType.INTEGER_DIVIDE_OPERATOR,
+    TokenType.FLOAT_DIVIDE_OPERATOR,
+)
+
+def constant(value):
+    if type(value) == float:
+        return Num(Token(TokenType.REAL, value))
+    return Num(Token(TokenType.INTEGER, value))
+
+def is_number(node, value=None):
+    if type(node) != Num or type(node.value) not in (int, float):
+        return False
+    return value is None or (type(node.value) == int and node.value == value)
+
+"""
+    Whether node is known to evaluate to an int or float (or to raise) before
+    the program runs. A variable may hold a string or a comparison's bool, so
+    it never is; unary + and - and the operators other than + and * turn
+    whatever they accept into a number, + does when either operand is one
+    and * when both are ('ab' * 2 is a string).
+"""
+def is_numeric(node):
+    if type(node) == Num:
+        return is_number(node)
+    if type(node) == UnaryOP:
+        return node.op.type in (TokenType.PLUS_OPERATOR, TokenType.MINUS_OPERATOR)
+    if type(node) == BinOP:
+        op = node.op.type
+        if op == TokenType.PLUS_OPERATOR:
+            return is_numeric(node.left) or is_numeric(node.right)
+        if op == TokenType.MULTIPLY_OPERATOR:
+            return is_numeric(node.left) and is_numeric(node.right)
+        return op in ARITHMETIC_OPERATORS
+    return False
+
+class ConstantFolder(NodeVisitor):
+    """
+        Rewrites a parsed Program in place before execution:
+            folds operators whose operands are numeric literals
+            drops the no-op unary == / != and collapses - - x into x
+            turns a - - b into a + b and a + - b into a - b
+            applies x * 1, 1 * x, x + 0, 0 + x and x - 0 for numeric x
+
+        Operations that would raise (division by zero, ...) are left for run
+        time. removed counts the AST nodes the rewrites dropped.
+    """
+    def __init__(self):
+        self.removed = 0
+
+    def fold(self, tree):
+        return self.visit(tree)
+
+    def visit_UnaryOP(self, node):
+        node.expr = self.visit(node.expr)
+        op = node.op.type
+        if op in (TokenType.EQUALS, TokenType.NOT_EQUALS):
+            self.removed += 1
+            return node.expr
+
+        if is_number(node.expr):
+            self.removed += 1
+            value = node.expr.value
+            return constant(-value if op == TokenType.MINUS_OPERATOR else +value)
+
+        if type(node.expr) == UnaryOP and is_numeric(node.expr.expr):
+            inner = node.expr.op.type
+            if op == TokenType.PLUS_OPERATOR or inner == TokenType.PLUS_OPERATOR:
+                # + - x and - + x are - x, + + x is + x
+                self.removed += 1
+                return node.expr if op == TokenType.PLUS_OPERATOR else UnaryOP(node.op, node.expr.expr)
+            self.removed += 2
+            return node.expr.expr
+
+        return node
+
+    def visit_BinOP(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        left, right, op = node.left, node.right, node.op.type
+
+        if is_number(left) and is_number(right):
+            try:
+                value = BINARY_OPERATIONS[op](left.value, right.value)
+            except ArithmeticError:
+                return node
+            self.removed += 2
+            return constant(value)
+
+        if type(right) == UnaryOP and right.op.type == TokenType.MINUS_OPERATOR and is_numeric(right.expr):
+            # a string on the left would raise a different error for + than for -
+            if op in (TokenType.PLUS_OPERATOR, TokenType.MINUS_OPERATOR) and is_numeric(left):
+                self.removed += 1
+                node.op = OPERATOR_TOKENS["-" if op == TokenType.PLUS_OPERATOR else "+"]
+                node.right = right.expr
+                return node
+
+        # x + 0 turns -0.0 into 0.0; that sign is the only value these change
+        if op == TokenType.MULTIPLY_OPERATOR:
+            if is_number(right, 1) and is_numeric(left):
+                self.removed += 2
+                return left
+            if is_number(left, 1) and is_numeric(right):
+                self.removed += 2
+                return right
+        elif op == TokenType.PLUS_OPERATOR:
+            if is_number(right, 0) and is_numeric(left):
+                self.removed += 2
+                return left
+            if is_number(left, 0) and is_numeric(right):
+                self.removed += 2
+                return right
+        elif op == TokenType.MINUS_OPERATOR:
+            if is_number(right, 0) and is_numeric(left):
+                self.removed += 2
+                return left
+
+        return node
+
+    def visit_Num(self, node):
+        return node
+
+    def visit_String(self, node):
+        return node
+
+    def visit_Var(self, node):
+        return node
+
+    def visit_NoOP(self, node):
+        return node
+
+    def visit_Compound(self, node):
+        node.children = [self.visit(child) for child in node.children]
+        return node
+
+    def visit_If(self, node):
+        node.condition = self.visit(node.condition)
+        node.then_branch = self.visit(node.then_branch)
+        if node.else_branch is not None:
+            node.else_branch = self.visit(node.else_branch)
+        return node
+
+    def visit_While(self, node):
+        node.condition = self.visit(node.condition)
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Assign(self, node):
+        node.right = self.visit(node.right)
+        return node
+
+    def visit_Program(self, node):
+        node.block = self.visit(node.block)
+        return node
+
+    def visit_Block(self, node):
+        node.compound_statement = self.visit(node.compound_statement)
+        return node
+
+"""
+    Value kinds for DeadStoreEliminator: what an expression is known to
+    produce without raising. Floats can only be mixed with small int literals,
+    since converting a large int to float raises OverflowError.
+"""
+INT = "int"
+FLOAT = "float"
+STR = "str"
+COMPARISONS = (TokenType.EQUALS, TokenType.NOT_EQUALS)
+DIVISIONS = (TokenType.INTEGER_DIVIDE_OPERATOR, TokenType.FLOAT_DIVIDE_OPERATOR)
+
+def is_small_int(node):
+    return is_number(node) and type(node.value) == int and abs(node.value) < 2 ** 53
+
+"""
+    The kind of value node evaluates to given the kinds of the variables
+    assigned so far, or None when evaluating it might raise
+"""
+def value_kind(node, kinds):
+    if type(node) == Num:
+        return FLOAT if type(node.value) == float else INT
+    if type(node) == String:
+        return STR
+    if type(node) == Var:
+        return kinds.get(node.value)
+
+    if type(node) == UnaryOP:
+        kind = value_kind(node.expr, kinds)
+        if node.op.type in COMPARISONS or kind in (INT, FLOAT):
+            return kind
+        return None
+
+    if type(node) == BinOP:
+        left = value_kind(node.left, kinds)
+        right = value_kind(node.right, kinds)
+        op = node.op.type
+        if left is None or right is None:
+            return None
+        if op in COMPARISONS:
+            return INT
+        if STR in (left, right):
+            return None
+        if op in DIVISIONS and (not is_number(node.right) or node.right.value == 0):
+            return None
+        if op == TokenType.FLOAT_DIVIDE_OPERATOR and left == INT and not is_small_int(node.left):
+            return None
+        if left != right and not (is_small_int(node.left) or is_small_int(node.right)):
+            return None
+        if op == TokenType.FLOAT_DIVIDE_OPERATOR or FLOAT in (left, right):
+            return FLOAT
+        return INT
+
+    return None
+
+def read_names(node, names):
+    if type(node) == Var:
+        names.add(node.value)
+    elif type(node) == UnaryOP:
+        read_names(node.expr, names)
+    elif type(node) == BinOP:
+        read_names(node.left, names)
+        read_names(node.right, names)
+    return names
+
+def assigned_names(statement, names):
+    if type(statement) == Assign:
+        names.add(statement.left.value)
+    else:
+        for child in child_statements(statement):
+            assigned_names(child, names)
+    return names
+
+"""
+    Whether node's value is the same wherever it is evaluated while none of
+    the assigned names change. The largest invariant operator nodes inside
+    node are appended to found (node itself when it is one).
+"""
+def invariant_parts(node, assigned, found):
+    kind = type(node)
+    if kind == Var:
+        return node.value not in assigned
+    if kind == UnaryOP:
+        operands = (node.expr,)
+    elif kind == BinOP:
+        operands = (node.left, node.right)
+    else:
+        return kind == Num or kind == String
+
+    mark = len(found)
+    invariant = all([invariant_parts(operand, assigned, found) for operand in operands])
+    if invariant:
+        del found[mark:]
+        found.append(node)
+    return invariant
+
+def expressions(statement, found):
+    kind = type(statement)
+    if kind == Assign:
+        found.append(statement.right)
+    elif kind == If or kind == While:
+        found.append(statement.condition)
+    for child in child_statements(statement):
+        expressions(child, found)
+    return found
+
+"""
+    The largest operator expressions anywhere in a While, its condition
+    included, whose value cannot change while the loop runs because no
+    variable they read is assigned inside it
+"""
+def loop_invariants(loop):
+    assigned = assigned_names(loop.body, set())
+    found = []
+    for expression in expressions(loop, []):
+        invariant_parts(expression, assigned, found)
+    return found
+
+class DeadStoreEliminator:
+    """
+        Removes, in place, assignments whose value is never read before the
+        variable is assigned again or the program ends, plus empty statements
+        (NoOPs and compound statements left empty).
+
+        outputs names the variables whose final values the caller reads; by
+        default every assigned variable counts. Only those final values are
+        preserved, and an assignment is only removed when evaluating its
+        value cannot raise, so programs that failed still fail at the same
+        statement.
+
+        removed lists the Assign nodes that were dropped and empty counts the
+        empty statements. IF and WHILE statements are always kept, with an
+        emptied branch or body left as a NoOP.
+    """
+    def __init__(self, outputs=None):
+        self.outputs = outputs
+        self.removed = []
+        self.empty = 0
+
+    def eliminate(self, tree):
+        root = tree.block.compound_statement
+        self.safe = set()
+        self.assigned = set()
+        self.forward(root, {})
+
+        live = set(self.assigned if self.outputs is None else self.outputs)
+        self.backward_children(root, live, True)
+        return tree
+
+    """
+        Walks statements in execution order, recording which assignments can
+        not raise and which variables are assigned at all. kinds holds what
+        each variable is known to contain; after a branch only what both
+        sides agree on is kept, and a loop body is walked again with less
+        until what it starts with no longer changes. Each walk overrides the
+        previous verdict on an assignment, and the last is the safest one.
+    """
+    def forward(self, statement, kinds):
+        kind = type(statement)
+        if kind == Compound:
+            for child in statement.children:
+                self.forward(child, kinds)
+        elif kind == Assign:
+            value = value_kind(statement.right, kinds)
+            name = statement.left.value
+            self.assigned.add(name)
+            if value is None:
+                kinds.pop(name, None)
+                self.safe.discard(id(statement))
+            else:
+                kinds[name] = value
+                self.safe.add(id(statement))
+        elif kind == If:
+            then_kinds = dict(kinds)
+            self.forward(statement.then_branch, then_kinds)
+            if statement.else_branch is not None:
+                self.forward(statement.else_branch, kinds)
+            self.agree(kinds, then_kinds)
+        elif kind == While:
+            while True:
+                body_kinds = dict(kinds)
+                self.forward(statement.body, body_kinds)
+                if not self.agree(kinds, body_kinds):
+                    break
+
+    """
+        Drops from kinds what other does not agree with, returning whether
+        anything was dropped
+    """
+    def agree(self, kinds, other):
+        dropped = [name for name, kind in kinds.items() if other.get(name) != kind]
+        for name in dropped:
+            del kinds[name]
+        return bool(dropped)
+
+    """
+        Walks statement in reverse keeping live, the variables whose current
+        value may still be read, and returns what is left of it or None when
+        nothing is. Only records and rewrites anything when remove is set;
+        loops are first walked without it until live at their head settles.
+    """
+    def backward(self, statement, live, remove):
+        kind = type(statement)
+        if kind == NoOP:
+            self.empty += remove
+            return None
+
+        if kind == Compound:
+            self.backward_children(statement, live, remove)
+            if not statement.children:
+                self.empty += remove
+                return None
+        elif kind == Assign:
+            name = statement.left.value
+            if name not in live and id(statement) in self.safe:
+                if remove:
+                    self.removed.append(statement)
+                return None
+            live.discard(name)
+            read_names(statement.right, live)
+        elif kind == If:
+            then_live = set(live)
+            then_branch = self.backward(statement.then_branch, then_live, remove)
+            else_branch = None
+            if statement.else_branch is not None:
+                else_branch = self.backward(statement.else_branch, live, remove)
+            live |= then_live
+            read_names(statement.condition, live)
+            if remove:
+                statement.then_branch = NoOP() if then_branch is None else then_branch
+                statement.else_branch = else_branch
+        elif kind == While:
+            head = read_names(statement.condition, set(live))
+            while True:
+                body_live = set(head)
+                self.backward(statement.body, body_live, False)
+                if body_live <= head:
+                    break
+                head |= body_live
+            if remove:
+                body = self.backward(statement.body, set(head), True)
+                statement.body = NoOP() if body is None else body
+            live |= head
+
+        return statement
+
+    def backward_children(self, compound, live, remove):
+        kept = []
+        for child in reversed(compound.children):
+            child = self.backward(child, live, remove)
+            if child is not None:
+                kept.append(child)
+        if remove:
+            kept.reverse()
+            compound.children = kept
+
+    def report(self):
+        counts = {}
+        for node in reversed(self.removed):
+            counts[node.left.value] = counts.get(node.left.value, 0) + 1
+        stores = ", ".join(f"{name} x{count}" for name, count in counts.items())
+        return f"removed {len(self.removed)} dead stores ({stores or 'none'}) and {self.empty} empty statements"
@@ -0,0 +1,141 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from token_buffer import TokenBuffer, BUFFER_PATTERN, EOF, scan
+
+"""
+    Lexes very large sources across a process pool.
+
+        buffer = ParallelTokenBuffer(source, workers=8)
+        tree = Parser(buffer.cursor()).parse()
+
+    The source is cut into chunks right after a ';', found with str.find
+    without regard to comments or strings, and copied once, UTF-8 encoded,
+    into shared memory that every worker reads its chunk from. Each worker
+    lexes its chunk as if the source ended there and sends back the token
+    arrays with source-wide offsets.
+
+    A chunk's tokens are only used when the chunk starts on a token boundary
+    of the whole source, which the first one does. Lexing up to a ';' then
+    ends on the next boundary, since no token continues past a ';' outside
+    a comment or string. A comment or string crossing the end of a chunk
+    stops that chunk's lexing at its opening character instead; from there
+    the source is lexed sequentially, the crossing token against the whole
+    text, until lexing lands exactly on the start of a later chunk again.
+"""
+
+CHUNK_SIZE = 1 << 22
+
+"""
+    Offsets just past a ';' at least size characters apart, between 0 and
+    len(text)
+"""
+def split_points(text, size):
+    points = [0]
+    while True:
+        point = text.find(";", points[-1] + size)
+        if point < 0:
+            break
+        points.append(point + 1)
+    if points[-1] < len(text):
+        points.append(len(text))
+    return points
+
+"""
+    Lexes the chunk bytes[start:end] of the shared memory called name, whose
+    first character is at offset base in the source. Returns its token
+    arrays and the source offset where lexing stopped.
+"""
+def lex_chunk(name, start, end, base):
+    memory = SharedMemory(name=name)
+    try:
+        with memory.buf[start:end] as chunk:
+            text = str(chunk, "utf-8")
+    finally:
+        memory.close()
+
+    types = array('B')
+    starts = array('I')
+    ends = array('I')
+    stopped = scan(text, 0, len(text), types, starts, ends, base)
+    return types, starts, ends, stopped + base
+
+class ParallelTokenBuffer(TokenBuffer):
+    """
+        A TokenBuffer lexed in chunks of about chunk_size characters on
+        workers processes, or on executor when given one. Sources of a
+        single chunk are lexed in this process. The arrays come out the same
+        as TokenBuffer's, so tokens match those of lexer.Lexer, and a source
+        that does not lex raises the same error.
+    """
+    def __init__(self, text, workers=None, chunk_size=CHUNK_SIZE, executor=None):
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.executor = executor
+        super().__init__(text)
+
+    def lex(self):
+        text = self.text
+        points = split_points(text, self.chunk_size)
+        if len(points) <= 2:
+            return super().lex()
+
+        data = text.encode("utf-8")
+        if len(data) == len(text):
+            offsets = points
+        else:
+            offsets = [0]
+            for start, end in zip(points, points[1:]):
+                offsets.append(offsets[-1] + len(text[start:end].encode("utf-8")))
+
+        memory = SharedMemory(create=True, size=len(data))
+        try:
+            memory.buf[:len(data)] = data
+            del data
+            count = len(points) - 1
+            arguments = ([memory.name] * count, offsets[:-1], offsets[1:], points[:-1])
+            if self.executor is not None:
+                results = list(self.executor.map(lex_chunk, *arguments))
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, count)) as executor:
+                    results = list(executor.map(lex_chunk, *arguments))
+        finally:
+            memory.close()
+            memory.unlink()
+
+        pos = 0
+        for start, end, (types, starts, ends, stopped) in zip(points, points[1:], results):
+            if end <= pos:
+                continue
+            if start < pos:
+                pos = self.relex(pos, end)
+                continue
+
+            self.types.extend(types)
+            self.starts.extend(starts)
+            self.ends.extend(ends)
+            pos = stopped if stopped == end else self.relex(stopped, end)
+
+        self.types.append(EOF)
+        self.starts.append(pos)
+        self.ends.append(pos)
+
+    """
+        Lexes sequentially from pos, a token boundary, until reaching end or
+        passing it inside a token. Returns where it stopped.
+    """
+    def relex(self, pos, end):
+        text = self.text
+        while True:
+            pos = scan(text, pos, end, self.types, self.starts, self.ends)
+            if pos >= end:
+                return pos
+            # the token at pos does not end before end; the whole text decides where it does
+            m = BUFFER_PATTERN.match(text, pos)
+            if m is None:
+                self.error(pos)
+            pos = scan(text, pos, m.end(), self.types, self.starts, self.ends)
+            if pos >= end:
+                return pos
@@ -1,7 +1,9 @@
-from ops import BinOP, Block, Program, UnaryOP, NoOP, Assign, Var, Num, String, Compound, VarDecl
+from ops import BinOP, Block, Program, UnaryOP, NoOP, Assign, Var, Num, String, Compound, VarDecl, If, While
 from enums import TokenType
 
 class Token:
+    __slots__ = ('type', 'value')
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
@@ -12,8 +14,29 @@ class Token:
     def __repr__(self):
         return f"{self.type}: {self.value}"
 
-HIGH_PRECEDENCE_OPERATORS = [TokenType.MULTIPLY_OPERATOR, TokenType.INTEGER_DIVIDE_OPERATOR, TokenType.FLOAT_DIVIDE_OPERATOR]
-LOW_PRECEDENCE_OPERATORS = [TokenType.PLUS_OPERATOR, TokenType.MINUS_OPERATOR, TokenType.EQUALS, TokenType.NOT_EQUALS]
+"""
+    Binding power of every infix operator; higher binds tighter and all of
+    them are left-associative. Comparisons share the additive level, so
+    a == b + c is (a == b) + c. Prefix operators bind tighter than any infix
+    operator: - a * b is (- a) * b.
+"""
+ADDITIVE = 10
+MULTIPLICATIVE = 20
+INFIX_BINDING_POWERS = {
+    TokenType.PLUS_OPERATOR: ADDITIVE,
+    TokenType.MINUS_OPERATOR: ADDITIVE,
+    TokenType.EQUALS: ADDITIVE,
+    TokenType.NOT_EQUALS: ADDITIVE,
+    TokenType.MULTIPLY_OPERATOR: MULTIPLICATIVE,
+    TokenType.INTEGER_DIVIDE_OPERATOR: MULTIPLICATIVE,
+    TokenType.FLOAT_DIVIDE_OPERATOR: MULTIPLICATIVE,
+}
+PREFIX_OPERATORS = frozenset([
+    TokenType.PLUS_OPERATOR,
+    TokenType.MINUS_OPERATOR,
+    TokenType.EQUALS,
+    TokenType.NOT_EQUALS,
+])
 
 class Parser:
     def __init__(self, lexer):
@@ -58,15 +81,47 @@ class Parser:
         return Assign(left=left, right=right, op=token)
 
 
+    """
+        if_statement:
+            IF expr THEN statement (ELSE statement)?
+
+        An ELSE belongs to the nearest IF without one
+    """
+    def if_statement(self):
+        self.eat(TokenType.IF)
+        condition = self.expr()
+        self.eat(TokenType.THEN)
+        then_branch = self.statement()
+        else_branch = None
+        if self.current_token.type == TokenType.ELSE:
+            self.eat(TokenType.ELSE)
+            else_branch = self.statement()
+        return If(condition, then_branch, else_branch)
+
+    """
+        while_statement:
+            WHILE expr DO statement
+    """
+    def while_statement(self):
+        self.eat(TokenType.WHILE)
+        condition = self.expr()
+        self.eat(TokenType.DO)
+        return While(condition, self.statement())
+
     """
         statement:
-            compound_statement | assignment_statement | empty
+            compound_statement | assignment_statement | if_statement
+            | while_statement | empty
     """
     def statement(self):
         if self.current_token.type == TokenType.BEGIN:
             return self.compound_statement()
         elif self.current_token.type == TokenType.ID:
             return self.assignment_statement()
+        elif self.current_token.type == TokenType.IF:
+            return self.if_statement()
+        elif self.current_token.type == TokenType.WHILE:
+            return self.while_statement()
         else:
             return self.empty()
 
@@ -95,92 +150,66 @@ class Parser:
         self.eat(TokenType.ID)
         return v
 
-    def factor(self):
+    """
+        Parses the operand of an infix operator: any number of prefix
+        operators (collected in a loop, not by recursion) applied to an atom
+    """
+    def prefix(self):
+        operators = []
+        while self.current_token.type in PREFIX_OPERATORS:
+            operators.append(self.current_token)
+            self.current_token = self.lexer.get_next_token()
+
         token = self.current_token
-        if token is None:
-            return
-        elif token.type == TokenType.PLUS_OPERATOR:
-            t = self.current_token
-            self.eat(TokenType.PLUS_OPERATOR)
-            return UnaryOP(t, self.factor())
-        elif token.type == TokenType.MINUS_OPERATOR:
-            t = self.current_token
-            self.eat(TokenType.MINUS_OPERATOR)
-            return UnaryOP(t, self.factor())
-        elif token.type == TokenType.EQUALS:
-            t = self.current_token
-            self.eat(TokenType.EQUALS)
-            return UnaryOP(t, self.factor())
-        elif token.type == TokenType.NOT_EQUALS:
-            t = self.current_token
-            self.eat(TokenType.NOT_EQUALS)
-            return UnaryOP(t, self.factor())
-        elif token.type == TokenType.INTEGER:
-            self.eat(TokenType.INTEGER)
-            return Num(token)
-        elif token.type == TokenType.REAL:
-            self.eat(TokenType.REAL)
-            return Num(token)
-        elif token.type == TokenType.STRING:
-            self.eat(TokenType.STRING)
-            return String(token)
-        elif token.type == TokenType.LPAREN:
+        token_type = token.type
+        if token_type == TokenType.INTEGER or token_type == TokenType.REAL:
+            self.current_token = self.lexer.get_next_token()
+            node = Num(token)
+        elif token_type == TokenType.ID:
+            node = self.variable()
+        elif token_type == TokenType.STRING:
+            self.current_token = self.lexer.get_next_token()
+            node = String(token)
+        elif token_type == TokenType.LPAREN:
             self.eat(TokenType.LPAREN)
             node = self.expr()
             self.eat(TokenType.RPAREN)
-            return node
         else:
-            return self.variable()
-
-    def term(self):
-        node = self.factor()
-        if node is None:
-            return
-
-        while self.current_token.type in HIGH_PRECEDENCE_OPERATORS:
-            operator = self.current_token
-            if operator is None:
-                break
-            if operator.type == TokenType.MULTIPLY_OPERATOR:
-                self.eat(TokenType.MULTIPLY_OPERATOR)
-            elif operator.type == TokenType.INTEGER_DIVIDE_OPERATOR:
-                self.eat(TokenType.INTEGER_DIVIDE_OPERATOR)
-            elif operator.type == TokenType.FLOAT_DIVIDE_OPERATOR:
-                self.eat(TokenType.FLOAT_DIVIDE_OPERATOR)
-
-            node = BinOP(left=node, op=operator, right=self.factor())
+            raise Exception("Syntax error")
 
+        for operator in reversed(operators):
+            node = UnaryOP(operator, node)
         return node
 
-    def expr(self):
-        if not self.current_token:
-            self.current_token = self.lexer.get_next_token()
-
-        node = self.term()
+    """
+        expr:
+            prefix (infix_operator prefix)*
 
-        while self.current_token.type in LOW_PRECEDENCE_OPERATORS:
+        Precedence climbing over INFIX_BINDING_POWERS: only operators that bind
+        tighter than min_power are taken here, so a chain of operators at one
+        level is built left to right in the loop and recursion only goes as
+        deep as the number of precedence levels (plus parentheses).
+    """
+    def expr(self, min_power=0):
+        node = self.prefix()
+        while True:
             operator = self.current_token
-            if operator.value == '+':
-                self.eat(TokenType.PLUS_OPERATOR)
-            elif operator.value == '-':
-                self.eat(TokenType.MINUS_OPERATOR)
-            elif operator.value == '=':
-                self.eat(TokenType.EQUALS)
-            elif operator.value == '!':
-                self.eat(TokenType.NOT_EQUALS)
-
-            node = BinOP(left=node, op=operator, right=self.term())
-
-        return node
+            power = INFIX_BINDING_POWERS.get(operator.type, 0)
+            if power <= min_power:
+                return node
+            self.current_token = self.lexer.get_next_token()
+            # nothing binds tighter than the top level, so its operand is a prefix
+            right = self.prefix() if power == MULTIPLICATIVE else self.expr(power)
+            node = BinOP(left=node, op=operator, right=right)
 
     def type_spec(self):
-        t = self.current_token.type
-        if t == TokenType.INTEGER:
+        token = self.current_token
+        if token.type == TokenType.INTEGER:
             self.eat(TokenType.INTEGER)
-            return Token(TokenType.INTEGER, "INTEGER")
-        elif t == TokenType.REAL:
+            return token
+        elif token.type == TokenType.REAL:
             self.eat(TokenType.REAL)
-            return Token(TokenType.REAL, "REAL")
+            return token
 
         return None
 
@@ -234,3 +263,17 @@ class Parser:
             raise Exception("Syntax error")
 
         return result
+
+    """
+        Parses text that holds only a statement_list, with no PROGRAM or
+        BEGIN around it, into a Compound
+    """
+    def parse_statements(self):
+        statements = self.statement_list()
+        if statements is None or self.current_token.type != TokenType.EOF:
+            raise Exception("Syntax error")
+
+        node = Compound()
+        for statement in statements:
+            node.children.append(statement)
+        return node
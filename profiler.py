@@ -0,0 +1,200 @@
+import argparse
+import sys
+from bisect import bisect_right
+from time import perf_counter
+
+from ops import Assign, NoOP, child_statements
+from incremental import SpanParser, TokenList, lex
+from interpreter import Interpreter, SymbolTableBuilder
+
+"""
+    Per-node profiling for NodeVisitor subclasses.
+
+        tree, labels = parse(source)
+        builder = SymbolTableBuilder()
+        builder.visit(tree)
+        profiler = Profiler(labels)
+        Interpreter(None, profiler=profiler).execute(tree, builder.symbol_table)
+        print(profiler.report())
+
+    attach() shadows the visitor's visit method with an instrumented one on
+    that instance only, and detach() removes it again, so a visitor that is
+    not being profiled runs the plain class method with no extra checks.
+
+    For every node type and every statement the profiler keeps the visit
+    count, cumulative time (counted once for recursive visits) and self time
+    (excluding child visits, or nested statements for a statement).
+    Statements are labelled with their line and text when the tree came from
+    parse(), and by position otherwise.
+"""
+
+COUNT, CUMULATIVE, SELF = range(3)
+
+"""
+    Parses source, returning the tree and a label for every statement in it
+    keyed by id(node)
+"""
+def parse(source):
+    tokens, starts, ends = lex(source)
+    spans = {}
+    tree = SpanParser(TokenList(tokens), spans).parse()
+
+    lines = [0]
+    position = source.find("\n")
+    while position >= 0:
+        lines.append(position + 1)
+        position = source.find("\n", position + 1)
+
+    labels = {}
+    for key, (start, end) in spans.items():
+        if start == end:
+            continue
+        offset = starts[start]
+        text = source[offset:ends[end - 1]].split("\n", 1)[0].strip()
+        labels[key] = f"line {bisect_right(lines, offset)}: {text}"
+    return tree, labels
+
+class Profiler:
+    def __init__(self, labels=None):
+        self.labels = dict(labels) if labels else {}
+        self.nodes = {}
+        self.statements = {}
+        self.stacks = {}
+
+    def reset(self):
+        self.nodes.clear()
+        self.statements.clear()
+        self.stacks.clear()
+
+    """
+        Gives every statement of tree that has no label yet one that names
+        its position in program order
+    """
+    def label_statements(self, tree):
+        count = 0
+        pending = [tree.block.compound_statement]
+        while pending:
+            node = pending.pop()
+            count += 1
+            if id(node) not in self.labels and type(node) != NoOP:
+                if type(node) == Assign:
+                    self.labels[id(node)] = f"statement {count}: {node.left.value} :="
+                else:
+                    self.labels[id(node)] = f"statement {count}: {type(node).__name__}"
+            pending.extend(reversed(child_statements(node)))
+
+    def attach(self, visitor, tree=None):
+        if tree is not None:
+            self.label_statements(tree)
+
+        labels = self.labels
+        nodes = self.nodes
+        statements = self.statements
+        stacks = self.stacks
+        generic_visit = visitor.generic_visit
+        stack = []
+        child_times = []
+        statement_times = []
+        active = {}
+
+        def record(table, key, elapsed, own, outermost):
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = [0, 0.0, 0.0]
+            entry[COUNT] += 1
+            if outermost:
+                entry[CUMULATIVE] += elapsed
+            entry[SELF] += own
+
+        def visit(node):
+            name = type(node).__name__
+            label = labels.get(id(node))
+            stack.append(name if label is None else f"{name} [{label}]")
+            child_times.append(0.0)
+            outermost = name not in active
+            active[name] = active.get(name, 0) + 1
+            if label is not None:
+                statement_outermost = label not in active
+                active[label] = active.get(label, 0) + 1
+                statement_times.append(0.0)
+
+            start = perf_counter()
+            try:
+                return getattr(visitor, 'visit_' + name, generic_visit)(node)
+            finally:
+                elapsed = perf_counter() - start
+                own = elapsed - child_times.pop()
+                if child_times:
+                    child_times[-1] += elapsed
+
+                key = tuple(stack)
+                stacks[key] = stacks.get(key, 0.0) + own
+                stack.pop()
+
+                record(nodes, name, elapsed, own, outermost)
+                active[name] -= 1
+                if not active[name]:
+                    del active[name]
+                if label is not None:
+                    statement_own = elapsed - statement_times.pop()
+                    if statement_times:
+                        statement_times[-1] += elapsed
+                    record(statements, label, elapsed, statement_own, statement_outermost)
+                    active[label] -= 1
+                    if not active[label]:
+                        del active[label]
+
+        visitor.visit = visit
+
+    def detach(self, visitor):
+        visitor.__dict__.pop('visit', None)
+
+    """
+        One line per distinct stack, "frame;frame;... microseconds", as read
+        by flamegraph.pl and speedscope
+    """
+    def collapsed(self):
+        lines = []
+        for stack, seconds in self.stacks.items():
+            micros = int(seconds * 1_000_000)
+            if micros > 0:
+                lines.append(";".join(frame.replace(";", ",") for frame in stack) + f" {micros}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def report(self, sort="self", limit=None):
+        column = {"count": COUNT, "cumulative": CUMULATIVE, "self": SELF}[sort]
+        lines = []
+        for title, table in (("node type", self.nodes), ("statement", self.statements)):
+            rows = sorted(table.items(), key=lambda item: item[1][column], reverse=True)
+            if limit is not None:
+                rows = rows[:limit]
+            lines.append(f"{title:<48} {'count':>10} {'cumulative ms':>14} {'self ms':>10}")
+            for key, (count, cumulative, own) in rows:
+                name = key if len(key) <= 48 else key[:45] + "..."
+                lines.append(f"{name:<48} {count:>10} {cumulative * 1000:>14.3f} {own * 1000:>10.3f}")
+            lines.append("")
+        return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a program on the tree interpreter")
+    parser.add_argument("path")
+    parser.add_argument("--sort", choices=("self", "cumulative", "count"), default="self")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--collapsed", help="write collapsed stacks to this file")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        source = f.read()
+    tree, labels = parse(source)
+    builder = SymbolTableBuilder()
+    builder.visit(tree)
+
+    profiler = Profiler(labels)
+    Interpreter(None, profiler=profiler).execute(tree, builder.symbol_table)
+    print(profiler.report(args.sort, args.limit))
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            f.write(profiler.collapsed())
+
+if __name__ == "__main__":
+    sys.exit(main())
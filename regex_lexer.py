@@ -0,0 +1,103 @@
+import re
+
+from enums import TokenType
+from parser import Token
+from lexer import NAMES, OPERATOR_TOKENS
+
+"""
+    Leading whitespace plus one alternative per token class, tried in order.
+    Comments and strings only match their opening character, the rest is
+    skipped with str.find.
+"""
+TOKEN_PATTERN = re.compile(r"""
+    [ \n]*
+    (?:
+          (?P<NAME>[^\W\d]\w*)
+        | (?P<NUMBER>\d+(?:\.\d*)?)
+        | (?P<OPERATOR>:=|==|!=|[-+*/();.,:])
+        | (?P<COMMENT>\{)
+        | (?P<STRING>')
+    )
+""", re.VERBOSE)
+WHITESPACE_PATTERN = re.compile(r"[ \n]*")
+
+NAME = TOKEN_PATTERN.groupindex["NAME"]
+NUMBER = TOKEN_PATTERN.groupindex["NUMBER"]
+OPERATOR = TOKEN_PATTERN.groupindex["OPERATOR"]
+COMMENT = TOKEN_PATTERN.groupindex["COMMENT"]
+
+# enum member lookups are slow enough to matter once per token
+INTEGER = TokenType.INTEGER
+REAL = TokenType.REAL
+STRING = TokenType.STRING
+EOF = TokenType.EOF
+name_token = NAMES.token
+
+class RegexLexer:
+    """
+        Drop-in replacement for lexer.Lexer that scans with TOKEN_PATTERN instead
+        of stepping one character at a time. Produces the same Token stream.
+
+        Lexing may begin at any offset between tokens; after every token start
+        and pos hold its source offsets.
+    """
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
+        self.start = pos
+        self.current_token = None
+        self.current_token = self.get_next_token()
+
+    def error(self):
+        raise Exception('Invalid syntax')
+
+    def get_next_token(self):
+        text = self.text
+        pos = self.pos
+        match = TOKEN_PATTERN.match
+
+        while True:
+            m = match(text, pos)
+            if m is None:
+                self.pos = self.start = WHITESPACE_PATTERN.match(text, pos).end()
+                if self.pos >= len(text):
+                    return Token(EOF, None)
+                self.error()
+
+            kind = m.lastindex
+            self.start = m.start(kind)
+            if kind == NAME:
+                self.pos = m.end()
+                return name_token(m.group(NAME))
+
+            if kind == OPERATOR:
+                self.pos = m.end()
+                return OPERATOR_TOKENS[m.group(OPERATOR)]
+
+            if kind == NUMBER:
+                self.pos = m.end()
+                value = m.group(NUMBER)
+                if "." in value:
+                    return Token(REAL, float(value))
+                return Token(INTEGER, int(value))
+
+            if kind == COMMENT:
+                end = text.find("}", m.end())
+                if end < 0:
+                    self.pos = m.start(COMMENT)
+                    self.error()
+                pos = end + 1
+                continue
+
+            # the first character after the opening quote always belongs to the string
+            start = m.end()
+            if start >= len(text):
+                self.pos = start
+                return Token(STRING, "")
+
+            end = text.find("'", start + 1)
+            if end < 0:
+                self.pos = m.start()
+                self.error()
+            self.pos = end + 1
+            return Token(STRING, text[start:end])
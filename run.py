@@ -1,6 +1,9 @@
+import os
+
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter, SymbolTableBuilder
+from cache import ProgramCache
 
 source = """
     PROGRAM test;
@@ -45,11 +48,15 @@ source = """
 #  """
 
 if __name__ == "__main__":
-    l = Lexer(source)
-    p = Parser(l)
-    tree = p.parse()
-    symbol_table = SymbolTableBuilder()
-    symbol_table.visit(tree)
+    cache_dir = os.environ.get("PROGRAM_CACHE_DIR")
+    if cache_dir:
+        tree, symbol_table = ProgramCache(cache_dir).load(source)
+    else:
+        l = Lexer(source)
+        p = Parser(l)
+        tree = p.parse()
+        symbol_table = SymbolTableBuilder()
+        symbol_table.visit(tree)
 
     #  i = Interpreter(p)
     #  x = i.interpret()
@@ -0,0 +1,112 @@
+import marshal
+
+from enums import TokenType
+from parser import Token
+from ops import BinOP, Block, Program, UnaryOP, NoOP, Assign, Var, Num, String, Compound, VarDecl, If, While
+from lexer import OPERATOR_TOKENS, RESERVED_KEYWORDS, NAMES
+from symbol import SymbolTable, VarSymbol
+from visitor import NodeVisitor
+
+"""
+    Compact form for compiled programs: the tree becomes nested tuples of
+    ints, floats and strings that marshal can write and read at C speed, and
+    the symbol table is stored as its (name, type) pairs in slot order.
+"""
+
+FORMAT = 1
+
+NUM, STRING, VAR, UNARY, BINARY, ASSIGN, COMPOUND, NOOP, VARDECL, BLOCK, PROGRAM, IF, WHILE = range(13)
+
+SHARED_TOKENS = {token.value: token for token in [*OPERATOR_TOKENS.values(), *RESERVED_KEYWORDS.values()]}
+
+class Encoder(NodeVisitor):
+    def visit_Num(self, node):
+        return (NUM, node.value)
+
+    def visit_String(self, node):
+        return (STRING, node.value)
+
+    def visit_Var(self, node):
+        return (VAR, node.value, node.slot)
+
+    def visit_UnaryOP(self, node):
+        return (UNARY, node.op.value, self.visit(node.expr))
+
+    def visit_BinOP(self, node):
+        return (BINARY, node.op.value, self.visit(node.left), self.visit(node.right))
+
+    def visit_Assign(self, node):
+        return (ASSIGN, self.visit(node.left), self.visit(node.right))
+
+    def visit_Compound(self, node):
+        return (COMPOUND, tuple(self.visit(child) for child in node.children))
+
+    def visit_If(self, node):
+        else_branch = None if node.else_branch is None else self.visit(node.else_branch)
+        return (IF, self.visit(node.condition), self.visit(node.then_branch), else_branch)
+
+    def visit_While(self, node):
+        return (WHILE, self.visit(node.condition), self.visit(node.body))
+
+    def visit_NoOP(self, node):
+        return (NOOP,)
+
+    def visit_VarDecl(self, node):
+        return (VARDECL, self.visit(node.var_node), node.type_node.value)
+
+    def visit_Block(self, node):
+        declarations = tuple(self.visit(d) for d in node.declarations)
+        return (BLOCK, declarations, self.visit(node.compound_statement))
+
+    def visit_Program(self, node):
+        return (PROGRAM, node.name, self.visit(node.block))
+
+def decode(data):
+    tag = data[0]
+    if tag == VAR:
+        var = Var(NAMES.token(data[1]))
+        var.slot = data[2]
+        return var
+    if tag == NUM:
+        value = data[1]
+        return Num(Token(TokenType.REAL if type(value) == float else TokenType.INTEGER, value))
+    if tag == BINARY:
+        return BinOP(left=decode(data[2]), op=SHARED_TOKENS[data[1]], right=decode(data[3]))
+    if tag == UNARY:
+        return UnaryOP(SHARED_TOKENS[data[1]], decode(data[2]))
+    if tag == ASSIGN:
+        return Assign(left=decode(data[1]), op=SHARED_TOKENS[":="], right=decode(data[2]))
+    if tag == STRING:
+        return String(Token(TokenType.STRING, data[1]))
+    if tag == COMPOUND:
+        node = Compound()
+        node.children = [decode(child) for child in data[1]]
+        return node
+    if tag == IF:
+        return If(decode(data[1]), decode(data[2]), None if data[3] is None else decode(data[3]))
+    if tag == WHILE:
+        return While(decode(data[1]), decode(data[2]))
+    if tag == NOOP:
+        return NoOP()
+    if tag == VARDECL:
+        return VarDecl(decode(data[1]), SHARED_TOKENS[data[2]])
+    if tag == BLOCK:
+        return Block([decode(d) for d in data[1]], decode(data[2]))
+    if tag == PROGRAM:
+        return Program(name=data[1], block=decode(data[2]))
+    raise Exception(f"Unknown node tag {tag}")
+
+def dumps(program):
+    tree, symbol_table = program
+    variables = tuple((v.name, v.type.name) for v in symbol_table.variables)
+    return marshal.dumps((FORMAT, variables, Encoder().visit(tree)))
+
+def loads(data):
+    version, variables, tree = marshal.loads(data)
+    if version != FORMAT:
+        raise Exception(f"Unsupported program format {version}")
+
+    symbol_table = SymbolTable()
+    for name, typename in variables:
+        symbol_table.define(VarSymbol(name, symbol_table.lookup(typename)))
+    return decode(tree), symbol_table
@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from interpreter import Interpreter, check_types, compile_source
+from optimizer import DeadStoreEliminator
+from budget import Budget, BudgetExceeded
+from cache import ProgramCache, is_program_key, program_key
+from serializer import dumps, loads
+
+"""
+    Runs programs for clients over a Unix or TCP socket, so requests do not
+    pay for process startup and imports:
+
+        python server.py --unix /tmp/interpreter.sock --max-concurrent 8
+        python server.py --host 127.0.0.1 --port 7000 --cache-dir /tmp/programs
+
+    The protocol is one JSON object per line each way. A request carries the
+    program as "source", or as "hash", the key an earlier response for the
+    same source returned. Optional fields: "id" (echoed back), "engine"
+    ("tree" or "typed"), "outputs" (variables to return) and "deadline" in
+    seconds. Requests on one connection run concurrently and may complete
+    out of order:
+
+        {"id": 1, "source": "PROGRAM p; VAR a : INTEGER; BEGIN a := 1 END."}
+        {"id": 1, "ok": true, "hash": "...", "bindings": {"a": 1}, "seconds": 0.0003}
+        {"id": 2, "ok": false, "error": "...", "type": "DeadlineExceeded"}
+
+    Programs run statement by statement and hand the event loop back every
+    slice seconds, so one long program cannot starve the others. Deadlines
+    are enforced at those points and cover waiting for a free run slot; a
+    single statement is never interrupted. --max-statements, --max-nodes and
+    --max-int-bits give every run a Budget, and a run that goes over it gets
+    a "BudgetExceeded" error carrying the limit and the run's stats.
+
+    Identifiers from every client's programs are interned in the process-wide
+    lexer.NAMES, which forgets them all once it holds names.DEFAULT_CAPACITY,
+    so arbitrary sources cannot grow it without bound.
+"""
+
+DEFAULT_LINE_LIMIT = 64 * 1024 * 1024
+DEFAULT_SLICE = 0.005
+DEFAULT_DEADLINE = 10.0
+ENGINES = ("tree", "typed")
+
+class DeadlineExceeded(Exception):
+    pass
+
+class ProgramStore:
+    """
+        Compiled programs by key, kept serialized so every run decodes its
+        own copy of the tree. Holds the capacity most recently used programs
+        in memory and falls back to cache, a ProgramCache, when given. Safe
+        to use from several threads; a source that is already being compiled
+        is waited for rather than compiled again.
+
+        Optimizing can make a program the typed engine rejects acceptable, so
+        optimized programs for it are type checked first and stored under
+        their own key; get() only hands one to the typed engine when it was
+        added that way since this store was made.
+    """
+    def __init__(self, capacity=1024, cache=None, optimize=False):
+        self.capacity = capacity
+        self.cache = cache
+        self.optimize = cache.optimize if cache else optimize
+        self.programs = OrderedDict()
+        self.compiling = {}
+        self.lock = threading.Lock()
+
+    def add(self, source, engine="tree"):
+        key = program_key(source, self.optimize, engine)
+        with self.lock:
+            if key in self.programs:
+                return key
+            pending = self.compiling.get(key)
+            if pending is None:
+                pending = self.compiling[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            pending.result()
+            return key
+
+        try:
+            if self.cache:
+                program = self.cache.load(source, engine)
+            else:
+                program = compile_source(source, optimize=self.optimize, engine=engine)
+            self.remember(key, dumps(program), engine == "typed")
+            pending.set_result(key)
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.compiling[key]
+        return key
+
+    def get(self, key, engine="tree"):
+        with self.lock:
+            entry = self.programs.get(key)
+            if entry is not None:
+                self.programs.move_to_end(key)
+        if entry is None:
+            program = self.cache.get(key) if self.cache else None
+            if program is None:
+                raise Exception(f"Unknown program {key}")
+            entry = dumps(program), False
+            self.remember(key, *entry)
+
+        data, checked = entry
+        if engine == "typed" and self.optimize and not checked:
+            raise Exception(f"Program {key} was not type checked before optimizing; send its source")
+        return loads(data)
+
+    """
+        checked says the program was type checked before it was optimized
+    """
+    def remember(self, key, data, checked):
+        with self.lock:
+            self.programs[key] = data, checked
+            self.programs.move_to_end(key)
+            while len(self.programs) > self.capacity:
+                self.programs.popitem(last=False)
+
+class InterpreterServer:
+    def __init__(self, store=None, max_concurrent=None, deadline=DEFAULT_DEADLINE, slice=DEFAULT_SLICE, limits=None):
+        self.store = store or ProgramStore()
+        # keyword arguments for each run's Budget
+        self.limits = limits or {}
+        self.semaphore = asyncio.Semaphore(max_concurrent or os.cpu_count() or 1)
+        self.deadline = deadline
+        self.slice = slice
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        if path:
+            if os.path.exists(path):
+                os.remove(path)
+            return await asyncio.start_unix_server(self.handle_connection, path, limit=DEFAULT_LINE_LIMIT)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=DEFAULT_LINE_LIMIT)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # longer than the stream limit; the rest of the stream is unusable
+                    self.send(writer, {"ok": False, "error": "Request too large", "type": "RequestTooLarge"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                task = asyncio.create_task(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def respond(self, line, writer):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise Exception("Request must be a JSON object")
+        except Exception as e:
+            self.send(writer, {"ok": False, "error": str(e), "type": type(e).__name__})
+            return
+
+        response = await self.handle(request)
+        if "id" in request:
+            response = {"id": request["id"], **response}
+        self.send(writer, response)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def send(self, writer, response):
+        if not writer.is_closing():
+            writer.write(json.dumps(response, default=repr).encode() + b"\n")
+
+    async def handle(self, request):
+        started = time.perf_counter()
+        try:
+            deadline = self.request_deadline(request)
+            async with asyncio.timeout(deadline):
+                async with self.semaphore:
+                    key, bindings = await self.run(request)
+        except TimeoutError:
+            return {"ok": False, "error": f"Deadline of {deadline}s exceeded", "type": DeadlineExceeded.__name__}
+        except BudgetExceeded as e:
+            return {"ok": False, "error": str(e), "type": type(e).__name__, "limit": e.limit, "stats": e.stats.as_dict()}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "type": type(e).__name__}
+
+        return {"ok": True, "hash": key, "bindings": bindings, "seconds": time.perf_counter() - started}
+
+    """
+        The request's deadline in seconds, capped at the server's; requests
+        without one get the server's
+    """
+    def request_deadline(self, request):
+        deadline = request.get("deadline")
+        if deadline is None:
+            return self.deadline
+        if type(deadline) not in (int, float) or not deadline > 0:
+            raise Exception(f"deadline must be a positive number of seconds, not {deadline!r}")
+        return min(deadline, self.deadline)
+
+    async def run(self, request):
+        engine = request.get("engine", "tree")
+        if engine not in ENGINES:
+            raise Exception(f"Unknown engine '{engine}'")
+        outputs = request.get("outputs")
+        if outputs is not None and (type(outputs) != list or not all(type(name) == str for name in outputs)):
+            raise Exception("outputs must be a list of variable names")
+
+        # compiling and decoding are plain CPU work; a thread keeps the loop responsive
+        key, tree, symbol_table = await asyncio.to_thread(self.load, request, engine)
+
+        interpreter = Interpreter(None, engine=engine, outputs=outputs)
+        budget = Budget(**self.limits) if self.limits else None
+        steps = interpreter.steps(tree, symbol_table)
+        try:
+            yield_at = time.perf_counter() + self.slice
+            for statement in steps:
+                if budget is not None:
+                    budget.charge(statement, interpreter.frame)
+                if time.perf_counter() >= yield_at:
+                    await asyncio.sleep(0)
+                    yield_at = time.perf_counter() + self.slice
+        finally:
+            steps.close()
+        return key, interpreter.GLOBAL_SCOPE
+
+    """
+        Returns the key and a fresh copy of the requested program, with dead
+        stores dropped when only some outputs are wanted
+    """
+    def load(self, request, engine):
+        if "source" in request:
+            key = self.store.add(request["source"], engine)
+        elif "hash" in request:
+            key = request["hash"]
+            if not is_program_key(key):
+                raise Exception(f"Invalid program hash {key!r}")
+        else:
+            raise Exception("Request needs a source or a hash")
+
+        tree, symbol_table = self.store.get(key, engine)
+        if request.get("outputs") is not None:
+            if engine == "typed":
+                check_types(tree, symbol_table)
+            DeadStoreEliminator(request["outputs"]).eliminate(tree)
+        return key, tree, symbol_table
+
+async def serve(options):
+    cache = ProgramCache(options.cache_dir, optimize=options.optimize) if options.cache_dir else None
+    store = ProgramStore(options.capacity, cache, options.optimize)
+    limits = {
+        name: getattr(options, name) for name in ("max_statements", "max_nodes", "max_int_bits")
+        if getattr(options, name) is not None
+    }
+    server = InterpreterServer(store, options.max_concurrent, options.deadline, options.slice, limits)
+    listener = await server.start(options.unix, options.host, options.port)
+    addresses = ", ".join(str(socket.getsockname()) for socket in listener.sockets)
+    print(f"listening on {addresses}", file=sys.stderr, flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the interpreter over a socket")
+    parser.add_argument("--unix", help="Unix socket path; TCP is used when omitted")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--max-concurrent", type=int, default=None, help="programs running at once")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE, help="longest deadline a request may ask for")
+    parser.add_argument("--slice", type=float, default=DEFAULT_SLICE, help="seconds a program runs before yielding")
+    parser.add_argument("--max-statements", type=int, default=None, help="statements a run may execute")
+    parser.add_argument("--max-nodes", type=int, default=None, help="nodes a run may evaluate")
+    parser.add_argument("--max-int-bits", type=int, default=None, help="largest integer a run may store, in bits")
+    parser.add_argument("--capacity", type=int, default=1024, help="compiled programs kept in memory")
+    parser.add_argument("--optimize", action="store_true", help="fold constants and drop dead stores")
+    parser.add_argument("--cache-dir", default=None, help="compiled program cache directory")
+    options = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(options))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
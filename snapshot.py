@@ -0,0 +1,134 @@
+from interpreter import Interpreter, SymbolTableBuilder, compile_source
+from parser import Parser
+from regex_lexer import RegexLexer
+from typecheck import TypeChecker, TypedEvaluator
+from flow import flatten
+from symbol import VarSymbol
+
+"""
+    Runs a shared program prefix once and many variants on top of it:
+
+        base = run_prefix(source)
+        for value in range(100):
+            variant = base.fork()
+            variant.run(f"rate := {value}; total := principal * rate")
+            print(variant.value("total"))
+
+    A Snapshot is a private copy of a frame; nothing writes to it, so any
+    number of forks share it. A Fork reads the snapshot's values until it
+    assigns a slot and keeps its own assignments in a dict, which makes
+    forking free and leaves the snapshot and other forks untouched. A fork
+    can be snapshotted in turn after any of its runs to branch again.
+"""
+
+class LayeredFrame:
+    """
+        Frame that reads through to base, which it never writes, for every
+        slot not assigned since the frame was made; assignments go to
+        changes. Assigned values are never None, so a missing change and an
+        unassigned variable need no separate marker.
+    """
+    __slots__ = ('base', 'changes')
+
+    def __init__(self, base):
+        self.base = base
+        self.changes = {}
+
+    def __getitem__(self, slot):
+        value = self.changes.get(slot)
+        return self.base[slot] if value is None else value
+
+    def __setitem__(self, slot, value):
+        self.changes[slot] = value
+
+    def __len__(self):
+        return len(self.base)
+
+    def values(self):
+        values = list(self.base)
+        for slot, value in self.changes.items():
+            values[slot] = value
+        return values
+
+class Snapshot:
+    """
+        Values of the variables of symbol_table copied from frame, which may
+        be an Interpreter's after execute() or between steps(), or a Fork's
+        LayeredFrame
+    """
+    def __init__(self, symbol_table, frame):
+        self.symbol_table = symbol_table
+        self.values = frame.values() if type(frame) == LayeredFrame else list(frame)
+        self.checker = None
+
+    """
+        One TypeChecker for the runs of all typed forks, since building one
+        takes a pass over every variable
+    """
+    def type_checker(self):
+        if self.checker is None:
+            self.checker = TypeChecker(self.symbol_table)
+        return self.checker
+
+    def fork(self, engine="tree"):
+        return Fork(self, engine)
+
+    def bindings(self):
+        values = self.values
+        return {v.name: values[v.slot] for v in self.symbol_table.variables if values[v.slot] is not None}
+
+class Fork:
+    """
+        Copy-on-write environment over a Snapshot. run() executes statements
+        against it on the tree or typed engine; GLOBAL_SCOPE holds the
+        variables the snapshot and this fork's runs have assigned, built
+        when read, and value() reads one (None while unassigned).
+    """
+    def __init__(self, base, engine="tree"):
+        if engine not in ("tree", "typed"):
+            raise Exception(f"Forks run on the tree or typed engine, not {engine}")
+
+        self.base = base
+        self.symbol_table = base.symbol_table
+        self.interpreter = Interpreter(None, engine=engine)
+        self.interpreter.frame = LayeredFrame(base.values)
+
+    @property
+    def GLOBAL_SCOPE(self):
+        return self.interpreter.bindings(self.symbol_table.variables)
+
+    def value(self, name):
+        symbol = self.symbol_table.lookup(name)
+        if not isinstance(symbol, VarSymbol):
+            raise Exception(f"Variable '{name}' not found")
+        return self.interpreter.frame[symbol.slot]
+
+    """
+        Runs statements, either source text holding a statement list or a
+        Compound (or any other statement node), which may only use the
+        variables the prefix declared
+    """
+    def run(self, statements):
+        if type(statements) == str:
+            statements = Parser(RegexLexer(statements)).parse_statements()
+        SymbolTableBuilder(self.symbol_table).visit(statements)
+
+        interpreter = self.interpreter
+        visitor = interpreter
+        if interpreter.engine == "typed":
+            self.base.type_checker().check(statements)
+            visitor = TypedEvaluator(interpreter.frame)
+        interpreter.run_code(visitor, flatten(statements))
+
+    def snapshot(self):
+        return Snapshot(self.symbol_table, self.interpreter.frame)
+
+"""
+    Runs the program source once and returns a Snapshot of its variables at
+    the end
+"""
+def run_prefix(source, engine="tree", optimize=False):
+    tree, symbol_table = compile_source(source, optimize=optimize, engine=engine)
+    interpreter = Interpreter(None, engine=engine)
+    interpreter.execute(tree, symbol_table)
+    return Snapshot(symbol_table, interpreter.frame)
@@ -0,0 +1,158 @@
+import codecs
+import mmap
+
+from parser import Token
+from regex_lexer import (
+    TOKEN_PATTERN, WHITESPACE_PATTERN,
+    NAME, NUMBER, OPERATOR, COMMENT,
+    INTEGER, REAL, STRING, EOF, name_token,
+)
+from lexer import OPERATOR_TOKENS
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+class StreamLexer:
+    """
+        Lexes a file object (text or binary) or an mmap in fixed-size chunks.
+
+        Only the unconsumed tail of the current chunk is kept in memory, so
+        tokens, strings and comments may straddle chunk boundaries. tokens() is
+        a generator; current_token/get_next_token let Parser consume it directly.
+
+        With owns, source is closed once it is read to the end or by close(),
+        which a with block calls:
+
+            with StreamLexer.from_path(path) as lexer:
+                tree = Parser(lexer).parse()
+    """
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8", owns=False):
+        self.source = source
+        self.owns = owns
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.exhausted = False
+        self.stream = self.tokens()
+        self.current_token = None
+        self.current_token = self.get_next_token()
+
+    @classmethod
+    def from_path(cls, path, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+        f = open(path, "rb")
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            source = f
+        else:
+            # the map keeps its own descriptor
+            f.close()
+        return cls(source, chunk_size, encoding, owns=True)
+
+    def close(self):
+        if self.owns:
+            self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def error(self):
+        raise Exception('Invalid syntax')
+
+    """
+        Returns the next chunk of decoded text, or "" once the source is exhausted
+    """
+    def read_chunk(self):
+        while not self.exhausted:
+            data = self.source.read(self.chunk_size)
+            if isinstance(data, str):
+                if not data:
+                    self.exhausted = True
+                    self.close()
+                return data
+
+            text = self.decoder.decode(data, final=not data)
+            if not data:
+                self.exhausted = True
+                self.close()
+            if text or self.exhausted:
+                return text
+        return ""
+
+    def get_next_token(self):
+        return next(self.stream, None) or Token(EOF, None)
+
+    def tokens(self):
+        buffer = ""
+        pos = 0
+        match = TOKEN_PATTERN.match
+
+        while True:
+            m = match(buffer, pos)
+
+            # a match that runs into the end of the buffer, or a lone '=' / '!' at the
+            # very end of it, may continue in the next chunk
+            if m is None:
+                partial = WHITESPACE_PATTERN.match(buffer, pos).end() >= len(buffer) - 1
+            else:
+                partial = m.end() == len(buffer)
+            if partial and not self.exhausted:
+                buffer = buffer[pos:] + self.read_chunk()
+                pos = 0
+                continue
+
+            if m is None:
+                pos = WHITESPACE_PATTERN.match(buffer, pos).end()
+                if pos >= len(buffer):
+                    yield Token(EOF, None)
+                    return
+                self.error()
+
+            kind = m.lastindex
+            if kind == NAME:
+                pos = m.end()
+                yield name_token(m.group(NAME))
+
+            elif kind == OPERATOR:
+                pos = m.end()
+                yield OPERATOR_TOKENS[m.group(OPERATOR)]
+
+            elif kind == NUMBER:
+                pos = m.end()
+                value = m.group(NUMBER)
+                if "." in value:
+                    yield Token(REAL, float(value))
+                else:
+                    yield Token(INTEGER, int(value))
+
+            elif kind == COMMENT:
+                # comment bodies are never needed, so drop every chunk that has no '}'
+                end = buffer.find("}", m.end())
+                while end < 0:
+                    buffer = self.read_chunk()
+                    if not buffer:
+                        self.error()
+                    end = buffer.find("}")
+                pos = end + 1
+
+            else:
+                start = m.end()
+                end = buffer.find("'", start + 1)
+                while end < 0 and not self.exhausted:
+                    searched = len(buffer) - pos
+                    buffer = buffer[pos:] + self.read_chunk()
+                    start -= pos
+                    pos = 0
+                    end = buffer.find("'", max(start + 1, searched))
+
+                # the first character after the opening quote always belongs to the string
+                if start >= len(buffer):
+                    pos = start
+                    yield Token(STRING, "")
+                elif end < 0:
+                    self.error()
+                else:
+                    pos = end + 1
+                    yield Token(STRING, buffer[start:end])
@@ -15,16 +15,26 @@ class BuiltInTypeSymbol(Symbol):
 class VarSymbol(Symbol):
     def __init__(self, name, var_type=None) -> None:
         super().__init__(name, var_type)
+        self.slot = None
 
     def __str__(self) -> str:
         return f"{self.name} : {self.type}"
 
     __repr__ = __str__
 
-class SymbolTable(object):
+from lexer import NAMES
 
+class SymbolTable(object):
+    """
+        Symbols are keyed by their NAMES id, so resolving a Var is a lookup
+        on the integer its token already carries. They are also kept by name
+        (by_name), for lookups by name and for a Var whose token was interned
+        on the other side of a NAMES reset than the declaration.
+    """
     def __init__(self) -> None:
         self.symbols = {}
+        self.by_name = {}
+        self.variables = []
         self.init_builtin_types()
 
     def init_builtin_types(self):
@@ -37,10 +47,47 @@ class SymbolTable(object):
         )
         return s 
 
+    """
+        Variables also get the index of their slot in an execution frame;
+        redeclaring a name keeps the slot it already had
+    """
     def define(self, symbol):
-        self.symbols[symbol.name] = symbol
+        key = NAMES.id(symbol.name)
+        if isinstance(symbol, VarSymbol):
+            existing = self.by_name.get(symbol.name)
+            if isinstance(existing, VarSymbol):
+                symbol.slot = existing.slot
+                self.variables[symbol.slot] = symbol
+            else:
+                symbol.slot = len(self.variables)
+                self.variables.append(symbol)
+
+        self.symbols[key] = symbol
+        self.by_name[symbol.name] = symbol
+
+    """
+        Defines the variable a VarDecl node declares and gives its Var the
+        slot
+    """
+    def declare(self, node):
+        varsymbol = VarSymbol(node.var_node.value, self.lookup(node.type_node.value))
+        self.define(varsymbol)
+        node.var_node.slot = varsymbol.slot
+
+    """
+        Gives a Var node the slot of its variable, raising when the variable
+        was never declared
+    """
+    def resolve(self, node):
+        varsymbol = self.symbols.get(node.token.id) or self.by_name.get(node.value)
+        if not varsymbol:
+            raise Exception(f"Variable '{node.value}' not found")
+        node.slot = varsymbol.slot
 
     def lookup(self, name):
-        return self.symbols.get(name, None)
+        return self.by_name.get(name)
+
+    def lookup_id(self, name_id):
+        return self.symbols.get(name_id)
 
     __repr__ = __str__
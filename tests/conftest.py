@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules are imported by their flat names, as run.py and cli.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+from interpreter import Interpreter, compile_source
+
+"""
+    Helpers for comparing engines: outcome() runs source and returns either
+    ("ok", bindings) or ("error", message), so two engines agree exactly when
+    their outcomes are equal. bindings holds the repr of every value, since
+    True == 1, 2 == 2.0 and nan != nan.
+"""
+
+def program(declarations, statements):
+    return f"PROGRAM p; VAR {declarations}; BEGIN {statements} END."
+
+def run(source, engine="tree", optimize=False, **options):
+    tree, symbol_table = compile_source(source, optimize=optimize)
+    interpreter = Interpreter(None, engine=engine, **options)
+    interpreter.execute(tree, symbol_table)
+    return interpreter.GLOBAL_SCOPE
+
+def outcome(source, engine="tree", **options):
+    try:
+        bindings = run(source, engine, **options)
+    except Exception as e:
+        return "error", str(e)
+    return "ok", {name: repr(value) for name, value in bindings.items()}
+
+VARIABLES = ["a", "b", "c", "r"]
+DECLARATIONS = "a, b, c : INTEGER; r : REAL"
+OPERATORS = ["+", "-", "*", "DIV", "/", "==", "!="]
+
+def expression(rng, depth, strings=True):
+    if depth == 0 or rng.random() < 0.3:
+        choice = rng.random()
+        if choice < 0.5:
+            return rng.choice(VARIABLES)
+        if strings and choice < 0.55:
+            return "'s'"
+        return rng.choice(["0", "1", "2", "3", "7", "1.5", "0.25"])
+    if rng.random() < 0.15:
+        return f"{rng.choice('+-')}{expression(rng, depth - 1, strings)}"
+    return f"({expression(rng, depth - 1, strings)} {rng.choice(OPERATORS)} {expression(rng, depth - 1, strings)})"
+
+"""
+    Seeded random program over VARIABLES. Reads of unassigned variables,
+    division by zero and string arithmetic all happen, so errors get
+    compared as well as results.
+"""
+def random_program(rng, statements=6, depth=3, strings=True):
+    lines = [f"{rng.choice(VARIABLES)} := {expression(rng, depth, strings)}" for _ in range(statements)]
+    return program(DECLARATIONS, "; ".join(lines))
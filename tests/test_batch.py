@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from batch import run_batch
+from interpreter import compile_source
+from programs import program, run
+
+DECLARATIONS = "a, b, c : INTEGER; r : REAL"
+
+"""
+    Runs statements over columns for a and b in one batch and once per row,
+    with the row's values assigned first, and checks every row agrees
+"""
+def assert_rows_agree(statements, a, b):
+    tree, symbol_table = compile_source(program(DECLARATIONS, statements))
+    batch = run_batch(tree, symbol_table, {"a": np.array(a), "b": np.array(b)})
+
+    for row, (x, y) in enumerate(zip(a, b)):
+        expected = run(program(DECLARATIONS, f"a := {x}; b := {y}; {statements}"))
+        assert {name: column[row].item() for name, column in batch.items()} == expected
+
+@pytest.mark.parametrize("statements", [
+    "c := a * 2 + b DIV 3 - 1",
+    "r := a / b",
+    "c := (a == 1) + (b == 1)",
+    "c := (a == 1) - (b != 2)",
+    "c := -(a == 1) * 3",
+    "c := +(a != b) DIV 1",
+    "r := (a == 1) / 2",
+])
+def test_rows_match_the_tree_engine(statements):
+    assert_rows_agree(statements, [1, 2, 1, 5], [1, 1, 2, 4])
+
+def test_comparison_results_stay_bools():
+    tree, symbol_table = compile_source(program(DECLARATIONS, "c := a == b"))
+    result = run_batch(tree, symbol_table, {"a": [1, 2], "b": [1, 3]})
+    assert result["c"].tolist() == [True, False]
+
+def test_conditions_must_agree_across_rows():
+    tree, symbol_table = compile_source(program(DECLARATIONS, "IF a == 1 THEN c := 1 ELSE c := 2"))
+    with pytest.raises(Exception, match="same for every row"):
+        run_batch(tree, symbol_table, {"a": [1, 2]})
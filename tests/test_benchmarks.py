@@ -0,0 +1,39 @@
+import sys
+
+import pytest
+
+from benchmarks import suite
+from benchmarks.generator import generate_program
+from interpreter import Interpreter
+from programs import outcome
+
+def test_generator_is_deterministic_and_valid():
+    source = generate_program(statements=200, seed=3, comments=0.2, strings=0.2)
+    assert source == generate_program(statements=200, seed=3, comments=0.2, strings=0.2)
+    assert source != generate_program(statements=200, seed=4, comments=0.2, strings=0.2)
+
+    kind, bindings = outcome(source)
+    assert kind == "ok" and len(bindings) == 24
+
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_generated_programs_run_on_every_engine(engine):
+    source = generate_program(statements=100, seed=1)
+    assert outcome(source, engine) == outcome(source)
+
+def test_run_reports_every_stage():
+    result = suite.run({"statements": 50, "variables": 6, "depth": 2, "seed": 0, "comments": 0.1, "strings": 0.1}, repeat=1)
+    assert set(result["stages"]) == set(suite.STAGES)
+    assert result["stages"]["interpret"]["statements"] == 50 and result["peak_memory"] > 0
+
+def test_regressions_beyond_the_threshold():
+    def result(seconds, memory):
+        return {"stages": {stage: {"seconds": seconds} for stage in suite.STAGES}, "peak_memory": memory}
+    assert suite.regressions(result(1.0, 100), result(1.05, 100), 0.1) == []
+    failed = suite.regressions(result(1.0, 100), result(1.0, 120), 0.1)
+    assert failed == [("peak_memory", 100, 120)]
+
+def test_typed_engine_needs_no_strings(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["suite", "--engine", "typed", "--statements", "10"])
+    with pytest.raises(SystemExit) as exit:
+        suite.main()
+    assert exit.value.code == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from budget import Budget, BudgetExceeded
+from interpreter import Interpreter, compile_source
+from programs import program
+
+LOOP = program("a, b : INTEGER", "a := 0; WHILE a != 1000 DO a := a + 1")
+
+def run(source, engine="tree", **limits):
+    tree, symbol_table = compile_source(source)
+    interpreter = Interpreter(None, engine=engine, budget=Budget(**limits))
+    interpreter.execute(tree, symbol_table)
+    return interpreter
+
+@pytest.mark.parametrize("engine", ["tree", "typed"])
+def test_statement_limit_stops_loops(engine):
+    with pytest.raises(BudgetExceeded) as error:
+        run(LOOP, engine, max_statements=50)
+    assert error.value.limit == "statements" and error.value.stats.statements == 51
+
+@pytest.mark.parametrize("engine", ["tree", "typed"])
+def test_runs_within_budget_finish(engine):
+    interpreter = run(LOOP, engine, max_statements=3000, max_nodes=20000)
+    assert interpreter.GLOBAL_SCOPE == {"a": 1000}
+
+def test_node_limit():
+    with pytest.raises(BudgetExceeded) as error:
+        run(program("a : INTEGER", "a := 1 + 2 + 3; a := a * a"), max_nodes=8)
+    assert error.value.limit == "nodes"
+
+def test_integer_size_limit():
+    source = program("a : INTEGER", "a := 2; WHILE a != 0 DO a := a * a")
+    with pytest.raises(BudgetExceeded) as error:
+        run(source, max_int_bits=64)
+    assert error.value.limit == "int_bits" and error.value.stats.int_bits > 64
+
+def test_deadline():
+    source = program("a : INTEGER", "a := 0; WHILE a != -1 DO a := a + 1")
+    with pytest.raises(BudgetExceeded) as error:
+        run(source, deadline=0.05)
+    assert error.value.limit == "deadline"
+
+def test_budgets_need_the_tree_or_typed_engine():
+    with pytest.raises(Exception, match="Budgets need the tree or typed engine"):
+        Interpreter(None, engine="vm", budget=Budget(max_statements=1))
@@ -0,0 +1,57 @@
+import pytest
+
+import cache
+from cache import ProgramCache, program_key
+from interpreter import Interpreter
+from programs import program
+
+SOURCE = program("a, b : INTEGER", "a := 2 * 3; b := a + 1")
+
+def execute(tree, symbol_table):
+    interpreter = Interpreter(None)
+    interpreter.execute(tree, symbol_table)
+    return interpreter.GLOBAL_SCOPE
+
+def test_second_load_is_a_hit(tmp_path):
+    programs = ProgramCache(str(tmp_path))
+    first = programs.load(SOURCE)
+    second = programs.load(SOURCE)
+    assert (programs.stats.hits, programs.stats.misses, programs.stats.writes) == (1, 1, 1)
+    assert execute(*first) == execute(*second) == {"a": 6, "b": 7}
+
+def test_key_follows_the_compiler_and_options(monkeypatch):
+    key = program_key(SOURCE, True)
+    assert key != program_key(SOURCE, False)
+    assert key != program_key(SOURCE + " ", True)
+
+    monkeypatch.setattr(cache, "COMPILER_FINGERPRINT", "changed")
+    assert program_key(SOURCE, True) != key
+
+def test_fingerprint_covers_the_compiler_modules():
+    names = {module.__name__ for module in cache.COMPILER_MODULES}
+    assert {"parser", "regex_lexer", "optimizer", "serializer", "interpreter"} <= names
+    assert cache.compiler_fingerprint() == cache.COMPILER_FINGERPRINT
+
+def test_corrupt_entries_are_misses(tmp_path):
+    programs = ProgramCache(str(tmp_path))
+    programs.load(SOURCE)
+    with open(programs.path(programs.key(SOURCE)), "wb") as f:
+        f.write(b"not a program")
+    assert programs.get(programs.key(SOURCE)) is None
+    assert programs.stats.errors == 1
+
+def test_evicts_down_to_max_bytes(tmp_path):
+    programs = ProgramCache(str(tmp_path), max_bytes=1)
+    programs.load(SOURCE)
+    programs.load(SOURCE.replace("a + 1", "a + 2"))
+    assert programs.stats.evictions == 2 and programs.size() == 0
+
+def test_keys_cannot_leave_the_directory(tmp_path):
+    victim = tmp_path / "data.program"
+    victim.write_bytes(b"not a program")
+    programs = ProgramCache(str(tmp_path / "cache"))
+    for key in ("../data", "/tmp/x", "f" * 63 + "/"):
+        with pytest.raises(Exception, match="Invalid program key"):
+            programs.get(key)
+    assert victim.exists()
+    assert programs.get("0" * 64) is None
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import cli
+from programs import program
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def write(directory, name, statements):
+    path = directory / name
+    path.write_text(program("a : INTEGER", statements))
+    return str(path)
+
+def test_reports_every_file(tmp_path, capsys):
+    paths = [write(tmp_path, f"p{i}.pas", f"a := {i}") for i in range(5)]
+    paths.append(write(tmp_path, "bad.pas", "a := 1 DIV 0"))
+    assert cli.main([str(tmp_path), "--workers", "2", "--chunksize", "2"]) == 1
+
+    results = {r["file"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert sorted(results) == sorted(paths)
+    assert [results[path]["bindings"] for path in paths[:5]] == [{"a": i} for i in range(5)]
+    assert results[paths[5]]["type"] == "ZeroDivisionError"
+
+def test_streams_each_file_as_it_finishes(tmp_path):
+    fast = write(tmp_path, "fast.pas", "a := 1")
+    slow = write(tmp_path, "slow.pas", "a := 0; WHILE a != 300000 DO a := a + 1")
+    process = subprocess.Popen(
+        [sys.executable, "cli.py", fast, slow, "--workers", "1", "--chunksize", "2"],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert json.loads(process.stdout.readline())["file"] == fast
+        reported = time.perf_counter()
+        assert json.loads(process.stdout.readline())["file"] == slow
+        # the slow file takes seconds; a fast result held back with it arrives together
+        assert time.perf_counter() - reported > 0.5
+        assert process.wait(timeout=60) == 0
+    finally:
+        # not communicate(): a killed CLI's pool worker can keep the pipe open
+        process.kill()
+        process.wait()
+        process.stdout.close()
+
+@pytest.mark.parametrize("engine", ["vm", "python"])
+def test_budgets_need_the_tree_or_typed_engine(tmp_path, engine):
+    with pytest.raises(SystemExit) as exit:
+        cli.main([str(tmp_path), "--engine", engine, "--max-statements", "10"])
+    assert exit.value.code == 2
+
+def test_budget_errors_are_reported(tmp_path, capsys):
+    write(tmp_path, "loop.pas", "a := 0; WHILE a != 100 DO a := a + 1")
+    assert cli.main([str(tmp_path), "--engine", "typed", "--max-statements", "10", "--workers", "1"]) == 1
+    result = json.loads(capsys.readouterr().out)
+    assert result["type"] == "BudgetExceeded" and result["limit"] == "statements"
+
+def put_late_then_fail(chunk, options):
+    index, path = chunk[0]
+    result = {"file": path, "ok": True, "bindings": {"a": 1}}
+    threading.Timer(0.2, cli.results.put, ((index, result),)).start()
+    raise RuntimeError("worker failed")
+
+def test_failed_chunks_keep_the_results_they_queued(tmp_path, capsys, monkeypatch):
+    first = write(tmp_path, "p0.pas", "a := 1")
+    second = write(tmp_path, "p1.pas", "a := 2")
+    monkeypatch.setattr(cli, "run_chunk", put_late_then_fail)
+    assert cli.main([first, second, "--workers", "1", "--chunksize", "2"]) == 1
+
+    results = {r["file"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert results[first]["ok"] and results[first]["bindings"] == {"a": 1}
+    assert results[second]["error"] == "worker failed" and results[second]["type"] == "RuntimeError"
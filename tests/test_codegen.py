@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from codegen import PythonProgram
+from interpreter import compile_source
+from programs import DECLARATIONS, program, outcome, random_program
+
+@pytest.mark.parametrize("statements", [
+    "a := 2 - (3 - 4); b := 2 * (3 DIV 2); c := - - a",
+    "a := 1; b := (a == 1) == (a == 2); c := a == 1 != 0",
+    "a := 7; r := a / 2 / 2; b := -a DIV 2",
+    "r := 99999999999999999999.0; r := r * r * r * r * r * r * r * r * r * r * r * r * r * r * r * r; r := r - r",
+    "a := 1; IF a == 2 THEN b := 1; c := b",
+    "a := 1; IF a == 1 THEN b := 1 ELSE b := 2; c := b",
+    "a := 0; WHILE a != 5 DO BEGIN a := a + 1; b := a END; c := b",
+    "a := 'x'; b := a + 1",
+])
+def test_python_engine_matches_the_tree_engine(statements):
+    source = program(DECLARATIONS, statements)
+    assert outcome(source, "python") == outcome(source, "tree")
+
+def test_random_programs_agree():
+    rng = random.Random(3)
+    for _ in range(300):
+        source = random_program(rng)
+        assert outcome(source, "python") == outcome(source, "tree"), source
+
+def test_checks_only_reads_that_may_be_unassigned():
+    tree, symbol_table = compile_source(program(DECLARATIONS, "a := 1; b := a + c"))
+    compiled = PythonProgram(tree, symbol_table)
+    assert compiled.source.count("__missing__") == 1
+    with pytest.raises(Exception, match="Variable c not found in scope"):
+        compiled.run()
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from budget import Budget, BudgetExceeded
+from compiler import Compiler
+from enums import OpCode
+from interpreter import Interpreter, compile_source
+from optimizer import loop_invariants
+from programs import VARIABLES, expression, program, outcome
+
+DECLARATIONS = "a, b, c, i : INTEGER; r : REAL"
+
+def statement(rng, depth):
+    kind = rng.random()
+    if depth > 0 and kind < 0.2:
+        condition = f"{expression(rng, 1, False)} {rng.choice(['==', '!='])} {expression(rng, 1, False)}"
+        otherwise = f" ELSE {statement(rng, depth - 1)}" if rng.random() < 0.5 else ""
+        return f"IF {condition} THEN {statement(rng, depth - 1)}{otherwise}"
+    if depth > 0 and kind < 0.35:
+        body = "; ".join(statement(rng, depth - 1) for _ in range(rng.randint(1, 3)))
+        return f"BEGIN i := 0; WHILE i != {rng.randint(0, 4)} DO BEGIN i := i + 1; {body} END END"
+    return f"{rng.choice(VARIABLES)} := {expression(rng, 2, rng.random() < 0.1)}"
+
+"""
+    Seeded random program with IF and nested WHILE loops; every loop counts
+    i up to a small bound, and nothing else assigns i
+"""
+def random_program(rng):
+    setup = "a := 1; b := 2; c := 3; r := 0.5; "
+    return program(DECLARATIONS, setup + "; ".join(statement(rng, 2) for _ in range(5)))
+
+"""
+    Whether source stays within small integers on the tree engine; squaring
+    in a loop otherwise makes runs arbitrarily slow
+"""
+def small(source):
+    tree, symbol_table = compile_source(source)
+    try:
+        Interpreter(None, budget=Budget(max_statements=2000, max_int_bits=256)).execute(tree, symbol_table)
+    except BudgetExceeded:
+        return False
+    except Exception:
+        pass
+    return True
+
+def test_random_programs_agree_on_every_engine():
+    rng = random.Random(10)
+    for _ in range(200):
+        source = random_program(rng)
+        if not small(source):
+            continue
+        expected = outcome(source)
+        for engine in ("vm", "python"):
+            assert outcome(source, engine) == expected, (engine, source)
+        assert outcome(source, optimize=True) == expected, source
+        typed = outcome(source, "typed")
+        if not (typed[0] == "error" and typed[1].startswith("Type error")):
+            assert typed == expected, source
+
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_else_belongs_to_the_nearest_if(engine):
+    source = program(DECLARATIONS, "a := 1; b := 0; IF a == 1 THEN IF a == 2 THEN b := 1 ELSE b := 2")
+    assert outcome(source, engine) == ("ok", {"a": "1", "b": "2"})
+
+def test_vm_caches_loop_invariants():
+    source = program(DECLARATIONS, "a := 3; b := 0; i := 0; WHILE i != 5 DO BEGIN i := i + 1; b := b + a * a END")
+    tree, symbol_table = compile_source(source)
+    loop = tree.block.compound_statement.children[3]
+    assert [type(node).__name__ for node in loop_invariants(loop)] == ["BinOP"]
+
+    chunk = Compiler().compile(tree, symbol_table)
+    assert OpCode.LOAD_INVARIANT.value in chunk.code[::2]
+
+    interpreter = Interpreter(None, engine="vm")
+    interpreter.execute(tree, symbol_table)
+    assert interpreter.GLOBAL_SCOPE == {"a": 3, "b": 45, "i": 5}
+    assert len(interpreter.frame) == len(symbol_table.variables)
+
+def test_invariants_that_raise_fail_where_the_tree_engine_does():
+    source = program(DECLARATIONS, "a := 0; i := 0; WHILE i != 2 DO BEGIN i := i + 1; IF i == 2 THEN b := 1 DIV a END")
+    assert outcome(source, "vm") == outcome(source) == ("error", "integer division or modulo by zero")
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from cache import ProgramCache
+from interpreter import Interpreter, compile_source
+from optimizer import DeadStoreEliminator
+from parser import Parser
+from regex_lexer import RegexLexer
+from programs import DECLARATIONS, VARIABLES, program, random_program
+
+def final_state(source, outputs=None, optimize=False, engine="tree"):
+    try:
+        tree, symbol_table = compile_source(source, optimize=optimize, outputs=outputs, engine=engine)
+        interpreter = Interpreter(None, engine=engine, outputs=outputs)
+        interpreter.execute(tree, symbol_table)
+    except Exception as e:
+        return "error", str(e)
+    return "ok", {name: repr(value) for name, value in interpreter.GLOBAL_SCOPE.items()}
+
+def eliminate(statements, outputs=None):
+    tree = Parser(RegexLexer(program(DECLARATIONS, statements))).parse()
+    eliminator = DeadStoreEliminator(outputs)
+    eliminator.eliminate(tree)
+    return [assign.left.value for assign in eliminator.removed]
+
+def test_removes_overwritten_and_unread_stores():
+    assert eliminate("a := 1; a := 2; b := a") == ["a"]
+    assert eliminate("a := 1; b := 2; c := a", outputs=["c"]) == ["b"]
+    assert eliminate("a := 1; b := a; c := b", outputs=["a"]) == ["c", "b"]
+
+def test_keeps_stores_that_may_raise():
+    assert eliminate("a := 1 DIV 0; a := 2") == []
+    assert eliminate("a := c; a := 2") == []
+    assert eliminate("a := 'x' + 1; a := 2") == []
+
+def test_keeps_stores_read_by_loops_and_branches():
+    assert eliminate("a := 1; WHILE a != 3 DO a := a + 1", outputs=["a"]) == []
+    assert eliminate("a := 1; IF b == 1 THEN a := 2; c := a", outputs=["c"]) == []
+
+def test_random_programs_keep_their_outputs_and_errors():
+    rng = random.Random(6)
+    for _ in range(300):
+        source = random_program(rng, statements=8)
+        outputs = rng.sample(VARIABLES, rng.randint(1, len(VARIABLES)))
+        kind, result = final_state(source)
+        if kind == "ok":
+            result = {name: value for name, value in result.items() if name in outputs}
+        assert final_state(source, outputs) == (kind, result), source
+        assert final_state(source, outputs, optimize=True) == (kind, result), source
+
+REJECTED = program(DECLARATIONS, "a := 1.5; a := 2; b := 'x'; b := 3")
+
+@pytest.mark.parametrize("optimize, outputs", [(True, None), (False, ["c"]), (True, ["a"])])
+def test_optimizing_does_not_change_what_type_checks(optimize, outputs):
+    expected = final_state(REJECTED, engine="typed")
+    assert expected[0] == "error"
+    assert final_state(REJECTED, outputs, optimize, engine="typed") == expected
+
+    interpreter = Interpreter(Parser(RegexLexer(REJECTED)), engine="typed", optimize=optimize, outputs=outputs)
+    with pytest.raises(Exception, match=expected[1]):
+        interpreter.interpret()
+
+def test_cached_programs_are_type_checked_before_optimizing(tmp_path):
+    programs = ProgramCache(str(tmp_path))
+    assert programs.load(REJECTED)
+    with pytest.raises(Exception, match=final_state(REJECTED, engine="typed")[1]):
+        programs.load(REJECTED, "typed")
@@ -0,0 +1,83 @@
+import random
+
+from incremental import IncrementalParser, lex
+from ops import AST
+from parser import Parser, Token
+from regex_lexer import RegexLexer
+from programs import program
+
+SOURCE = program(
+    "a, b, c : INTEGER",
+    "a := 1; b := a + 2; BEGIN c := a * b; a := c - 1 END; IF a == 2 THEN b := 3 ELSE b := 4; "
+    "WHILE c != 0 DO BEGIN c := c - 1; a := a + c END",
+)
+RANDOM_EDITS = ["1", "+", "a", ";", "(", "END", ""]
+
+"""
+    An edit of text: mostly ones that keep it parsing (whitespace or a
+    comment before a token, a new number, an extra statement), sometimes a
+    random one that may not
+"""
+def random_edit(rng, text):
+    kind = rng.random()
+    if kind < 0.3:
+        offset = rng.choice([i for i, char in enumerate(text) if char in " ;("])
+        return offset, 0, rng.choice([" ", "\n", " { note } "])
+    if kind < 0.6:
+        offset = rng.choice([i for i, char in enumerate(text) if char.isdigit()])
+        return offset, 1, str(rng.randrange(100))
+    if kind < 0.9:
+        offset = text.index("BEGIN", text.index("VAR")) + 5
+        return offset, 0, rng.choice([" c := c + 1;", " BEGIN a := 2 END;", " IF b == 1 THEN a := 0;"])
+    return rng.randrange(len(text) + 1), rng.choice([0, 1, 2]), rng.choice(RANDOM_EDITS)
+
+"""
+    Nested tuples of every node's class and fields, tokens by type and value
+"""
+def shape(node):
+    if isinstance(node, list):
+        return tuple(shape(child) for child in node)
+    if isinstance(node, Token):
+        return (node.type, node.value)
+    if not isinstance(node, AST):
+        return node
+    fields = [name for cls in type(node).__mro__ for name in getattr(cls, "__slots__", ())]
+    return (type(node).__name__, *(shape(getattr(node, name, None)) for name in fields))
+
+def fresh(text):
+    try:
+        return shape(Parser(RegexLexer(text)).parse())
+    except Exception:
+        return None
+
+def test_random_edits_match_a_fresh_parse():
+    rng = random.Random(4)
+    for _ in range(20):
+        parser = IncrementalParser(SOURCE)
+        for _ in range(15):
+            offset, deleted, inserted = random_edit(rng, parser.text)
+            text = parser.text[:offset] + inserted + parser.text[offset + deleted:]
+            expected = fresh(text)
+            try:
+                tree = parser.edit(offset, deleted, inserted)
+            except Exception:
+                tree = None
+            assert parser.text == text
+            assert (None if tree is None else shape(tree)) == expected, text
+            if tree is not None:
+                tokens, starts, ends = lex(text)
+                assert [(t.type, t.value) for t in parser.tokens] == [(t.type, t.value) for t in tokens]
+                assert (parser.starts, parser.ends) == (starts, ends)
+
+def test_small_edits_reparse_one_statement():
+    parser = IncrementalParser(SOURCE)
+    offset = SOURCE.index("a + 2") + 4
+    parser.edit(offset, 1, "7")
+    assert parser.last_edit == {"relexed": 1, "removed": 1, "reparsed": "Assign"}
+    assert shape(parser.tree) == fresh(parser.text)
+
+def test_whitespace_edits_reparse_nothing():
+    parser = IncrementalParser(SOURCE)
+    parser.edit(SOURCE.index(":="), 0, "   ")
+    assert parser.last_edit["reparsed"] == "none"
+    assert shape(parser.tree) == fresh(parser.text)
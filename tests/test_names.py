@@ -0,0 +1,62 @@
+import threading
+
+from lexer import Lexer, NAMES, RESERVED_KEYWORDS
+from names import NameTable
+from regex_lexer import RegexLexer
+from token_buffer import TokenBuffer
+from interpreter import compile_source
+from programs import program, run
+
+def test_one_shared_token_per_spelling():
+    table = NameTable(RESERVED_KEYWORDS)
+    first = table.token("total")
+    assert table.token("total") is first
+    assert table.token("Total") is not first and table.token("Total").id != first.id
+    assert table.token("BeGiN") is RESERVED_KEYWORDS["begin"]
+    assert table.name(first.id) == "total" and table.id("total") == first.id
+
+def test_lexers_share_the_global_table():
+    names = [
+        RegexLexer("shared_name").current_token,
+        Lexer("shared_name").current_token,
+        TokenBuffer("shared_name").cursor().current_token,
+    ]
+    assert len({token.id for token in names}) == 1
+    assert NAMES.name(names[0].id) == "shared_name"
+
+def test_symbols_are_keyed_by_id():
+    tree, symbol_table = compile_source(program("counter : INTEGER", "counter := 1"))
+    assign = tree.block.compound_statement.children[0]
+    assert symbol_table.lookup_id(assign.left.name_id) is symbol_table.lookup("counter")
+
+def test_concurrent_interning_hands_out_one_id_per_name():
+    table = NameTable(RESERVED_KEYWORDS)
+    ids = [[] for _ in range(8)]
+
+    def intern(result):
+        for i in range(500):
+            result.append(table.token(f"name{i}").id)
+
+    threads = [threading.Thread(target=intern, args=(result,)) for result in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(result == ids[0] for result in ids)
+    assert len(table) == 500
+
+def test_table_is_bounded_and_never_reuses_ids():
+    table = NameTable(RESERVED_KEYWORDS, capacity=4)
+    first = table.token("a")
+    ids = [table.token(f"n{i}").id for i in range(10)]
+    assert len(table) <= 4 and len(ids) == len(set(ids)) and first.id not in ids
+    assert table.token("a") is not first and table.token("a").id > first.id
+
+def test_programs_resolve_across_a_reset(monkeypatch):
+    monkeypatch.setattr(NAMES, "capacity", 3)
+    declarations = ", ".join(f"reset{i}" for i in range(10)) + " : INTEGER"
+    statements = "; ".join(f"reset{i} := {i}" for i in range(10)) + "; reset0 := reset9 + reset1"
+    for engine in ("tree", "vm", "typed"):
+        bindings = run(program(declarations, statements), engine)
+        assert bindings["reset0"] == 10 and bindings["reset9"] == 9
+    assert len(NAMES) <= 3
@@ -0,0 +1,56 @@
+import pytest
+
+import ops
+from benchmarks import memory
+from lexer import Lexer
+from parser import Parser, Token
+from regex_lexer import RegexLexer
+from programs import program
+
+NODE_CLASSES = [cls for cls in vars(ops).values() if isinstance(cls, type) and issubclass(cls, ops.AST)]
+
+def nodes(node):
+    yield node
+    for name in type(node).__slots__:
+        child = getattr(node, name, None)
+        for value in child if type(child) == list else [child]:
+            if isinstance(value, ops.AST):
+                yield from nodes(value)
+
+@pytest.mark.parametrize("cls", NODE_CLASSES, ids=lambda cls: cls.__name__)
+def test_nodes_have_no_instance_dict(cls):
+    for base in cls.__mro__[:-1]:
+        assert "__slots__" in vars(base)
+
+def test_parsed_trees_use_slots():
+    tree = Parser(RegexLexer(program("a : INTEGER", "a := -(1 + 2) * 3; IF a == 1 THEN a := 2"))).parse()
+    for node in nodes(tree):
+        assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        tree.unknown = 1
+
+def test_tokens_use_slots():
+    with pytest.raises(AttributeError):
+        Token(None, None).extra = 1
+
+def test_operator_tokens_are_shared():
+    for lexer_class in (Lexer, RegexLexer):
+        first = lexer_class("a := b + c")
+        second = lexer_class("d := e + f")
+        firsts = [first.current_token] + [first.get_next_token() for _ in range(4)]
+        seconds = [second.current_token] + [second.get_next_token() for _ in range(4)]
+        assert firsts[1] is seconds[1] and firsts[3] is seconds[3]
+
+def test_leaves_derive_their_value_from_the_token():
+    for cls in (ops.Var, ops.Num, ops.String, ops.Type):
+        assert "value" not in cls.__slots__ and "name_id" not in cls.__slots__
+    tree = Parser(RegexLexer(program("a : INTEGER", "a := 2"))).parse()
+    assign = tree.block.compound_statement.children[0]
+    assert assign.left.value == "a" and assign.left.name_id == assign.left.token.id
+    assert assign.right.value == 2
+
+def test_memory_benchmark_pins_the_legacy_layout():
+    assert set(memory.LEGACY_FIELDS) == {cls.__name__ for cls in NODE_CLASSES if cls is not ops.AST}
+    tree = Parser(RegexLexer(program("a : INTEGER", "a := -(1 + 2)"))).parse()
+    var = memory.copy_tree(tree, legacy=True).block.compound_statement.children[0].left
+    assert vars(var).keys() == {"token", "value"}
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from interpreter import compile_source
+from optimizer import ConstantFolder
+from programs import program, outcome
+
+DECLARATIONS = "a, b, c, t : INTEGER; r : REAL"
+SETUP = "a := 3; b := a == 3; t := 'text'; r := 2.5; "
+LEAVES = ["a", "b", "t", "r", "0", "1", "2", "1.5", "'s'"]
+OPERATORS = ["+", "-", "*", "DIV", "/", "==", "!="]
+
+def expression(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(LEAVES)
+    if rng.random() < 0.2:
+        return f"{rng.choice('+-')}{expression(rng, depth - 1)}"
+    return f"({expression(rng, depth - 1)} {rng.choice(OPERATORS)} {expression(rng, depth - 1)})"
+
+def fold(statements):
+    tree, _ = compile_source(program(DECLARATIONS, statements))
+    folder = ConstantFolder()
+    folder.fold(tree)
+    return folder.removed
+
+@pytest.mark.parametrize("statements", [
+    "c := b * 1",
+    "c := 1 * b + 0",
+    "c := (a == 3) * 1",
+    "c := - - b",
+    "c := a - - b",
+    "c := 'x' - - 1",
+    "c := t + 0",
+    "c := 0 + 'x'",
+    "c := ('x' * 2) * 1",
+    "c := (2 * 3 - 6) DIV 0",
+])
+def test_folding_keeps_behaviour(statements):
+    source = program(DECLARATIONS, SETUP + statements)
+    assert outcome(source, optimize=True) == outcome(source)
+
+def test_random_expressions_fold_without_changing_results():
+    rng = random.Random(5)
+    for _ in range(500):
+        source = program(DECLARATIONS, SETUP + f"c := {expression(rng, 3)}")
+        assert outcome(source, optimize=True) == outcome(source), source
+
+def test_folds_literals_and_numeric_identities():
+    assert fold("c := 2 * 3 + 1") == 4
+    assert fold("c := (a - 1) * 1") == 2
+    assert fold("c := - - 4") == 2
+
+def test_leaves_variables_alone():
+    assert fold("c := a * 1; c := a + 0; c := - - a") == 0
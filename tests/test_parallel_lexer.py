@@ -0,0 +1,49 @@
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from parallel_lexer import ParallelTokenBuffer, split_points
+from token_buffer import TokenBuffer
+from programs import random_program
+
+def arrays(buffer):
+    return list(buffer.types), list(buffer.starts), list(buffer.ends)
+
+def lexes_like_token_buffer(text, executor, chunk_size=8):
+    try:
+        expected = arrays(TokenBuffer(text))
+    except Exception as e:
+        with pytest.raises(Exception, match=str(e)):
+            ParallelTokenBuffer(text, chunk_size=chunk_size, executor=executor)
+        return
+    assert arrays(ParallelTokenBuffer(text, chunk_size=chunk_size, executor=executor)) == expected, text
+
+def test_split_points():
+    assert split_points("a;b;c;d", 2) == [0, 4, 7]
+    assert split_points("a;b", 10) == [0, 3]
+    assert split_points("ab;", 1) == [0, 3]
+
+@pytest.mark.parametrize("text", [
+    "a := 1; { skip; these; } b := 'x;y;z'; c := 2;",
+    "a := 'long; string; across; many; chunks'; b := 1",
+    "{ a; b; c; d; e; f; g; } a := 1; b := 2; c := 3",
+    "a := 'ünï; cödé'; b := 'é;è'; c := 3; d := 4",
+    "a := 1; b := 'unclosed; c := 2; d := 3",
+    "a := 1; b := 2; # c := 3; d := 4",
+])
+def test_tokens_crossing_chunks(text):
+    with ThreadPoolExecutor(4) as executor:
+        for chunk_size in (1, 3, 8, 20):
+            lexes_like_token_buffer(text, executor, chunk_size)
+
+def test_random_programs_on_a_process_pool():
+    rng = random.Random(23)
+    with ProcessPoolExecutor(2) as executor:
+        for _ in range(20):
+            lexes_like_token_buffer(random_program(rng, statements=12), executor, rng.randint(4, 40))
+
+def test_own_pool_and_single_chunk():
+    text = "a := 'x; y'; { c; } b := 2; c := a" * 5
+    assert arrays(ParallelTokenBuffer(text, workers=2, chunk_size=16)) == arrays(TokenBuffer(text))
+    assert arrays(ParallelTokenBuffer("a := 1", chunk_size=16)) == arrays(TokenBuffer("a := 1"))
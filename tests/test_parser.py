@@ -0,0 +1,49 @@
+import pytest
+
+from ops import BinOP, UnaryOP, Num, Var
+from parser import Parser
+from regex_lexer import RegexLexer
+from programs import program, outcome
+
+def render(node):
+    if type(node) == BinOP:
+        return f"({render(node.left)} {node.op.value} {render(node.right)})"
+    if type(node) == UnaryOP:
+        return f"({node.op.value}{render(node.expr)})"
+    if type(node) in (Num, Var):
+        return str(node.value)
+    return repr(node.value)
+
+def parse_expression(text):
+    tree = Parser(RegexLexer(program("a, b, c : INTEGER", f"a := {text}"))).parse()
+    return render(tree.block.compound_statement.children[0].right)
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 * 3", "(1 + (2 * 3))"),
+    ("1 - 2 - 3", "((1 - 2) - 3)"),
+    ("8 DIV 2 DIV 2", "((8 INTEGER_DIV 2) INTEGER_DIV 2)"),
+    ("a == b + c", "((a == b) + c)"),
+    ("a != b * c", "(a != (b * c))"),
+    ("- a * b", "((-a) * b)"),
+    ("- - a", "(-(-a))"),
+    ("(1 + 2) * -(3 - a) / 4", "(((1 + 2) * (-(3 - a))) / 4)"),
+])
+def test_precedence_and_associativity(text, expected):
+    assert parse_expression(text) == expected
+
+def test_long_chains_parse_without_recursing():
+    count = 50000
+    node = Parser(RegexLexer(" + ".join(["1"] * count))).expr()
+    depth = 0
+    while type(node) == BinOP:
+        node, depth = node.left, depth + 1
+    assert depth == count - 1
+
+    node = Parser(RegexLexer("- " * count + "a")).expr()
+    depth = 0
+    while type(node) == UnaryOP:
+        node, depth = node.expr, depth + 1
+    assert depth == count and node.value == "a"
+
+def test_short_expressions_evaluate_as_parsed():
+    assert outcome(program("a : INTEGER", "a := 2 + 3 * 4 - 10 DIV 3 == 11")) == ("ok", {"a": "True"})
@@ -0,0 +1,47 @@
+import pytest
+
+from interpreter import Interpreter, resolve
+from profiler import Profiler, parse, COUNT, CUMULATIVE, SELF
+
+SOURCE = """PROGRAM p;
+VAR a, b : INTEGER;
+BEGIN
+    a := 1 + 2 * 3;
+    b := 0;
+    WHILE b != 21 DO b := b + a
+END.
+"""
+
+def profile():
+    tree, labels = parse(SOURCE)
+    profiler = Profiler(labels)
+    interpreter = Interpreter(None, profiler=profiler)
+    interpreter.execute(tree, resolve(tree))
+    return profiler, interpreter
+
+def test_counts_node_visits_and_labels_statements():
+    profiler, interpreter = profile()
+    assert interpreter.GLOBAL_SCOPE == {"a": 7, "b": 21}
+    assert profiler.nodes["BinOP"][COUNT] == 2 + 4 + 3
+    assert profiler.statements["line 6: b := b + a"][COUNT] == 3
+    assert profiler.statements["line 4: a := 1 + 2 * 3"][COUNT] == 1
+
+def test_self_time_never_exceeds_cumulative_time():
+    profiler, _ = profile()
+    for table in (profiler.nodes, profiler.statements):
+        for count, cumulative, own in table.values():
+            assert 0 <= own <= cumulative + 1e-9
+
+def test_detach_restores_the_plain_visitor():
+    _, interpreter = profile()
+    assert "visit" not in vars(interpreter)
+
+def test_collapsed_stacks_start_at_the_program():
+    profiler, _ = profile()
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith("Program") for line in lines)
+    assert "node type" in profiler.report(limit=3)
+
+def test_needs_the_tree_engine():
+    with pytest.raises(Exception, match="Profiling needs the tree engine"):
+        Interpreter(None, engine="vm", profiler=Profiler())
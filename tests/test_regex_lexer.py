@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from enums import TokenType
+from lexer import Lexer
+from regex_lexer import RegexLexer
+from programs import random_program
+
+def tokens(lexer):
+    token = lexer.current_token
+    result = []
+    while token.type != TokenType.EOF:
+        result.append((token.type, token.value))
+        token = lexer.get_next_token()
+    return result
+
+def outcome(lexer_class, text):
+    try:
+        return tokens(lexer_class(text))
+    except Exception as e:
+        return str(e)
+
+@pytest.mark.parametrize("text", [
+    "PROGRAM p; VAR a : INTEGER; BEGIN a := 1 END.",
+    "program P; var x, y : real; begin x := 3.; y := x / 2.50 end.",
+    "{ comment } a := 'it''s' { another }",
+    "a == b != c DIV 3",
+    "a := '",
+    "a := 1 # 2",
+])
+def test_matches_the_character_lexer(text):
+    assert outcome(RegexLexer, text) == outcome(Lexer, text)
+
+def test_random_programs_lex_the_same():
+    rng = random.Random(2)
+    for _ in range(200):
+        text = random_program(rng).replace(";", " { c } ;\n")
+        assert tokens(RegexLexer(text)) == tokens(Lexer(text))
+
+@pytest.mark.parametrize("text", ["{ never closed", "a := 'never closed"])
+def test_unterminated_comments_and_strings_raise(text):
+    assert outcome(RegexLexer, text) == "Invalid syntax"
+
+def test_tracks_token_offsets():
+    lexer = RegexLexer("  abc := 12")
+    assert (lexer.start, lexer.pos) == (2, 5)
+    lexer.get_next_token()
+    assert (lexer.start, lexer.pos) == (6, 8)
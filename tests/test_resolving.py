@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from compiler import ResolvingCompiler
+from interpreter import Interpreter, compile_source
+from typecheck import ResolvingTypeChecker
+from parser import Parser
+from regex_lexer import RegexLexer
+from programs import DECLARATIONS, program, random_program
+
+def outcome(source, engine, resolved):
+    try:
+        tree, symbol_table = compile_source(source, resolved=resolved)
+        interpreter = Interpreter(None, engine=engine)
+        interpreter.execute(tree, symbol_table)
+    except Exception as e:
+        return "error", str(e)
+    return "ok", {name: repr(value) for name, value in interpreter.GLOBAL_SCOPE.items()}
+
+@pytest.mark.parametrize("engine", Interpreter.ENGINES)
+def test_fused_resolution_matches_the_separate_walk(engine):
+    rng = random.Random(12)
+    for _ in range(150):
+        source = random_program(rng)
+        if rng.random() < 0.2:
+            source = source.replace("c :=", "z :=", 1)
+        assert outcome(source, engine, resolved=False) == outcome(source, engine, resolved=True), source
+
+@pytest.mark.parametrize("engine", ["vm", "typed"])
+def test_undeclared_variables_come_before_type_errors(engine):
+    source = program(DECLARATIONS, "a := 'text'; z := 1")
+    assert outcome(source, engine, resolved=False) == ("error", "Variable 'z' not found")
+
+def test_resolving_walks_build_the_symbol_table():
+    tree = Parser(RegexLexer(program(DECLARATIONS, "b := 1; a := b + 2"))).parse()
+    compiler = ResolvingCompiler()
+    compiler.compile(tree)
+    assert [v.name for v in compiler.symbol_table.variables] == ["a", "b", "c", "r"]
+
+    tree = Parser(RegexLexer(program(DECLARATIONS, "b := 1; a := b + 2"))).parse()
+    checker = ResolvingTypeChecker()
+    checker.check(tree)
+    assert tree.block.compound_statement.children[1].left.slot == 0
@@ -0,0 +1,59 @@
+import asyncio
+
+from client import AsyncClient
+from cache import ProgramCache
+from server import InterpreterServer, ProgramStore
+
+SOURCE = "PROGRAM p; VAR a, b : INTEGER; BEGIN a := 1; b := a + 1 END."
+
+def serve(requests, store=None):
+    async def main():
+        server = InterpreterServer(store, max_concurrent=2)
+        listener = await server.start(host="127.0.0.1", port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            client = await AsyncClient.connect(port=port)
+            try:
+                return [await asyncio.wait_for(client.request(request), 5) for request in requests]
+            finally:
+                await client.close()
+    return asyncio.run(main())
+
+def test_runs_source_and_hash():
+    first, again = serve([{"source": SOURCE}, {"source": SOURCE, "outputs": ["a"]}])
+    assert first["ok"] and first["bindings"] == {"a": 1, "b": 2}
+    assert again["hash"] == first["hash"] and again["bindings"] == {"a": 1}
+
+def test_bad_deadline_gets_a_reply():
+    for deadline in ("soon", -1, 0, True, [1]):
+        response, = serve([{"source": SOURCE, "deadline": deadline}])
+        assert response["ok"] is False and "deadline" in response["error"]
+
+def test_outputs_must_be_a_list_of_names():
+    for outputs in ("ab", ["a", 1], {"a": 1}):
+        response, = serve([{"source": SOURCE, "outputs": outputs}])
+        assert response["ok"] is False and "outputs" in response["error"]
+
+def test_hash_must_be_a_program_key(tmp_path):
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    (victim / "data.program").write_bytes(b"not a program")
+    store = ProgramStore(cache=ProgramCache(str(tmp_path / "cache")))
+    for key in ("../victim/data", "A" * 64, "0" * 63, 1):
+        response, = serve([{"hash": key}], store)
+        assert response["ok"] is False and "Invalid program hash" in response["error"]
+    assert (victim / "data.program").exists()
+
+def test_typed_runs_check_the_program_before_optimizing():
+    source = "PROGRAM p; VAR a, b : INTEGER; BEGIN a := 1.5; a := 2; b := a END."
+    store = ProgramStore(optimize=True)
+    tree, typed = serve([
+        {"source": source},
+        {"source": source, "engine": "typed"},
+    ], store)
+    assert tree["ok"] and tree["bindings"] == {"a": 2, "b": 2}
+    assert typed["ok"] is False
+    response, = serve([{"hash": tree["hash"], "engine": "typed"}], store)
+    assert response["ok"] is False and "send its source" in response["error"]
+    response, = serve([{"source": source, "engine": "typed", "outputs": ["b"]}], ProgramStore())
+    assert response["ok"] is False and response["error"] == typed["error"]
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from snapshot import run_prefix
+from programs import DECLARATIONS, VARIABLES, expression, outcome, program
+
+def statements(rng, count, strings):
+    return "; ".join(f"{rng.choice(VARIABLES)} := {expression(rng, 3, strings)}" for _ in range(count))
+
+def fork_outcome(base, suffix, engine):
+    fork = base.fork(engine)
+    try:
+        fork.run(suffix)
+    except Exception as e:
+        return "error", str(e)
+    return "ok", {name: repr(value) for name, value in fork.GLOBAL_SCOPE.items()}
+
+@pytest.mark.parametrize("engine", ["tree", "typed"])
+def test_forks_match_running_from_scratch(engine):
+    rng = random.Random(24)
+    strings = engine == "tree"
+    compared = 0
+    while compared < 60:
+        prefix = statements(rng, 4, strings)
+        if outcome(program(DECLARATIONS, prefix), engine)[0] == "error":
+            continue
+        base = run_prefix(program(DECLARATIONS, prefix), engine)
+        for _ in range(3):
+            suffix = statements(rng, 3, strings)
+            expected = outcome(program(DECLARATIONS, f"{prefix}; {suffix}"), engine)
+            assert fork_outcome(base, suffix, engine) == expected, (prefix, suffix)
+            compared += 1
+
+def test_forks_are_isolated():
+    base = run_prefix(program(DECLARATIONS, "a := 1; b := 2"))
+    first, second = base.fork(), base.fork("typed")
+    first.run("a := 10; c := a + b")
+    second.run("b := 20")
+    assert first.GLOBAL_SCOPE == {"a": 10, "b": 2, "c": 12}
+    assert second.GLOBAL_SCOPE == {"a": 1, "b": 20}
+    assert base.bindings() == {"a": 1, "b": 2}
+    assert second.value("c") is None
+
+def test_snapshot_of_a_fork():
+    fork = run_prefix(program(DECLARATIONS, "a := 1")).fork()
+    fork.run("b := a + 1")
+    branch = fork.snapshot().fork()
+    fork.run("a := 5")
+    branch.run("c := a + b")
+    assert branch.GLOBAL_SCOPE == {"a": 1, "b": 2, "c": 3}
+    assert fork.value("a") == 5
+
+def test_rejects_other_engines_and_names():
+    base = run_prefix(program(DECLARATIONS, "a := 1"))
+    with pytest.raises(Exception, match="tree or typed"):
+        base.fork("vm")
+    with pytest.raises(Exception, match="Variable 'z' not found"):
+        base.fork().value("z")
+    with pytest.raises(Exception, match="not found"):
+        base.fork().run("z := 1")
@@ -0,0 +1,60 @@
+import io
+import os
+
+import pytest
+
+from enums import TokenType
+from lexer import Lexer
+from parser import Parser
+from stream_lexer import StreamLexer
+
+SOURCE = "PROGRAM p; { a comment } VAR a, b : INTEGER; r : REAL; BEGIN a := 10 DIV 3; b := a != 3; r := 2.75 / 1.5; a := 'héllo world' END."
+
+def tokens(lexer):
+    token = lexer.current_token
+    result = []
+    while token.type != TokenType.EOF:
+        result.append((token.type, token.value))
+        token = lexer.get_next_token()
+    return result
+
+def open_descriptors():
+    return len(os.listdir("/proc/self/fd"))
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_matches_the_lexer_across_chunk_boundaries(chunk_size):
+    expected = tokens(Lexer(SOURCE))
+    assert tokens(StreamLexer(io.StringIO(SOURCE), chunk_size)) == expected
+    assert tokens(StreamLexer(io.BytesIO(SOURCE.encode()), chunk_size)) == expected
+
+def test_from_path_closes_its_map_at_the_end(tmp_path):
+    path = tmp_path / "p.pas"
+    path.write_text(SOURCE, encoding="utf-8")
+    lexer = StreamLexer.from_path(str(path), chunk_size=16)
+    assert Parser(lexer).parse() is not None
+    assert lexer.source.closed
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_from_path_does_not_leak_descriptors(tmp_path):
+    good = tmp_path / "good.pas"
+    good.write_text(SOURCE, encoding="utf-8")
+    bad = tmp_path / "bad.pas"
+    bad.write_text(SOURCE.replace("END.", "END. #"), encoding="utf-8")
+    empty = tmp_path / "empty.pas"
+    empty.write_text("")
+
+    before = open_descriptors()
+    for _ in range(50):
+        with StreamLexer.from_path(str(good)) as lexer:
+            tokens(lexer)
+        with pytest.raises(Exception, match="Invalid syntax"):
+            with StreamLexer.from_path(str(bad), chunk_size=8) as lexer:
+                tokens(lexer)
+        StreamLexer.from_path(str(empty)).close()
+    assert open_descriptors() == before
+
+def test_leaves_sources_it_does_not_own_open():
+    source = io.StringIO(SOURCE)
+    with StreamLexer(source) as lexer:
+        tokens(lexer)
+    assert not source.closed
@@ -0,0 +1,36 @@
+import pytest
+
+from interpreter import Interpreter, SymbolTableBuilder, compile_source
+from parser import Parser
+from regex_lexer import RegexLexer
+from programs import program, outcome
+
+def parse(source):
+    return Parser(RegexLexer(source)).parse()
+
+def test_variables_get_slots_in_declaration_order():
+    tree, symbol_table = compile_source(program("b, a : INTEGER; r : REAL", "a := 1"))
+    assert [(v.name, v.slot) for v in symbol_table.variables] == [("b", 0), ("a", 1), ("r", 2)]
+    assert symbol_table.lookup("r").type.name == "REAL"
+
+    assign = tree.block.compound_statement.children[0]
+    assert assign.left.slot == 1
+
+def test_redeclaring_keeps_the_slot():
+    _, symbol_table = compile_source("PROGRAM p; VAR a, b : INTEGER; a : REAL; BEGIN a := 1 END.")
+    assert [(v.name, v.slot, v.type.name) for v in symbol_table.variables] == [("a", 0, "REAL"), ("b", 1, "INTEGER")]
+
+def test_undeclared_variables_are_rejected_before_running():
+    builder = SymbolTableBuilder()
+    with pytest.raises(Exception, match="Variable 'c' not found"):
+        builder.visit(parse(program("a : INTEGER", "a := 1; c := a")))
+
+def test_frame_is_indexed_by_slot():
+    tree, symbol_table = compile_source(program("a, b, c : INTEGER", "c := 3; a := c + 1"))
+    interpreter = Interpreter(None)
+    interpreter.execute(tree, symbol_table)
+    assert interpreter.frame == [4, None, 3]
+    assert interpreter.GLOBAL_SCOPE == {"a": 4, "c": 3}
+
+def test_reading_an_unassigned_variable_fails():
+    assert outcome(program("a, b : INTEGER", "a := b")) == ("error", "Variable b not found in scope")
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from enums import TokenType
+from lexer import Lexer
+from parser import Parser
+from regex_lexer import RegexLexer
+from token_buffer import TokenBuffer
+from programs import random_program
+
+def tokens(lexer):
+    token = lexer.current_token
+    result = []
+    while token.type != TokenType.EOF:
+        result.append((token.type, token.value))
+        token = lexer.get_next_token()
+    return result
+
+@pytest.mark.parametrize("text", [
+    "PROGRAM p; VAR a, bEGIN_x : INTEGER; r : REAL; BEGIN a := 12; r := 3.5 END.",
+    "program p; var x : real; Begin x := 1. { note } ; x := 'it' ; x := ' ' EnD.",
+    "a := 'ünïcode'; divx := a DIV 2 / 3 == 1 != 0",
+    "a := '",
+])
+def test_matches_the_character_lexer(text):
+    assert tokens(TokenBuffer(text).cursor()) == tokens(Lexer(text))
+
+def test_random_programs_lex_the_same():
+    rng = random.Random(8)
+    for _ in range(200):
+        text = random_program(rng)
+        assert tokens(TokenBuffer(text).cursor()) == tokens(RegexLexer(text))
+
+def test_stores_offsets_and_builds_tokens_lazily():
+    buffer = TokenBuffer("abc := 'xy'")
+    assert len(buffer) == 4
+    assert list(buffer.starts) == [0, 4, 8, 11] and list(buffer.ends) == [3, 6, 10, 11]
+    assert buffer.text_of(2) == "xy"
+    assert buffer.token(1) is buffer.token(1)
+
+def test_parses_through_a_cursor():
+    text = random_program(random.Random(9))
+    assert Parser(TokenBuffer(text).cursor()).parse().name == "p"
+
+@pytest.mark.parametrize("text", ["a := 1 # 2", "{ never closed"])
+def test_invalid_sources_raise(text):
+    with pytest.raises(Exception, match="Invalid syntax"):
+        TokenBuffer(text)
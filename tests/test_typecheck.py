@@ -0,0 +1,51 @@
+import operator
+
+import pytest
+
+from interpreter import Interpreter, compile_source
+from typecheck import TypeChecker, float_divide
+from programs import program, outcome
+
+DECLARATIONS = "a, b : INTEGER; r, s : REAL"
+
+@pytest.mark.parametrize("statements", [
+    "a := 7; b := 2; r := a / b; s := a DIV b * 1.5",
+    "a := 9007199254740993; b := 3; r := a / b",
+    "a := 1; b := 0; r := a / b",
+    "a := 2; b := a * a * a * a * a * a * a * a * a * a; b := b * b * b * b * b * b * b * b * b * b * b * b; r := b / 3",
+    "a := 3; r := 0.0; s := a / r",
+    "a := 5; b := a == 5; r := b / 2",
+    "r := 2.5; s := -r * 4; a := +8 DIV 3",
+    "r := 2.5; a := 7; s := r / a + a / r; s := s / r",
+])
+def test_typed_engine_matches_the_tree_engine(statements):
+    source = program(DECLARATIONS, statements)
+    assert outcome(source, "typed") == outcome(source, "tree")
+
+@pytest.mark.parametrize("statements, message", [
+    ("a := 'text'", "cannot assign STRING to INTEGER"),
+    ("r := 1.5; a := r", "cannot assign REAL to INTEGER"),
+    ("r := 1.5; a := r DIV 2", "DIV needs INTEGER operands"),
+    ("a := 1 + 'x'", "applied to STRING"),
+])
+def test_type_errors_are_raised_before_running(statements, message):
+    kind, error = outcome(program(DECLARATIONS, statements), "typed")
+    assert kind == "error" and message in error
+
+def test_integers_widen_into_real_variables():
+    assert outcome(program(DECLARATIONS, "r := 3"), "typed") == ("ok", {"r": "3"})
+
+def test_engines_include_typed():
+    assert "typed" in Interpreter.ENGINES
+
+@pytest.mark.parametrize("expression, operation", [
+    ("a / b", float_divide),
+    ("r / s", operator.truediv),
+    ("a / r", operator.truediv),
+    ("r / a", operator.truediv),
+    ("(a == b) / a", float_divide),
+])
+def test_division_picks_its_operation_from_the_operand_types(expression, operation):
+    tree, symbol_table = compile_source(program(DECLARATIONS, f"r := {expression}"))
+    TypeChecker(symbol_table).check(tree)
+    assert tree.block.compound_statement.children[0].right.operation is operation
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from interpreter import Interpreter, compile_source
+from typed_env import TypedFrame
+from programs import DECLARATIONS, outcome, program, random_program, run
+
+@pytest.mark.parametrize("engine", ["tree", "typed"])
+def test_array_frames_match_list_frames(engine):
+    rng = random.Random(25)
+    for _ in range(200):
+        source = random_program(rng, strings=engine == "tree")
+        assert outcome(source, engine, storage="arrays") == outcome(source, engine), source
+
+def test_values_are_stored_unboxed_or_boxed():
+    source = program(DECLARATIONS, "a := 3; b := 1 == 1; c := 'text'; r := 2.5")
+    assert run(source, storage="arrays") == {"a": 3, "b": True, "c": "text", "r": 2.5}
+
+@pytest.mark.parametrize("overflow, expected", [
+    ("box", 1 << 63),
+    ("wrap", -(1 << 63)),
+])
+def test_overflow_policies(overflow, expected):
+    source = program(DECLARATIONS, "a := 2; b := 9223372036854775807 + 1")
+    assert run(source, storage="arrays", overflow=overflow)["b"] == expected
+
+def test_overflow_error():
+    source = program(DECLARATIONS, "a := 9223372036854775807 + 1")
+    assert outcome(source, storage="arrays", overflow="error") == (
+        "error", "a holds 9223372036854775808, which does not fit in 64 bits")
+
+def test_to_numpy_shares_memory():
+    tree, symbol_table = compile_source(program(DECLARATIONS, "a := 4; b := 6; c := 7; r := 0.5"))
+    interpreter = Interpreter(None, storage="arrays")
+    interpreter.execute(tree, symbol_table)
+    frame = interpreter.frame
+    integers, reals = frame.to_numpy()
+    assert dict(zip(frame.integer_names, integers.tolist())) == {"a": 4, "b": 6, "c": 7}
+    assert dict(zip(frame.real_names, reals.tolist())) == {"r": 0.5}
+    frame[0] = 9
+    assert integers[0] == 9
+
+@pytest.mark.parametrize("engine", ["tree", "typed"])
+def test_boxed_numbers_are_coerced_for_export(engine):
+    tree, symbol_table = compile_source(program(DECLARATIONS, "a := 1 == 1; b := 2; r := 2"))
+    interpreter = Interpreter(None, engine=engine, storage="arrays")
+    interpreter.execute(tree, symbol_table)
+    assert repr(interpreter.GLOBAL_SCOPE) == "{'a': True, 'b': 2, 'r': 2}"
+    integers, reals = interpreter.frame.to_numpy()
+    assert integers.tolist() == [1, 2, 0] and reals.tolist() == [2.0]
+
+@pytest.mark.parametrize("statements", ["a := 'text'", "a := 1.5", "a := 9223372036854775807 + 1"])
+def test_export_refuses_values_the_arrays_cannot_hold(statements):
+    tree, symbol_table = compile_source(program(DECLARATIONS, f"{statements}; r := 1"))
+    interpreter = Interpreter(None, storage="arrays")
+    interpreter.execute(tree, symbol_table)
+    with pytest.raises(Exception, match="Cannot export a"):
+        interpreter.frame.to_numpy()
+    interpreter.frame[0] = 3
+    assert interpreter.frame.to_numpy()[0].tolist() == [3, 0, 0]
+
+def test_rejects_unknown_settings():
+    with pytest.raises(Exception, match="Unknown overflow policy"):
+        TypedFrame(None, overflow="saturate")
+    with pytest.raises(Exception, match="Array storage"):
+        run(program(DECLARATIONS, "a := 1"), "vm", storage="arrays")
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from compiler import Compiler
+from enums import OpCode
+from interpreter import compile_source
+from vm import VM
+from programs import program, outcome, random_program
+
+@pytest.mark.parametrize("statements", [
+    "a := 2 + 3 * 4; b := (a - 1) DIV 3; r := a / b",
+    "a := 1; b := a == 1; c := a != 1; r := -a + +b",
+    "a := 'x'; b := a == 'x'",
+    "a := b + 1",
+    "a := 1 DIV 0",
+    "a := 1; a := a * a + 1; a := a * a + 1",
+])
+def test_vm_matches_the_tree_engine(statements):
+    source = program("a, b, c : INTEGER; r : REAL", statements)
+    assert outcome(source, "vm") == outcome(source, "tree")
+
+def test_random_programs_agree():
+    rng = random.Random(1)
+    for _ in range(300):
+        source = random_program(rng)
+        assert outcome(source, "vm") == outcome(source, "tree"), source
+
+def test_runs_compiled_chunks():
+    tree, symbol_table = compile_source(program("a, b : INTEGER", "a := 1 + 2; b := a * a"))
+    chunk = Compiler().compile(tree, symbol_table)
+    assert [OpCode(op) for op in chunk.code[::2]].count(OpCode.STORE_NAME) == 2
+
+    frame = [None] * len(symbol_table.variables)
+    VM(frame).run(chunk)
+    assert frame == [3, 9]
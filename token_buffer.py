@@ -0,0 +1,172 @@
+import re
+from array import array
+
+from enums import TokenType
+from parser import Token
+from lexer import RESERVED_KEYWORDS, OPERATOR_TOKENS, NAMES
+
+"""
+    One group per keyword and per operator, so the matched group alone gives
+    the token type and no text has to be extracted to classify a token.
+    Keywords are case-insensitive over ASCII only, like value.lower() lookups
+    in the other lexers, and must not run on into a longer identifier.
+"""
+KEYWORD_GROUPS = [
+    (f"KEYWORD_{name.upper()}", rf"(?ai:{re.escape(name)})(?!\w)", token)
+    for name, token in RESERVED_KEYWORDS.items()
+]
+OPERATOR_GROUPS = [
+    (f"OPERATOR_{index}", re.escape(text), token)
+    for index, (text, token) in enumerate(sorted(OPERATOR_TOKENS.items(), key=lambda item: -len(item[0])))
+]
+VALUE_GROUPS = [
+    ("NAME", r"[^\W\d]\w*", TokenType.ID),
+    ("REAL", r"\d+\.\d*", TokenType.REAL),
+    ("INTEGER", r"\d+", TokenType.INTEGER),
+    # the first character after the opening quote always belongs to the string
+    ("STRING", r"'(?P<STRING_TEXT>[\s\S][^']*)'", TokenType.STRING),
+    ("FINAL_QUOTE", r"'(?P<FINAL_QUOTE_TEXT>)\Z", TokenType.STRING),
+    ("COMMENT", r"\{[^}]*\}", None),
+]
+
+GROUPS = KEYWORD_GROUPS + OPERATOR_GROUPS + VALUE_GROUPS
+BUFFER_PATTERN = re.compile(
+    r"[ \n]*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in GROUPS) + ")"
+)
+WHITESPACE_PATTERN = re.compile(r"[ \n]*")
+
+"""
+    The type code stored for each group number (0 for comments), and the
+    shared Token for each code that only keywords or operators produce.
+    INTEGER and REAL are both keywords and literals; a token with those codes
+    is a keyword unless its text starts with a digit.
+"""
+GROUP_CODES = [0] * (BUFFER_PATTERN.groups + 1)
+SHARED_TOKENS = [None] * 256
+for name, _, kind in GROUPS:
+    group = BUFFER_PATTERN.groupindex[name]
+    if isinstance(kind, Token):
+        GROUP_CODES[group] = kind.type.value
+        if kind.type not in (TokenType.INTEGER, TokenType.REAL):
+            SHARED_TOKENS[kind.type.value] = kind
+    elif kind is not None:
+        GROUP_CODES[group] = kind.value
+
+# strings record the span of their text group rather than the whole match
+SPAN_GROUPS = list(range(BUFFER_PATTERN.groups + 1))
+for name in ("STRING", "FINAL_QUOTE"):
+    SPAN_GROUPS[BUFFER_PATTERN.groupindex[name]] = BUFFER_PATTERN.groupindex[name + "_TEXT"]
+TOKEN_TYPES = {member.value: member for member in TokenType}
+
+ID = TokenType.ID.value
+INTEGER = TokenType.INTEGER.value
+STRING = TokenType.STRING.value
+EOF = TokenType.EOF.value
+
+"""
+    Lexes text[pos:endpos] as if the text ended at endpos, appending each
+    token to the arrays with base added to its offsets. Returns the offset,
+    past any whitespace, where lexing stopped: endpos, or the start of the
+    first character no token matches.
+"""
+def scan(text, pos, endpos, types, starts, ends, base=0):
+    codes = GROUP_CODES
+    spans = SPAN_GROUPS
+    add_type = types.append
+    add_start = starts.append
+    add_end = ends.append
+
+    for m in iter(BUFFER_PATTERN.scanner(text, pos, endpos).match, None):
+        pos = m.end()
+        group = m.lastindex
+        code = codes[group]
+        if not code:
+            continue
+        group = spans[group]
+        add_type(code)
+        add_start(m.start(group) + base)
+        add_end(m.end(group) + base)
+
+    return WHITESPACE_PATTERN.match(text, pos, endpos).end()
+
+class TokenBuffer:
+    """
+        Lexes a whole source up front into parallel arrays instead of Token
+        objects: types holds each token's TokenType value, starts and ends the
+        source offsets of its text (for strings, the text between the quotes).
+        That is 9 bytes per token; no string is built while lexing.
+
+        Keyword and operator tokens map back to the shared Tokens, everything
+        else is materialized from a slice of the source by token(i) only when
+        asked for, which a Parser does through cursor().
+    """
+    def __init__(self, text):
+        self.text = text
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lex()
+
+    def error(self, pos):
+        raise Exception('Invalid syntax')
+
+    def lex(self):
+        pos = scan(self.text, 0, len(self.text), self.types, self.starts, self.ends)
+        if pos < len(self.text):
+            self.error(pos)
+        self.types.append(EOF)
+        self.starts.append(pos)
+        self.ends.append(pos)
+
+    def __len__(self):
+        return len(self.types)
+
+    def type(self, index):
+        return TOKEN_TYPES[self.types[index]]
+
+    def text_of(self, index):
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def token(self, index):
+        code = self.types[index]
+        token = SHARED_TOKENS[code]
+        if token is not None:
+            return token
+        if code == ID:
+            return NAMES.token(self.text_of(index))
+        if code == STRING:
+            return Token(TokenType.STRING, self.text_of(index))
+        if code == EOF:
+            return Token(TokenType.EOF, None)
+
+        if not self.text[self.starts[index]].isdigit():
+            return RESERVED_KEYWORDS["integer" if code == INTEGER else "real"]
+        if code == INTEGER:
+            return Token(TokenType.INTEGER, int(self.text_of(index)))
+        return Token(TokenType.REAL, float(self.text_of(index)))
+
+    def cursor(self, index=0):
+        return TokenCursor(self, index)
+
+class TokenCursor:
+    """
+        Lexer interface over a TokenBuffer, so Parser(buffer.cursor()) parses
+        it directly, materializing one token at a time
+    """
+    def __init__(self, buffer, index=0):
+        self.buffer = buffer
+        self.types = buffer.types
+        self.last = len(buffer) - 1
+        self.index = index
+        self.current_token = buffer.token(index)
+
+    def get_next_token(self):
+        index = self.index
+        if index < self.last:
+            index = self.index = index + 1
+        # keywords and operators without going through buffer.token
+        token = SHARED_TOKENS[self.types[index]]
+        if token is None:
+            token = self.buffer.token(index)
+        self.current_token = token
+        return token
@@ -0,0 +1,246 @@
+import operator
+
+from enums import TokenType
+from visitor import NodeVisitor
+from symbol import SymbolTable
+from ops import Program, Block, Compound, NoOP, Assign, Var, Num, String, UnaryOP, BinOP, VarDecl, Type, If, While
+
+"""
+    Static types are the TokenTypes of the literals: INTEGER, REAL and STRING.
+    Comparisons produce booleans, which are INTEGER.
+"""
+INTEGER = TokenType.INTEGER
+REAL = TokenType.REAL
+STRING = TokenType.STRING
+
+DIV = TokenType.INTEGER_DIVIDE_OPERATOR
+SLASH = TokenType.FLOAT_DIVIDE_OPERATOR
+COMPARISONS = (TokenType.EQUALS, TokenType.NOT_EQUALS)
+
+def float_divide(left, right):
+    return float(left) / float(right)
+
+"""
+    Every operand pair the checker accepts is int/int or involves a float,
+    where Python's own operators already give the INTEGER or REAL result, so
+    no operation needs to test its operands. / with a REAL operand is plain
+    truediv, which converts the other one itself; INTEGER / INTEGER converts
+    both to float first (float_divide), like the other engines, so it rounds
+    and fails the way they do instead of dividing exactly.
+"""
+BINARY_OPERATIONS = {
+    TokenType.PLUS_OPERATOR: operator.add,
+    TokenType.MINUS_OPERATOR: operator.sub,
+    TokenType.MULTIPLY_OPERATOR: operator.mul,
+    DIV: operator.floordiv,
+    SLASH: operator.truediv,
+    TokenType.EQUALS: operator.eq,
+    TokenType.NOT_EQUALS: operator.ne,
+}
+
+def identity(value):
+    return value
+
+UNARY_OPERATIONS = {
+    TokenType.PLUS_OPERATOR: operator.pos,
+    TokenType.MINUS_OPERATOR: operator.neg,
+    TokenType.EQUALS: identity,
+    TokenType.NOT_EQUALS: identity,
+}
+
+NODE_CLASSES = (Program, Block, Compound, NoOP, Assign, Var, Num, String, UnaryOP, BinOP, VarDecl, Type, If, While)
+
+class TypedVisitor(NodeVisitor):
+    """
+        Dispatches on the node class through a table of bound methods built
+        once, instead of formatting and looking up a method name per visit
+    """
+    def __init__(self):
+        self.methods = {
+            cls: getattr(self, 'visit_' + cls.__name__)
+            for cls in NODE_CLASSES if hasattr(self, 'visit_' + cls.__name__)
+        }
+
+    def visit(self, node):
+        try:
+            method = self.methods[type(node)]
+        except KeyError:
+            return self.generic_visit(node)
+        return method(node)
+
+class TypeChecker(TypedVisitor):
+    """
+        Labels every expression node of a resolved tree with its static type
+        (expr_type) and picks the operation it runs (operation), using the
+        declared types in symbol_table. Raises before anything runs when:
+
+            - a string is used in arithmetic or compared with a number
+            - DIV has a REAL operand
+            - a REAL or STRING value is assigned to an INTEGER variable, or a
+              STRING value to a REAL one
+
+        Conditions of IF and WHILE may have any type; they test truthiness.
+    """
+    def __init__(self, symbol_table):
+        super().__init__()
+        self.symbol_table = symbol_table
+        self.types = [TokenType[v.type.name] for v in symbol_table.variables]
+
+    def check(self, tree):
+        self.visit(tree)
+        return tree
+
+    def error(self, message):
+        raise Exception(f"Type error: {message}")
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        self.visit(node.compound_statement)
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_If(self, node):
+        self.visit(node.condition)
+        self.visit(node.then_branch)
+        if node.else_branch is not None:
+            self.visit(node.else_branch)
+
+    def visit_While(self, node):
+        self.visit(node.condition)
+        self.visit(node.body)
+
+    def visit_NoOP(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        target = self.visit(node.left)
+        value = self.visit(node.right)
+        if value != target and not (target == REAL and value == INTEGER):
+            self.error(f"cannot assign {value.name} to {target.name} variable '{node.left.value}'")
+
+    def visit_Var(self, node):
+        node.expr_type = self.types[node.slot]
+        return node.expr_type
+
+    def visit_Num(self, node):
+        node.expr_type = REAL if type(node.value) == float else INTEGER
+        return node.expr_type
+
+    def visit_String(self, node):
+        node.expr_type = STRING
+        return STRING
+
+    def visit_UnaryOP(self, node):
+        operand = self.visit(node.expr)
+        op = node.op.type
+        if operand == STRING and op not in COMPARISONS:
+            self.error(f"unary {node.op.value} applied to STRING")
+
+        node.operation = UNARY_OPERATIONS[op]
+        node.expr_type = operand
+        return operand
+
+    def visit_BinOP(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+
+        if op in COMPARISONS:
+            if (left == STRING) != (right == STRING):
+                self.error(f"cannot compare {left.name} with {right.name}")
+            result = INTEGER
+        elif left == STRING or right == STRING:
+            self.error(f"{node.op.value} applied to STRING")
+        elif op == DIV:
+            if left != INTEGER or right != INTEGER:
+                self.error(f"DIV needs INTEGER operands, got {left.name} and {right.name}")
+            result = INTEGER
+        elif op == SLASH or left == REAL or right == REAL:
+            result = REAL
+        else:
+            result = INTEGER
+
+        if op == SLASH and left == INTEGER and right == INTEGER:
+            node.operation = float_divide
+        else:
+            node.operation = BINARY_OPERATIONS[op]
+        node.expr_type = result
+        return result
+
+class ResolvingTypeChecker(TypeChecker):
+    """
+        A TypeChecker for a tree SymbolTableBuilder has not resolved. It
+        builds symbol_table itself, declaring variables and resolving each
+        Var as it types it, so checking takes the only walk over the program.
+        Undeclared variables raise the builder's errors, in the same order.
+    """
+    def __init__(self):
+        super().__init__(SymbolTable())
+
+    def visit_Block(self, node):
+        for declaration in node.declarations:
+            self.symbol_table.declare(declaration)
+        self.types = [TokenType[v.type.name] for v in self.symbol_table.variables]
+
+        self.visit(node.compound_statement)
+
+    def visit_Var(self, node):
+        self.symbol_table.resolve(node)
+        node.expr_type = self.types[node.slot]
+        return node.expr_type
+
+class TypedEvaluator(TypedVisitor):
+    """
+        Runs a tree TypeChecker has labelled, in frame. Operators call the
+        operation chosen at check time instead of testing the operator and
+        converting operands on every visit.
+    """
+    def __init__(self, frame):
+        super().__init__()
+        self.frame = frame
+
+    def visit_Program(self, node):
+        self.visit(node.block.compound_statement)
+
+    def visit_Compound(self, node):
+        visit = self.visit
+        for child in node.children:
+            visit(child)
+
+    def visit_If(self, node):
+        if self.visit(node.condition):
+            self.visit(node.then_branch)
+        elif node.else_branch is not None:
+            self.visit(node.else_branch)
+
+    def visit_While(self, node):
+        while self.visit(node.condition):
+            self.visit(node.body)
+
+    def visit_NoOP(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        self.frame[node.left.slot] = self.visit(node.right)
+
+    def visit_Var(self, node):
+        value = self.frame[node.slot]
+        if value is None:
+            raise Exception(f"Variable {node.value} not found in scope")
+        return value
+
+    def visit_Num(self, node):
+        return node.token.value
+
+    def visit_String(self, node):
+        return node.token.value
+
+    def visit_UnaryOP(self, node):
+        return node.operation(self.visit(node.expr))
+
+    def visit_BinOP(self, node):
+        return node.operation(self.visit(node.left), self.visit(node.right))
@@ -0,0 +1,132 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+    Frames that keep the values of declared INTEGER and REAL variables
+    unboxed, in one array('q') and one array('d'), instead of as a Python
+    object per variable. The arrays support the buffer protocol, so the
+    final state can be read without copying:
+
+        interpreter = Interpreter(None, storage="arrays")
+        interpreter.execute(tree, symbol_table)
+        frame = interpreter.frame
+        integers, reals = frame.to_numpy()
+        dict(zip(frame.integer_names, integers))
+
+    A value is stored unboxed only when it has exactly its variable's type
+    and fits, so reading it back returns what was stored and results match
+    list frames. Anything else is boxed: kept as the object itself in the
+    boxed dict. A boxed int or bool (an int in a REAL variable, a
+    comparison's bool) is still coerced into the array, so exports see the
+    number; a boxed value that is no number of the variable's type (a
+    string on the tree engine, a float in an INTEGER variable, an int past
+    64 bits) makes to_numpy raise rather than export a 0 in its place.
+
+    overflow decides what happens to an int outside 64 bits assigned to an
+    INTEGER variable:
+
+        box    keep it exactly, boxed (the default)
+        wrap   store it wrapped to 64 bits two's complement, like int64 does
+        error  raise
+"""
+
+OVERFLOW_POLICIES = ("box", "wrap", "error")
+
+UNASSIGNED, STORED, COERCED, BOXED = range(4)
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+class TypedFrame:
+    """
+        Slot-indexed frame, like Interpreter.frame, for the variables of
+        symbol_table. Per slot it keeps whether the variable is REAL (real),
+        its index in that type's array (offsets) and whether it is
+        UNASSIGNED, STORED, COERCED (boxed, with its value converted into the
+        array) or BOXED (state): 14 bytes, against a list slot and an int
+        object. Elements of integers and reals whose variable is UNASSIGNED
+        or BOXED read 0; integer_names and real_names name the elements.
+    """
+    def __init__(self, symbol_table, overflow="box"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise Exception(f"Unknown overflow policy '{overflow}'")
+        self.overflow = overflow
+
+        self.variables = symbol_table.variables
+        self.real = bytearray(v.type.name == "REAL" for v in self.variables)
+        self.offsets = array('I')
+        counts = [0, 0]
+        for real in self.real:
+            self.offsets.append(counts[real])
+            counts[real] += 1
+
+        self.integers = array('q', bytes(8 * counts[0]))
+        self.reals = array('d', bytes(8 * counts[1]))
+        self.state = bytearray(len(self.variables))
+        self.boxed = {}
+
+    @property
+    def integer_names(self):
+        return [v.name for v, real in zip(self.variables, self.real) if not real]
+
+    @property
+    def real_names(self):
+        return [v.name for v, real in zip(self.variables, self.real) if real]
+
+    def __len__(self):
+        return len(self.state)
+
+    def __getitem__(self, slot):
+        state = self.state[slot]
+        if state == STORED:
+            return (self.reals if self.real[slot] else self.integers)[self.offsets[slot]]
+        if state:
+            return self.boxed[slot]
+        return None
+
+    def __setitem__(self, slot, value):
+        real = self.real[slot]
+        if type(value) == int and not real:
+            if not INT64_MIN <= value <= INT64_MAX:
+                if self.overflow == "box":
+                    return self.box(slot, value)
+                if self.overflow == "error":
+                    raise Exception(f"{self.variables[slot].name} holds {value}, which does not fit in 64 bits")
+                value = ((value - INT64_MIN) & 0xFFFFFFFFFFFFFFFF) + INT64_MIN
+        elif type(value) != float or not real:
+            return self.box(slot, value)
+
+        (self.reals if real else self.integers)[self.offsets[slot]] = value
+        if self.state[slot] > STORED:
+            del self.boxed[slot]
+        self.state[slot] = STORED
+
+    def box(self, slot, value):
+        values = self.reals if self.real[slot] else self.integers
+        state = BOXED
+        if type(value) in (int, bool):
+            try:
+                values[self.offsets[slot]] = value
+                state = COERCED
+            except OverflowError:
+                pass
+        if state == BOXED:
+            values[self.offsets[slot]] = 0
+        self.boxed[slot] = value
+        self.state[slot] = state
+
+    """
+        integers and reals as NumPy arrays sharing their memory. Raises when
+        a variable holds a value its array cannot represent.
+    """
+    def to_numpy(self):
+        if np is None:
+            raise Exception("NumPy export requires numpy")
+        if BOXED in self.state:
+            names = [v.name for v, state in zip(self.variables, self.state) if state == BOXED]
+            raise Exception(f"Cannot export {', '.join(names)}: not numbers of their declared type")
+        return np.frombuffer(self.integers, dtype=np.int64), np.frombuffer(self.reals, dtype=np.float64)
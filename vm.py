@@ -0,0 +1,115 @@
+from enums import OpCode
+
+LOAD_CONST = OpCode.LOAD_CONST.value
+LOAD_NAME = OpCode.LOAD_NAME.value
+STORE_NAME = OpCode.STORE_NAME.value
+UNARY_PLUS = OpCode.UNARY_PLUS.value
+UNARY_MINUS = OpCode.UNARY_MINUS.value
+UNARY_FLOAT = OpCode.UNARY_FLOAT.value
+BINARY_ADD = OpCode.BINARY_ADD.value
+BINARY_SUBTRACT = OpCode.BINARY_SUBTRACT.value
+BINARY_MULTIPLY = OpCode.BINARY_MULTIPLY.value
+BINARY_FLOOR_DIVIDE = OpCode.BINARY_FLOOR_DIVIDE.value
+BINARY_TRUE_DIVIDE = OpCode.BINARY_TRUE_DIVIDE.value
+COMPARE_EQUALS = OpCode.COMPARE_EQUALS.value
+COMPARE_NOT_EQUALS = OpCode.COMPARE_NOT_EQUALS.value
+JUMP = OpCode.JUMP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE.value
+LOAD_INVARIANT = OpCode.LOAD_INVARIANT.value
+STORE_INVARIANT = OpCode.STORE_INVARIANT.value
+
+class VM:
+    """
+        Stack machine for the Chunks produced by compiler.Compiler.
+
+        Variables live in frame, the same slot-indexed list the tree walking
+        Interpreter uses, with None marking an unassigned variable. Slots
+        past the declared variables hold the compiler's temporaries; run()
+        adds them to frame and removes them again when it returns. Jumps take an absolute index into code.
+
+        LOAD_INVARIANT starts the code computing a cached loop invariant.
+        Its argument is the position just past the STORE_INVARIANT ending
+        that code, whose argument is the slot of the cache: when the slot
+        holds a value it is pushed and the computation skipped, otherwise
+        the computation runs and STORE_INVARIANT fills the slot, leaving the
+        value on the stack.
+    """
+    def __init__(self, frame):
+        self.frame = frame
+
+    def run(self, chunk):
+        code = chunk.code
+        constants = chunk.constants
+        names = chunk.names
+        frame = self.frame
+        declared = len(frame)
+        if declared < len(names):
+            frame.extend([None] * (len(names) - len(frame)))
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        pc = 0
+        end = len(code)
+        try:
+            while pc < end:
+                op = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+
+                if op == LOAD_NAME:
+                    value = frame[arg]
+                    if value is None:
+                        raise Exception(f"Variable {names[arg]} not found in scope")
+                    push(value)
+                elif op == LOAD_CONST:
+                    push(constants[arg])
+                elif op == STORE_NAME:
+                    frame[arg] = pop()
+                elif op == LOAD_INVARIANT:
+                    value = frame[code[arg - 1]]
+                    if value is not None:
+                        push(value)
+                        pc = arg
+                elif op == BINARY_ADD:
+                    right = pop()
+                    stack[-1] = stack[-1] + right
+                elif op == BINARY_SUBTRACT:
+                    right = pop()
+                    stack[-1] = stack[-1] - right
+                elif op == BINARY_MULTIPLY:
+                    right = pop()
+                    stack[-1] = stack[-1] * right
+                elif op == BINARY_FLOOR_DIVIDE:
+                    right = pop()
+                    stack[-1] = stack[-1] // right
+                elif op == BINARY_TRUE_DIVIDE:
+                    right = pop()
+                    stack[-1] = float(stack[-1]) / float(right)
+                elif op == COMPARE_EQUALS:
+                    right = pop()
+                    stack[-1] = stack[-1] == right
+                elif op == COMPARE_NOT_EQUALS:
+                    right = pop()
+                    stack[-1] = stack[-1] != right
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP_IF_TRUE:
+                    if pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == STORE_INVARIANT:
+                    frame[arg] = stack[-1]
+                elif op == UNARY_MINUS:
+                    stack[-1] = -stack[-1]
+                elif op == UNARY_PLUS:
+                    stack[-1] = +stack[-1]
+                elif op == UNARY_FLOAT:
+                    stack[-1] = float(stack[-1])
+                else:
+                    raise Exception(f"Unknown opcode {op}")
+        finally:
+            del frame[declared:]